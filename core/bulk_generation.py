@@ -0,0 +1,299 @@
+"""
+Generates application documents for many jobs at once: every job × every template, rendered across worker
+processes, with the placeholders filled from the database.
+
+From the project root::
+
+    python -m core.bulk_generation --jobs 12 15 18 --template resume=docs/templates/resume.docx \
+        --template cover_letter=docs/templates/cover_letter.docx --values my_details.json --pdf
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from core.placeholder_parsing import PlaceholderParser
+from core.placeholder_scanner import scan_placeholders
+from core.zip_render import render_docx
+from utils.database_handler import DatabaseHandler
+from utils.path_utils import create_folder_if_dne, get_project_root, PathManager, PathFlag
+from utils.pdf_conversion import PdfBackend, make_backend
+
+_JOBS_QUERY = """
+    SELECT j.jobID, j.job_title, e.employer_name, j.location, j.URL, j.status, j.annual_pay, j.ft_pt, j.job_type,
+           j.work_model, j.notes, e.industry, e.location AS employer_location
+    FROM Jobs j
+             JOIN Employers e ON e.employerID = j.employerID
+    WHERE j.jobID IN (SELECT value FROM json_each(?))"""
+
+JOB_FIELDS: Dict[str, str] = {
+    'jobtitle':         'job_title',
+    'title':            'job_title',
+    'position':         'job_title',
+    'role':             'job_title',
+    'employer':         'employer_name',
+    'employername':     'employer_name',
+    'company':          'employer_name',
+    'companyname':      'employer_name',
+    'location':         'location',
+    'joblocation':      'location',
+    'url':              'URL',
+    'joburl':           'URL',
+    'status':           'status',
+    'salary':           'annual_pay',
+    'annualpay':        'annual_pay',
+    'fulltimeparttime': 'ft_pt',
+    'jobtype':          'job_type',
+    'workmodel':        'work_model',
+    'industry':         'industry',
+    'employerlocation': 'employer_location',
+}
+"""Placeholder label (lower case, letters and digits only) -> column of ``_JOBS_QUERY`` that fills it."""
+
+
+def _label_key(placeholder: str) -> str:
+    try:
+        label = PlaceholderParser.parse_fields(placeholder).label
+    except ValueError:
+        label = placeholder
+    return re.sub(r'[^a-z0-9]', '', label.lower())
+
+
+def _default_value(placeholder: str, fallback: str) -> str:
+    try:
+        return PlaceholderParser.parse_fields(placeholder).default_value
+    except ValueError:
+        return fallback
+
+
+def _clean_for_file_name(text: str) -> str:
+    for i in '{}[]':
+        text = text.replace(i, '')
+    return re.sub(r'[\\/:*?"<>|]', '-', text).strip()
+
+
+@dataclass
+class GenerationTask:
+    job_id: int
+    doc_type: str
+    """'resume', 'cover_letter', ...: the ``Documents.documentType`` of the output."""
+    template: str
+    replacements: Dict[str, Any]
+    output_path: str
+    pdf: bool = False
+    missing: List[str] = field(default_factory=list)
+    """Required placeholders that neither the job nor the given values fill; left as they are."""
+
+
+@dataclass
+class GenerationResult:
+    task: GenerationTask
+    docx_path: Optional[str] = None
+    pdf_path: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def plan_generation(job_ids: Iterable[int], templates: Dict[str, Union[str, Path]],
+                    values: Optional[Dict[str, Any]] = None, output_dir: Optional[str] = None, pdf: bool = False,
+                    db: Optional[DatabaseHandler] = None) -> List[GenerationTask]:
+    """
+    One task per job and template.
+
+    A placeholder is filled, in order of precedence, from ``values`` (keyed on the placeholder text, e.g.
+    ``{{Name}}``), from the job's row when its label names one of ``JOB_FIELDS``, and from its own default.
+
+    :param job_ids: jobs to generate documents for; unknown IDs are skipped.
+    :param templates: document type -> template path.
+    :param values: fixed replacements, e.g. the applicant's details.
+    :param output_dir: defaults to ``docs/Applications/<year>/<month>``. Files are named
+        ``<template> - <job title> - <employer> - <jobID>.docx``.
+    :param pdf: also convert each document to PDF.
+    :param db: Defaults to the application's database.
+    """
+    if db is None:
+        from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as db
+    if output_dir is None:
+        now = datetime.now()
+        output_dir = f'{get_project_root()}/docs/Applications/{now.strftime("%Y")}/{now.strftime("%m-%b")}'
+    output_dir = create_folder_if_dne(output_dir)
+    values = values or {}
+    resolved = {doc_type: str(PathManager.resolve_path(path, PathFlag.FROM_PROJECT_ROOT))
+                for doc_type, path in templates.items()}
+    placeholders = {doc_type: scan_placeholders(path)[0] for doc_type, path in resolved.items()}
+    with db.transaction() as conn:
+        cursor = conn.execute(_JOBS_QUERY, (json.dumps(list(job_ids)),))
+        columns = [d[0] for d in cursor.description]
+        jobs = [dict(zip(columns, row)) for row in cursor]
+
+    tasks = []
+    for job in sorted(jobs, key=lambda j: j['jobID']):
+        job_title = _clean_for_file_name(job['job_title'] or '') or 'dummy_job_title'
+        employer_name = _clean_for_file_name(job['employer_name'] or '') or 'dummy_employer_name'
+        for doc_type, template in resolved.items():
+            replacements, missing = {}, []
+            for placeholder, default in placeholders[doc_type].items():
+                column = JOB_FIELDS.get(_label_key(placeholder))
+                if placeholder in values:
+                    replacements[placeholder] = values[placeholder]
+                elif column and job.get(column) not in (None, ''):
+                    replacements[placeholder] = str(job[column])
+                elif placeholder.startswith('[['):
+                    replacements[placeholder] = _default_value(placeholder, default)
+                else:
+                    missing.append(placeholder)
+            # Titles repeat (re-posts, several openings); the ID keeps one job's file from overwriting another's.
+            file_name = f'{Path(template).stem} - {job_title} - {employer_name} - {job["jobID"]}.docx'
+            tasks.append(GenerationTask(job['jobID'], doc_type, template, replacements,
+                                        os.path.join(output_dir, file_name), pdf, missing))
+    return tasks
+
+
+# Worker processes import this module, not ``core.global_handlers``: that would run the app's database start-up and
+# background threads in every worker. Only ``plan_generation``, ``record_result`` and ``main`` use it, in this process.
+_pdf_backend_name = 'auto'
+_pdf_backend: Optional[PdfBackend] = None
+
+
+def _init_worker(pdf_backend: str) -> None:
+    global _pdf_backend_name
+    _pdf_backend_name = pdf_backend
+
+
+def _convert_to_pdf(docx_path: str) -> str:
+    """Converts in this process, with a backend made on its first PDF."""
+    global _pdf_backend
+    if _pdf_backend is None:
+        _pdf_backend = make_backend(_pdf_backend_name)
+    pdf_path = str(Path(docx_path).with_suffix('.pdf'))
+    _pdf_backend.convert(docx_path, pdf_path)
+    return pdf_path
+
+
+def render(task: GenerationTask) -> GenerationResult:
+    """Fills in and saves one document; runs in a worker process. Errors are returned, not raised."""
+    result = GenerationResult(task)
+    try:
+        if not os.path.exists(task.template):
+            raise FileNotFoundError(f'Template not found: {task.template}')
+        render_docx(task.template, task.output_path, task.replacements)
+        result.docx_path = task.output_path
+        if task.pdf:
+            result.pdf_path = _convert_to_pdf(task.output_path)
+    except Exception as e:
+        result.error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+    return result
+
+
+def record_result(result: GenerationResult, db: Optional[DatabaseHandler] = None) -> None:
+    """Stores a successful result in Documents, Document_Storage and Document_Variables, in one transaction."""
+    if not result.ok:
+        return
+    from core.database_interaction_methods import upsert_document_variables
+
+    task = result.task
+    if db is None:
+        from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as db
+    with db.transaction() as conn:
+        row = conn.execute('SELECT documentID FROM Documents WHERE jobID = ? AND documentType = ?',
+                           (task.job_id, task.doc_type)).fetchone()
+        document_id = row[0] if row else conn.execute('INSERT INTO Documents (jobID, documentType) VALUES (?, ?)',
+                                                      (task.job_id, task.doc_type)).lastrowid
+        for file_type, path in (('docx', result.docx_path), ('pdf', result.pdf_path)):
+            if not path:
+                continue
+            updated = conn.execute("""UPDATE Document_Storage
+                                      SET path = ?, file_name = ?, date_created = datetime('now')
+                                      WHERE documentID = ? AND fileType = ?""",
+                                   (os.path.dirname(path), os.path.basename(path), document_id, file_type))
+            if not updated.rowcount:
+                conn.execute('INSERT INTO Document_Storage (documentID, fileType, path, file_name) '
+                             'VALUES (?, ?, ?, ?)', (document_id, file_type, os.path.dirname(path),
+                                                     os.path.basename(path)))
+        upsert_document_variables(document_id, task.replacements, db)
+
+
+def generate(tasks: List[GenerationTask], workers: Optional[int] = None,
+             progress: Optional[Callable[[int, int, GenerationResult], None]] = None,
+             db: Optional[DatabaseHandler] = None) -> List[GenerationResult]:
+    """
+    Renders ``tasks`` across a pool of ``workers`` processes (default: one per CPU) and records each document as it
+    finishes. A failed task doesn't stop the others; its ``error`` says why.
+
+    :param progress: called in this process with (finished, total, result) after each task.
+    :return: the results, in the order of ``tasks``.
+    """
+    from core.global_handlers import PDF_BACKEND
+
+    results: List[Optional[GenerationResult]] = [None] * len(tasks)
+    # Spawned, not forked: this process has open database connections and background writer threads.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(PDF_BACKEND,)) as pool:
+        futures = {pool.submit(render, task): i for i, task in enumerate(tasks)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                result = future.result()
+                record_result(result, db)
+            except Exception as e:  # a crashed worker, or a failed database write
+                result = GenerationResult(tasks[i], error=''.join(traceback.format_exception_only(type(e), e)).strip())
+            results[i] = result
+            if progress:
+                progress(done, len(tasks), result)
+    return results
+
+
+def _template_argument(text: str):
+    doc_type, sep, path = text.partition('=')
+    if not sep or not doc_type or not path:
+        raise argparse.ArgumentTypeError(f'expected DOC_TYPE=PATH, got {text!r}')
+    return doc_type, path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m core.bulk_generation',
+                                     description='Generate application documents for many jobs at once.')
+    jobs = parser.add_mutually_exclusive_group(required=True)
+    jobs.add_argument('--jobs', type=int, nargs='+', metavar='JOB_ID', help='IDs of the jobs')
+    jobs.add_argument('--status', help="every job with this status, e.g. 'applied'")
+    parser.add_argument('--template', type=_template_argument, action='append', required=True,
+                        metavar='DOC_TYPE=PATH', help='a template and its document type; repeat for each template')
+    parser.add_argument('--values', type=Path, help='JSON file of placeholder -> value, e.g. {"{{Name}}": "Jon"}')
+    parser.add_argument('--output', help='output folder (default: docs/Applications/<year>/<month>)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--pdf', action='store_true', help='also convert each document to PDF')
+    args = parser.parse_args(argv)
+    from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as UDH, prepare_database
+    prepare_database()
+
+    job_ids = args.jobs
+    if args.status:
+        job_ids = [row[0] for row in UDH.iter_query('SELECT jobID FROM Jobs WHERE status = ?', (args.status,))]
+    values = json.loads(args.values.read_text(encoding='utf-8')) if args.values else None
+    tasks = plan_generation(job_ids, dict(args.template), values, args.output, args.pdf)
+
+    def report(done: int, total: int, result: GenerationResult):
+        outcome = result.docx_path if result.ok else f'FAILED: {result.error}'
+        print(f'[{done}/{total}] job {result.task.job_id} {result.task.doc_type}: {outcome}')
+        if result.ok and result.task.missing:
+            print(f'    unfilled: {", ".join(result.task.missing)}')
+
+    results = generate(tasks, args.workers, report)
+    failed = sum(not r.ok for r in results)
+    print(f'{len(results) - failed} generated, {failed} failed.')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
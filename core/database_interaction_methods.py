@@ -1,8 +1,14 @@
+import json
 import sqlite3
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Iterator
 
-from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as UDH
+from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as UDH, ASYNC_DATABASE_HANDLER as ADH, WRITE_QUEUE
+from core.migrations import parse_annual_pay
+from utils.database_handler import DatabaseHandler
+from utils.enums import RowMode
+from utils.pagination import Page, fetch_page
 
 
 # region <generic methods>
@@ -15,14 +21,51 @@ def select(table_or_view: str, columns: Optional[Dict[str, str] | List[str] | st
            offset: int = 0
            ):
     """
+    For paging through large tables, prefer ``select_page``: ``OFFSET`` gets slower the deeper the page.
+
     :param table_or_view: Name of the table or view to select.
     :param columns: List or dict with column names as keys and aliases as values.
     :param where: Conditions.
     :param params: Query parameters.
     :param limit: Maximum number of rows to return.
     :param offset: Offset.
-    :return: List of lists or list of dictionaries (depending on the current mode). Each sub-structure represents a single row.
+    :return: List of rows (``sqlite3.Row``).
+    """
+    q_parts = [_select_query(table_or_view, columns, where)]
+    if limit and limit >= 0:
+        q_parts.append(f"LIMIT {limit}")
+        if offset:
+            q_parts.append(f"OFFSET {offset}")
+    query_text = " ".join(q_parts)
+    return _select_(query_text, params or ())
+
+
+def select_page(table_or_view: str,
+                order_by: str | List[str],
+                columns: Optional[Dict[str, str] | List[str] | str] = None,
+                where: Optional[str] = None,
+                params: Optional[tuple] = None,
+                limit: int = 10,
+                cursor: Optional[str] = None
+                ) -> Page:
     """
+    Keyset pagination: every page costs the same, however deep (see ``utils.pagination.Keyset``).
+
+    :param table_or_view: Name of the table or view to select.
+    :param order_by: Sort key(s) - result column names, optionally with ``DESC``; unique together.
+    :param columns: List or dict with column names as keys and aliases as values. Must include the sort keys.
+    :param where: Conditions.
+    :param params: Query parameters.
+    :param limit: Maximum number of rows per page.
+    :param cursor: ``cursor`` of the previous page; None for the first page.
+    :return: The rows (``sqlite3.Row``) and the cursor of the next page (None on the last page).
+    """
+    UDH.execute_mode(RowMode.ROW)
+    return fetch_page(UDH, _select_query(table_or_view, columns, where), params, order_by, limit, cursor)
+
+
+def _select_query(table_or_view: str, columns: Optional[Dict[str, str] | List[str] | str] = None,
+                  where: Optional[str] = None) -> str:
     q_parts = ["SELECT"]
     if not columns:
         q_parts.append("*")
@@ -51,12 +94,7 @@ def select(table_or_view: str, columns: Optional[Dict[str, str] | List[str] | st
     q_parts.append(f'FROM {table_or_view}')
     if where:
         q_parts.append(where)
-    if limit and limit >= 0:
-        q_parts.append(f"LIMIT {limit}")
-        if offset:
-            q_parts.append(f"OFFSET {offset}")
-    query_text = " ".join(q_parts)
-    return UDH.execute_query(query_text, params, fetchall=-1)
+    return " ".join(q_parts)
 
 
 def _insert_(q, p) -> int:
@@ -67,11 +105,24 @@ def _insert_(q, p) -> int:
         return -1
 
 
+async def _insert_async_(q, p) -> int:
+    try:
+        r = await ADH.execute_query(q, p, -1)
+        return max(r, -1)
+    except sqlite3.IntegrityError:
+        return -1
+
+
 def _select_(q: str, p=(), f=-1):
-    UDH.execute_mode('row')
+    UDH.execute_mode(RowMode.ROW)
     return UDH.execute_query(q, p, f)
 
 
+def _iter_select_(q: str, p=(), batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    UDH.execute_mode(RowMode.ROW)
+    return UDH.iter_query(q, p, batch_size)
+
+
 def update(table: str, pk_column: str, pk_value: Any, updates: Dict[str, Any]) -> bool:
     """
     Updates a record in the SQLite database. Requires a primary key for the update.
@@ -91,7 +142,7 @@ def update(table: str, pk_column: str, pk_value: Any, updates: Dict[str, Any]) -
         SET {set_clause}
         WHERE {pk_column} = ?
     """
-    return UDH.execute_query(q, p, fetchall=-1)
+    return UDH.execute_query(q, p, -1)
 
 
 def delete(table: str, pk_columns: List[str], pk_values: List[int]) -> int:
@@ -109,12 +160,19 @@ def delete(table: str, pk_columns: List[str], pk_values: List[int]) -> int:
         DELETE FROM {table}
         WHERE {' AND '.join(f"{pk} = ?" for pk in pk_columns)}  
     """
-    return UDH.execute_query(q, tuple(pk_values, ), fetchall=-1)
+    return UDH.execute_query(q, tuple(pk_values, ), -1)
 
 
 # endregion method
 # region <insert  methods>
 
+_INSERT_EMPLOYER = 'INSERT INTO Employers (employer_name, industry, location, notes) VALUES (?, ?, ?, ?)'
+_INSERT_JOB = """
+        INSERT INTO Jobs (job_title, employerID, location, URL, status, annual_pay, annual_pay_min, annual_pay_max,
+                         ft_pt, job_type, work_model, date_added, date_applied, job_text, notes, archived)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
 def insert_employers(employer_name: str,
                      industry: Optional[str] = None,
                      location: Optional[str] = None,
@@ -124,9 +182,19 @@ def insert_employers(employer_name: str,
     Insert a new employer and return status and ID.
     Returns rowid or -1.
     """
-    q = 'INSERT INTO Employers (employer_name, industry, location, notes) VALUES (?, ?, ?, ?)'
-    p = (employer_name, industry, location, notes)
-    return _insert_(q, p)
+    return _insert_(_INSERT_EMPLOYER, (employer_name, industry, location, notes))
+
+
+async def insert_employers_async(employer_name: str,
+                                 industry: Optional[str] = None,
+                                 location: Optional[str] = None,
+                                 notes: Optional[str] = None
+                                 ) -> int:
+    """
+    Same as ``insert_employers``, for async event handlers: the insert runs on ``ASYNC_DATABASE_HANDLER``'s writer
+    thread.
+    """
+    return await _insert_async_(_INSERT_EMPLOYER, (employer_name, industry, location, notes))
 
 
 def insert_jobs(job_title: str,
@@ -148,13 +216,35 @@ def insert_jobs(job_title: str,
     Insert a new job and return status and ID.
     Returns (success, job_id) where success is a boolean and job_id is the ID if successful.
     """
-    q = """
-        INSERT INTO Jobs (job_title, employerID, location, URL, status, annual_pay, ft_pt, job_type, work_model, 
-                         date_added, date_applied, job_text, notes, archived)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
-    p = (job_title, employer_id, location, url, status, annual_pay or 0, ft_pt, job_type, work_model,
-         date_added, date_applied, job_text, notes, archived)
-    return _insert_(q, p)
+    return _insert_(_INSERT_JOB, _job_params(job_title, employer_id, location, url, status, annual_pay, ft_pt,
+                                             job_type, work_model, date_added, date_applied, job_text, notes, archived))
+
+
+async def insert_jobs_async(*args, **kwargs) -> int:
+    """
+    Same as ``insert_jobs`` (same arguments), for async event handlers: the insert runs on
+    ``ASYNC_DATABASE_HANDLER``'s writer thread.
+    """
+    return await _insert_async_(_INSERT_JOB, _job_params(*args, **kwargs))
+
+
+def _job_params(job_title: str,
+                employer_id: int,
+                location: str = 'Toronto, ON',
+                url: str = '',
+                status: str = 'applied',
+                annual_pay: Optional[int] = None,
+                ft_pt: str = 'Full Time',
+                job_type: str = 'Permanent',
+                work_model: str = 'In Person',
+                date_added: Optional[datetime] = None,
+                date_applied: Optional[datetime] = None,
+                job_text: str = '',
+                notes: str = '',
+                archived: bool = False
+                ) -> tuple:
+    return (job_title, employer_id, location, url, status, annual_pay or 0, *parse_annual_pay(annual_pay), ft_pt,
+            job_type, work_model, date_added or datetime.now(), date_applied, job_text, notes, archived)
 
 
 def insert_documents(job_id: int, document_type: str) -> int:
@@ -180,6 +270,27 @@ def insert_document_storage(document_id: int, file_type: str, path: str, file_na
     return _insert_(q, p)
 
 
+def queue_document_storage(document_id: int, file_type: str, path: str, file_name: str) -> Future:
+    """
+    Queues (``WRITE_QUEUE``) the storage entry of one file type of a document: updates the existing entry of that
+    type, or inserts one. Both statements are queued as one unit.
+
+    :return: a Future that's done once the entry is written; its result is ``[rows updated, new storageID or 0]``,
+             and it raises the error of either statement.
+    """
+    return WRITE_QUEUE.submit_all([
+        ("""
+        UPDATE Document_Storage
+        SET path = ?, file_name = ?, date_created = datetime('now')
+        WHERE documentID = ? AND fileType = ?""", (path, file_name, document_id, file_type)),
+        ("""
+        INSERT INTO Document_Storage (documentID, fileType, path, file_name)
+        SELECT ?, ?, ?, ?
+        WHERE NOT EXISTS (SELECT 1 FROM Document_Storage WHERE documentID = ? AND fileType = ?)""",
+         (document_id, file_type, path, file_name, document_id, file_type)),
+    ])
+
+
 def insert_variables(variable_name: str) -> int:
     """
     Insert a new variable and return status and ID.
@@ -203,6 +314,35 @@ def insert_document_variables(document_id: int, variable_id: int, placeholder_na
     return _insert_(q, p)
 
 
+def upsert_document_variables(document_id: int, replacements: Dict[str, Any],
+                              db: Optional[DatabaseHandler] = None) -> Dict[str, int]:
+    """
+    Makes sure every placeholder in ``replacements`` has a Variables row and is linked to the document, in one
+    transaction: a single upsert resolves all variable IDs (``RETURNING``), and the links are inserted with
+    ``executemany``. Existing links are kept.
+
+    :param document_id: The document the placeholders were used in.
+    :param replacements: Placeholder text (e.g. ``{{Company}}``) to value; only the keys are used.
+    :param db: Defaults to the application's database.
+    :return: variable name (placeholder without braces/brackets) to variableID.
+    """
+    names = list(dict.fromkeys(placeholder.strip('{}[]') for placeholder in replacements))
+    if not names:
+        return {}
+    upsert = """
+        INSERT INTO Variables (variable_name)
+        SELECT value FROM json_each(?) WHERE TRUE
+        ON CONFLICT (variable_name) DO UPDATE SET variable_name = excluded.variable_name
+        RETURNING variableID, variable_name"""
+    link = """
+        INSERT OR IGNORE INTO Document_Variables (documentID, variableID, placeholder_name)
+        VALUES (?, ?, ?)"""
+    with (db or UDH).transaction() as conn:
+        variable_ids = {name: variable_id for variable_id, name in conn.execute(upsert, (json.dumps(names),))}
+        conn.executemany(link, [(document_id, variable_ids[name], name) for name in names])
+    return variable_ids
+
+
 # endregion insert methods
 # region <select all methods>
 def select_all_employers():
@@ -236,26 +376,67 @@ def select_all_variables():
 
 
 # endregion <select all> methods
+# region <streaming select all methods>
+# Same as the above, but rows are streamed from the database in batches (constant memory). Use for exports and scans.
+
+_JOBS_COLUMNS_WITHOUT_TEXT = """jobID, job_title, employerID, location, URL, status, annual_pay, ft_pt, job_type, work_model,
+                              date_added, date_applied, notes, archived, last_updated, annual_pay_min, annual_pay_max"""
+
+
+def iter_all_employers(batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    q = """SELECT * FROM Employers"""
+    return _iter_select_(q, batch_size=batch_size)
+
+
+def iter_all_jobs(include_job_text: bool = False, batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    """
+    :param include_job_text: ``job_text`` holds the full posting and is skipped unless needed.
+    """
+    q = f"""SELECT {'*' if include_job_text else _JOBS_COLUMNS_WITHOUT_TEXT} FROM Jobs"""
+    return _iter_select_(q, batch_size=batch_size)
+
+
+def iter_all_document_storage(batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    q = """SELECT * FROM Document_Storage"""
+    return _iter_select_(q, batch_size=batch_size)
+
+
+def iter_all_document_variables(batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    q = """SELECT * FROM Document_Variables"""
+    return _iter_select_(q, batch_size=batch_size)
+
+
+def iter_all_documents(batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    q = """SELECT * FROM Documents"""
+    return _iter_select_(q, batch_size=batch_size)
+
+
+def iter_all_variables(batch_size: int = 500) -> Iterator[sqlite3.Row]:
+    q = """SELECT * FROM Variables"""
+    return _iter_select_(q, batch_size=batch_size)
+
+
+# endregion <streaming select all methods>
 # region <select by methods>
-def select_employer(employer_id: int):
+def select_employer(employer_id: int) -> Optional[sqlite3.Row]:
     """
     Select an employer by ID.
-    Returns the employer as a dictionary or None if not found.
+    Returns the employer as a row or None if not found.
     """
     q = """
     SELECT employerID, employer_name, industry, location, notes
     FROM Employers
     WHERE employerID = ?
     """
-    return _select_(q, (employer_id,))
+    return _select_(q, (employer_id,), 1)
 
 
 # endregion delete methods
 
-def select_job(job_id: int) -> Optional[Dict[str, Any]]:
+def select_job(job_id: int) -> Optional[sqlite3.Row]:
     """
     Select a job by ID.
-    Returns the job as a dictionary or None if not found.
+    Returns the job as a row or None if not found.
     """
     q = """
     SELECT j.jobID, j.job_title, j.employerID, e.employer_name, j.location, j.URL, 
@@ -265,7 +446,7 @@ def select_job(job_id: int) -> Optional[Dict[str, Any]]:
     JOIN Employers e ON j.employerID = e.employerID
     WHERE j.jobID = ?
     """
-    return _select_(q, (job_id,))
+    return _select_(q, (job_id,), 1)
 
 
 def select_jobs_by_employer(employer: Union[int, str]):
@@ -337,33 +518,103 @@ def search_employers(employer_id: Optional[int] = None,
                      offset: Optional[int] = None):
     """
     Search for employers by name, industry or location.
+    For paging through the results, prefer ``search_employers_page``.
     """
-    if not any([employer_id, employer_name, industry, location, notes, last_updated]):
+    where, p = _employer_filters(employer_id, employer_name, industry, location, notes, last_updated)
+    if not where:
         return []
-    cols = {'employer_id':   employer_id,
+    q = f"""
+          SELECT *
+          FROM Employers
+          WHERE {where}
+          ORDER BY employer_name 
+          """
+    if limit:
+        q += f""" LIMIT {limit}"""
+        if offset:
+            q += f""" OFFSET {offset}"""
+    return _select_(q, p, -1)
+
+
+def search_employers_page(employer_id: Optional[int] = None,
+                          employer_name: Optional[str] = None,
+                          industry: Optional[str] = None,
+                          location: Optional[str] = None,
+                          notes: Optional[str] = None,
+                          last_updated: Optional[datetime] = None,
+                          limit: int = 20,
+                          cursor: Optional[str] = None) -> Page:
+    """
+    ``search_employers``, one page at a time (keyset pagination, by employer name).
+
+    :param cursor: ``cursor`` of the previous page; None for the first page.
+    """
+    where, p = _employer_filters(employer_id, employer_name, industry, location, notes, last_updated)
+    if not where:
+        return Page()
+    return select_page('Employers', 'employer_name', where=f'WHERE {where}', params=tuple(p), limit=limit,
+                       cursor=cursor)
+
+
+def _employer_filters(employer_id, employer_name, industry, location, notes, last_updated):
+    cols = {'employerID':    employer_id,
             'employer_name': employer_name,
             'industry':      industry,
             'location':      location,
             'notes':         notes,
             'last_updated':  last_updated}
-
     where = []
     p = []
     for k, v in cols.items():
         if v:
             where.append(f'{k} =?')
             p.append(v)
-    q = f"""
-          SELECT *
-          FROM Employers
-          WHERE {' AND '.join(where)}
-          ORDER BY employer_name 
-          """
-    if limit:
-        q += f""" LIMIT {limit}"""
-        if offset:
-            q += f""" OFFSET {offset}"""
-    return _select_(q, p, -1)
+    return ' AND '.join(where), p
+
+
+def job_search_expression(text: str) -> str:
+    """
+    Turns free text from a search box into an FTS5 query: every word must match, and the last one may be a prefix
+    (search as you type). FTS5 operators in ``text`` are taken literally.
+
+    ``'python dev'`` -> ``'"python" "dev"*'``; blank text -> ``''``.
+    """
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if words:
+        words[-1] += '*'
+    return ' '.join(words)
+
+
+def search_jobs(query: str, limit: int = 20, offset: int = 0, db: Optional[DatabaseHandler] = None) -> List[sqlite3.Row]:
+    """
+    Full-text search over job titles, employers, locations, posting text and notes (the ``Jobs_Search`` FTS5 index).
+
+    :param query: Free text; see ``job_search_expression``.
+    :param limit: Maximum number of rows to return.
+    :param offset: Number of ranked results to skip.
+    :param db: Defaults to the application's database.
+    :return: Best matches first. Each row has jobID, job_title, employer_name, status, snippet (matching words in
+        ``[`` ``]``) and rank (bm25; lower is better; title and employer matches weigh more).
+    """
+    expression = job_search_expression(query)
+    if not expression:
+        return []
+    q = """
+        SELECT s.rowid                                         AS jobID,
+               j.job_title,
+               s.employer_name,
+               j.status,
+               snippet(Jobs_Search, -1, '[', ']', '…', 12)    AS snippet,
+               bm25(Jobs_Search, 10.0, 5.0, 2.0, 1.0, 1.0)   AS rank
+        FROM Jobs_Search s
+                 JOIN Jobs j ON j.jobID = s.rowid
+        WHERE Jobs_Search MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?"""
+    p = (expression, limit, offset)
+    if db is None:
+        return _select_(q, p, -1)
+    return db.execute_query(q, p, -1)
 
 
 # endregion <select by methods>
@@ -387,7 +638,7 @@ def update_employer(employer_id: int, employer_name: Optional[str] = None,
     notes = notes if notes is not None else current['notes']
     q = """UPDATE Employers SET employer_name = ?, industry = ?, location = ?, notes = ?
     WHERE employerID = ?"""
-    return UDH.execute_query(q, (employer_id, employer_name, industry, location, notes, employer_id), -1)
+    return UDH.execute_query(q, (employer_name, industry, location, notes, employer_id), -1)
 
 
 def update_job(job_id: int, job_title: Optional[str] = None, location: Optional[str] = None,
@@ -420,13 +671,13 @@ def update_job(job_id: int, job_title: Optional[str] = None, location: Optional[
     update_query = """
     UPDATE Jobs
     SET job_title = ?, location = ?, URL = ?, status = ?, 
-        annual_pay = ?, ft_pt = ?, job_type = ?, work_model = ?,
+        annual_pay = ?, annual_pay_min = ?, annual_pay_max = ?, ft_pt = ?, job_type = ?, work_model = ?,
         date_applied = ?, job_text = ?, notes = ?, archived = ?
     WHERE jobID = ?
     """
     return UDH.execute_query(update_query, (
         job_title, location, url, status,
-        annual_pay, ft_pt, job_type, work_model,
+        annual_pay, *parse_annual_pay(annual_pay), ft_pt, job_type, work_model,
         date_applied, job_text, notes, archived,
         job_id
     ), -1)
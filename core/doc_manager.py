@@ -2,14 +2,16 @@ import json
 import os.path
 from dataclasses import dataclass
 from re import Match
-from typing import Iterator
-from docx import Document
-from docx.table import Table
-from docx.text.paragraph import Paragraph
-from docx2pdf import convert
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterator, List, Optional
 from flet.utils import deprecated
 
-from core.global_handlers import PLACEHOLDERS_FOLDER, LOGGER
+from core.global_handlers import PLACEHOLDERS_FOLDER, PLACEHOLDER_INDEX_FOLDER, LOGGER, PDF_CONVERTER
+from core.placeholder_index import PlaceholderIndex, Location
+from core.placeholder_replacement import replace_in_runs, _remove_ph_escaped_text
+from core.placeholder_scanner import scan_document, scan_placeholders
+from core.template_cache import TEMPLATES
+from core.zip_render import render_docx
 from utils.json_import_export import import_json, save_json
 from utils.path_utils import *
 
@@ -32,15 +34,8 @@ class Placeholder:
         }
 
 
-def _remove_ph_escaped_text(input_string: str) -> str:
-    """
-    Removes all text enclosed by || || from the input string.
-
-    :param input_string (str): The string to process.
-    :return: A string with text inside || || removed.
-    """
-    # Use regex to match ||text|| and replace it with an empty string
-    return re.sub(r'\|.*?\|', '', input_string).strip()
+PLACEHOLDER_INDEX = PlaceholderIndex(PLACEHOLDER_INDEX_FOLDER.resolve_new_path)
+"""Placeholders found in each template; see ``DocManager.get_placeholders``."""
 
 
 class DocManager:
@@ -52,14 +47,27 @@ class DocManager:
         month = datetime.now().strftime("%m-%b")
         self.output_dir = PathManager(f"/docs/Applications/{year}/{month}",
                                       PathFlag.CREATE_FOLDER | PathFlag.FROM_PROJECT_ROOT)
-        self.doc = Document(str(self.template_path)) if self.template_path else None
+        self._doc = None
         self.placeholders: dict = {}
+        self.placeholder_locations: Dict[str, List[Location]] = {}
+        self._pristine = True
+        """False once replacements were applied: ``self.doc`` no longer matches the template file."""
 
         self._json_dir: str = create_folder_if_dne(get_project_root() + f"/docs/Applications/{year}/{month}")
 
     @property
     def callable(self) -> bool:
-        return bool(self.doc)
+        return bool(self.template_path) and self.template_path.is_file()
+
+    @property
+    def doc(self):
+        """
+        The template as a python-docx ``Document``: a copy from ``TEMPLATES``, made on first use. Rendering
+        (``render_docx``), PDFs and indexed placeholders work from the file and never need it.
+        """
+        if self._doc is None and self.callable:
+            self._doc = TEMPLATES.open(self.template_path)
+        return self._doc
 
     def _json_path(self, create_if_not_exist=False):
         """
@@ -81,28 +89,27 @@ class DocManager:
 
         return json_path
 
-    def _map_placeholders(self, paragraph):
+    def get_placeholders(self, force_refresh=False, update_json=False):
         """
-        @APPROVED
-        Helper method to process a paragraph or table cell content.
+        The placeholders of the template, from ``PLACEHOLDER_INDEX`` if this version of the template was scanned
+        before. ``force_refresh`` scans the document again (including replacements applied so far).
         """
-        runs = paragraph.text
-        placeholders = self._find_placeholders(runs)
-        if placeholders:
-            for p in placeholders:
-                placeholder_text = p.group(0)  # Extract the matched string
-                if placeholder_text.startswith('[['):  # Check for '[[' at the start
-                    self.placeholders[placeholder_text] = placeholder_text[2:-2]
-                else:  # e.g., if p.startswith('{{') and p.endswith('}}')
-                    self.placeholders[placeholder_text] = ''
-
-    def get_placeholders(self, force_refresh=False, update_json=False):
         if not self.callable:
             return
-        if len(self.placeholders) <= 0 or force_refresh:
+        if force_refresh:
             self._update_placeholders()
+        elif len(self.placeholders) <= 0:
+            self._load_placeholders()
         return self.placeholders
 
+    def _load_placeholders(self):
+        indexed = PLACEHOLDER_INDEX.load(self.template_path) if self._pristine else None
+        if indexed is not None:
+            self.placeholders = dict(indexed.placeholders)
+            self.placeholder_locations = {k: list(v) for k, v in indexed.locations.items()}
+            return
+        self._update_placeholders()
+
     def _fill_empty_placeholders(self):
         old_placeholders = self._import_json()
         old_keys = old_placeholders.keys()
@@ -115,32 +122,15 @@ class DocManager:
 
     def _update_placeholders(self, fill_empty_placeholders: bool = False):
         """
-        Gets the placeholders from the DocX file and stores them in memory.
-        Optional: refresh the JSON file.
+        Gets the placeholders from the DocX file (or, once replacements were applied, from ``self.doc``) and stores
+        them in memory. Optional: refresh the JSON file.
         """
-        contents = self.doc.iter_inner_content()
-        self.placeholders = {}
-        # Header + Footer
-        if self.has_header(self.doc.sections[0]):
-            if self.doc.sections[0].header:
-                header_text = self.doc.sections[0].header.paragraphs
-                for paragraph in header_text:
-                    self._map_placeholders(paragraph)
-        if self.has_footer(self.doc.sections[0]):
-            if self.doc.sections[0].footer:
-                footer_text = self.doc.sections[0].footer.paragraphs
-                for paragraph in footer_text:
-                    self._map_placeholders(paragraph)
-
-        # Paragraphs + Tables
-        for item in contents:
-            if isinstance(item, Paragraph):
-                self._map_placeholders(item)
-            elif isinstance(item, Table):
-                for row in item.rows:
-                    for cell in row.cells:
-                        for paragraph in cell.paragraphs:
-                            self._map_placeholders(paragraph)
+        # Same traversal and locations (see ``Location``) either way; the file is scanned without python-docx.
+        if self._pristine:
+            self.placeholders, self.placeholder_locations = scan_placeholders(self.template_path)
+            PLACEHOLDER_INDEX.save(self.template_path, self.placeholders, self.placeholder_locations)
+        else:
+            self.placeholders, self.placeholder_locations = scan_document(self.doc)
 
         if fill_empty_placeholders:
             self._fill_empty_placeholders()
@@ -151,6 +141,7 @@ class DocManager:
         Replace placeholders with values from a dictionary."""
         if not self.callable:
             return
+        self._pristine = False
         for paragraph in self.doc.paragraphs:
             self._replace_in_paragraph(paragraph, new_values)
         for table in self.doc.tables:
@@ -175,86 +166,7 @@ class DocManager:
 
     def _replace_in_paragraph(self, paragraph, new_values):
         """Process a single paragraph to replace placeholders across runs."""
-        runs = paragraph.runs
-        if not runs:
-            return
-
-        # Build a list of run texts and their cumulative positions
-        run_texts = [run.text for run in runs]
-        full_text = ''.join(run_texts)
-
-        # Find all placeholders
-        matches = list(self._find_placeholders(full_text))
-
-        # Iterate over matches in reverse order to prevent index shifting
-        for match in reversed(matches):
-            placeholder = match.group(0)
-            if placeholder not in new_values:
-                continue
-            replacement = new_values[placeholder]
-
-            start, end = match.start(), match.end()
-
-            # Find the runs that cover this placeholder
-            run_start_idx, run_end_idx, offset_start, offset_end = self._find_run_indices(run_texts, start, end)
-            if run_start_idx is None:
-                continue  # Could not find runs covering this placeholder
-
-            # Replace text in runs
-            self._replace_text_in_runs(runs, run_start_idx, run_end_idx, offset_start, offset_end,
-                                       replacement)
-
-    @staticmethod
-    def _find_run_indices(run_texts, start, end):
-        """Find the run indices and offsets that cover the placeholder."""
-        current_pos = 0
-        run_start_idx = run_end_idx = None
-        offset_start = offset_end = 0
-        for i, text in enumerate(run_texts):
-            run_length = len(text)
-            run_end_pos = current_pos + run_length
-            if run_start_idx is None and start < run_end_pos:
-                run_start_idx = i
-                offset_start = start - current_pos
-            if run_end_idx is None and end <= run_end_pos:
-                run_end_idx = i
-                offset_end = end - current_pos
-                break
-            current_pos += run_length
-        if run_start_idx is not None and run_end_idx is not None:
-            return run_start_idx, run_end_idx, offset_start, offset_end
-        else:
-            return None, None, None, None
-
-    @staticmethod
-    def _replace_text_in_runs(runs, run_start_idx, run_end_idx, offset_start, offset_end, replacement: str):
-
-        """Replace the placeholder text in the specified runs with the replacement."""
-        # Collect runs involved in the placeholder
-        affected_runs = runs[run_start_idx:run_end_idx + 1]
-
-        # Handle the case where the placeholder spans multiple runs
-        if run_start_idx < run_end_idx:
-            # Modify the first run
-            first_run = affected_runs[0]
-            before_placeholder = first_run.text[:offset_start]
-            first_run.text = before_placeholder + _remove_ph_escaped_text(replacement)
-
-            # Modify the last run
-            last_run = affected_runs[-1]
-            after_placeholder = last_run.text[offset_end:]
-            last_run.text = after_placeholder
-
-            # Clear intermediate runs
-            for run in affected_runs[1:-1]:
-                if not run.text == '':
-                    run._element.getparent().remove(run._element)
-
-        else:  # Single run case
-            single_run = affected_runs[0]
-            before_placeholder = single_run.text[:offset_start]
-            after_placeholder = single_run.text[offset_end:]
-            single_run.text = before_placeholder + _remove_ph_escaped_text(replacement) + after_placeholder
+        replace_in_runs(paragraph.runs, new_values)
 
     def replace_hyperlink(self, old_link, old_text, new_link, new_text):
         """
@@ -271,6 +183,7 @@ class DocManager:
         """
         if not self.callable:
             return
+        self._pristine = False
         namespace = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
         rel_namespace = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
 
@@ -331,18 +244,58 @@ class DocManager:
         LOGGER.log('Saved to ' + self.save_docx_path)
         return self.save_docx_path
 
+    def render_docx(self, output_name: str, new_values: dict) -> Optional[str]:
+        """
+        Saves a copy of the template with ``new_values`` applied, straight from the template file rather than
+        ``self.doc`` (see ``core.zip_render.render_docx``): parts without placeholders, such as images, are copied as
+        they are. Replaces ``apply_replacements`` + ``save_docx``.
+        """
+        if not self.callable:
+            return
+        self.save_docx_path = str(self.output_dir.resolve_new_path.with_name(output_name))
+        render_docx(self.template_path, self.save_docx_path, new_values)
+        LOGGER.log('Saved to ' + self.save_docx_path)
+        return self.save_docx_path
+
     def save_pdf(self, output_name: str):
         """
-        save the .docx as a PDF.
+        save the .docx as a PDF, converted on this thread with ``PDF_CONVERTER``'s backend (not queued behind its
+        pending conversions). Prefer ``save_pdf_async`` in UI callbacks.
         """
         if not self.callable:
             return
-        rename_file_by_creation(PathManager.resolve_path('/PDF Output/' + output_name, PathFlag.R | PathFlag.C))
-        out = normalize_path(get_project_root() + '/PDF Output/' + output_name)
+        out = self._pdf_output_path(output_name)
+        PDF_CONVERTER.backend.convert(self.save_docx_path, out)
         LOGGER.log('Saved to ' + out)
-        convert(self.save_docx_path, out)
         return out
 
+    def save_pdf_async(self, output_name: str, on_done: Callable[[Future], None] = None) -> Optional[Future]:
+        """
+        Queues the saved .docx for conversion to a PDF (``PDF_CONVERTER``).
+
+        :param on_done: called with the Future when the conversion is done, on a conversion thread.
+        :return: a Future for the PDF's path.
+        """
+        if not self.callable:
+            return
+        out = self._pdf_output_path(output_name)
+
+        def log(future: Future):
+            if future.exception() is None:
+                LOGGER.log('Saved to ' + out)
+            else:
+                LOGGER.log(future.exception())
+
+        future = PDF_CONVERTER.submit(self.save_docx_path, out, log)
+        if on_done:
+            future.add_done_callback(on_done)
+        return future
+
+    @staticmethod
+    def _pdf_output_path(output_name: str) -> str:
+        rename_file_by_creation(PathManager.resolve_path('/PDF Output/' + output_name, PathFlag.R | PathFlag.C))
+        return normalize_path(get_project_root() + '/PDF Output/' + output_name)
+
     def save_placeholders_to_json(self):
         """
         Save the extracted placeholders to a JSON file.
@@ -399,7 +352,6 @@ class DocManager:
         Determines if a header exists in the section without triggering its initialization.
         Checks the raw XML for a header relationship.
         """
-        print('called has_header')
         return section.header == True
 
     @staticmethod
@@ -408,7 +360,6 @@ class DocManager:
         Determines if a footer exists in the section without triggering its initialization.
         Checks the raw XML for a footer relationship.
         """
-        print('called has_footer')
         return section.footer == True
 
     @deprecated('not needed; use _import_json instead', version='2025-01-10', delete_version='Not sure yet')
@@ -433,40 +384,6 @@ class DocManager:
         return self.placeholders
 
 
-l1 = ["Python, Flet, Flask",
-      "Algorithm analysis and design",
-      "Object-oriented programming (OOP)",
-      "Java, Kotlin",
-      "Database design and optimization",
-      "Automated testing (Pytest)",
-      "C, C++",
-      "Version Control, Git, BitBucket",
-      "Agile & Scrum methodologies",
-      "HTML, CSS, JavaScript",
-      "Cross-functional collaboration",
-      "Troubleshooting and debugging",
-      "SQL, SQLite, MySQL",
-      "Data structures and Graph Theory",
-      "Requirements gathering"]
-l2 = ["Python, Flet, Flask",
-      "Algorithm analysis and design",
-      "Object-oriented programming (OOP)",
-      "Java, Kotlin",
-      "Database design and optimization",
-      "Automated testing (Pytest)",
-      "C, C++",
-      "Version Control, Git, BitBucket",
-      "Agile & Scrum methodologies",
-      "HTML, CSS, JavaScript",
-      "Cross-functional collaboration",
-      "Troubleshooting and debugging",
-      "SQL, SQLite, MySQL",
-      "Data structures and Graph Theory",
-      "Requirements gathering"]
-
-print(l1 == l2)
-
-
 #
 # #
 # # Example Usage
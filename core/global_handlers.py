@@ -1,13 +1,54 @@
-from utils.database_handler import DatabaseHandler
+import os
+
+from core.migrations import APP_MIGRATIONS
+from utils.async_database_handler import AsyncDatabaseHandler
+from utils.change_feed import ChangeFeed
+from utils.database_handler import DatabaseHandler, WriteQueue, PRAGMA_PROFILES, apply_pragmas
+from utils.enums import RowMode
+from utils.migrations import MigrationRunner
 from utils.path_utils import PathManager, PathFlag
+from utils.pdf_conversion import PdfConversionQueue, make_backend
 
 from utils.simple_logger import SimpleLogger
 
+DATABASE_PATH = os.environ.get('APPLICATION_TRACKER_DATABASE', 'data/applications.sqlite')
+"""The app database; the tests point it at a copy (see tests/conftest.py)."""
+
+DATABASE_PRAGMA_PROFILE = 'interactive'
+"""See ``utils.database_handler.PRAGMA_PROFILES``."""
+
+DATABASE_PRAGMAS = {name: value for name, value in PRAGMA_PROFILES[DATABASE_PRAGMA_PROFILE].items()
+                    if name != 'journal_mode'}
+"""The profile's PRAGMAs set on every connection; the journal mode is kept in the file, ``prepare_database`` sets it."""
+
+ASYNC_DATABASE_READERS = 2
+
+DATABASE_POOL_SIZE = ASYNC_DATABASE_READERS + 4
+"""
+Connections to the app database that may be checked out at once: ``ASYNC_DATABASE_HANDLER``'s readers and writer,
+``WRITE_QUEUE``'s thread, the UI thread, and one more for a streaming ``iter_query`` or an ``asyncio.to_thread`` call.
+"""
+
 UNIVERSAL_DATABASE_HANDLER = (
-    DatabaseHandler('data/applications.sqlite', creation_script_path='data/make_db_script.sql'))
+    DatabaseHandler(DATABASE_PATH, creation_script_path='data/make_db_script.sql',
+                    execute_mode=RowMode.ROW, pool_size=DATABASE_POOL_SIZE, pragma_profile=DATABASE_PRAGMAS))
+
+CHANGE_FEED = ChangeFeed(UNIVERSAL_DATABASE_HANDLER, start=False)
+"""Rows changed in the app database; ``poll`` it after writing so the data views patch those rows."""
+
+ASYNC_DATABASE_HANDLER = AsyncDatabaseHandler(UNIVERSAL_DATABASE_HANDLER, readers=ASYNC_DATABASE_READERS)
+
+WRITE_QUEUE = WriteQueue(UNIVERSAL_DATABASE_HANDLER)
+"""Group-committed writes to the app database; for writes whose result isn't needed right away."""
 
 LOGGER = SimpleLogger('log.log')
 
+PDF_BACKEND = 'auto'
+"""See ``utils.pdf_conversion.make_backend``."""
+
+PDF_CONVERTER = PdfConversionQueue(lambda: make_backend(PDF_BACKEND))
+"""Background .docx -> PDF conversions; the converter starts with the first one."""
+
 DOCS_TEMPLATES = PathManager('docs/templates', PathFlag.FROM_PROJECT_ROOT | PathFlag.CREATE_FOLDER)
 DOCS_APPLICATIONS = PathManager('docs/Applications',
                                 PathFlag.FROM_PROJECT_ROOT | PathFlag.CASCADE_BY_DATE | PathFlag.CREATE_FOLDER)
@@ -15,3 +56,18 @@ PDF_FOLDER = PathManager('PDF Output', PathFlag.FROM_PROJECT_ROOT | PathFlag.CRE
 RESOURCES_FOLDER = PathManager('resources', PathFlag.FROM_PROJECT_ROOT)
 DATA_FOLDER = PathManager('data', PathFlag.FROM_PROJECT_ROOT)
 PLACEHOLDERS_FOLDER = PathManager('data/placeholders', PathFlag.FROM_PROJECT_ROOT)
+PLACEHOLDER_INDEX_FOLDER = PathManager('data/placeholder_index', PathFlag.FROM_PROJECT_ROOT | PathFlag.CREATE_FOLDER)
+
+
+def prepare_database():
+    """
+    Readies the app database; run once at start-up, before the first query. Importing this module doesn't touch the
+    database file.
+
+    Switches it to the profile's journal mode (WAL), applies pending migrations (data/migrations, ``APP_MIGRATIONS``)
+    and starts ``CHANGE_FEED`` from the end of the change log.
+    """
+    with UNIVERSAL_DATABASE_HANDLER.connection() as conn:
+        apply_pragmas(conn, {'journal_mode': PRAGMA_PROFILES[DATABASE_PRAGMA_PROFILE]['journal_mode']})
+    MigrationRunner(UNIVERSAL_DATABASE_HANDLER, 'data/migrations', APP_MIGRATIONS).migrate()
+    CHANGE_FEED.start()
@@ -0,0 +1,42 @@
+import re
+from typing import Optional, Tuple, Any
+
+from utils.migrations import Migration, BatchedMigration
+
+_PAY_AMOUNT = re.compile(r'(\d+(?:[.,]\d+)*)\s*([kK])?')
+
+
+def parse_annual_pay(annual_pay: Any) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Reads a numeric range from the free-text ``annual_pay``.
+
+    ``'$80,000 - $95,000'`` -> ``(80000.0, 95000.0)``; ``'90k'`` -> ``(90000.0, 90000.0)``; ``None``, ``0`` or text
+    without a number -> ``(None, None)``.
+    """
+    if annual_pay is None:
+        return None, None
+    if isinstance(annual_pay, (int, float)):
+        return (float(annual_pay),) * 2 if annual_pay else (None, None)
+    amounts = []
+    for number, thousands in _PAY_AMOUNT.findall(str(annual_pay)):
+        value = float(number.replace(',', ''))
+        amounts.append(value * 1000 if thousands else value)
+    amounts = [a for a in amounts if a]
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+
+def _split_annual_pay(row: Tuple[Any, ...]) -> Optional[Tuple[Optional[float], Optional[float]]]:
+    pay_range = parse_annual_pay(row[0])
+    return pay_range if pay_range != (None, None) else None
+
+
+APP_MIGRATIONS = [
+    Migration(3, 'split_annual_pay', batched=BatchedMigration(
+        table='Jobs', key='jobID',
+        columns=['annual_pay'], targets=['annual_pay_min', 'annual_pay_max'],
+        transform=_split_annual_pay,
+        where='annual_pay IS NOT NULL AND annual_pay_min IS NULL')),
+]
+"""Data migrations that need Python; the schema migrations are the .sql files in data/migrations."""
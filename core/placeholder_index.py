@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+Location = List[Union[str, int]]
+"""
+Where a placeholder was found, as ``core.placeholder_scanner`` reports it: the part (``'body'``, or the name of a
+header or footer part: ``'header1'``, ``'footer2'``...) and the index of each enclosing block, row and cell, e.g.
+``['body', 4]`` for the fifth block of the body, ``['body', 2, 0, 1, 0]`` for the first block of cell 1 of row 0 of
+block 2. Paragraphs and tables share the block numbering.
+"""
+
+_INDEX_VERSION = 2
+"""2: locations of ``core.placeholder_scanner`` (1 had python-docx's ``row.cells`` numbering, no header parts)."""
+
+
+@dataclass
+class IndexedPlaceholders:
+    content_hash: str
+    placeholders: Dict[str, str] = field(default_factory=dict)
+    """Placeholder text -> default value, as ``DocManager.placeholders``."""
+    locations: Dict[str, List[Location]] = field(default_factory=dict)
+
+
+def content_hash(path: Union[str, Path]) -> str:
+    """SHA-256 of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PlaceholderIndex:
+    """
+    Stores the placeholders found in each template in a JSON file named after the template's content hash, so a
+    template is scanned once per version of its contents rather than once per ``DocManager``.
+
+    Hashing a template is much cheaper than parsing and scanning it; a renamed or copied template keeps its index.
+    """
+
+    def __init__(self, folder: Union[str, Path]):
+        self.folder = Path(folder)
+
+    def _path(self, digest: str) -> Path:
+        return self.folder / f'{digest}.json'
+
+    def load(self, template: Union[str, Path]) -> Optional[IndexedPlaceholders]:
+        """:return: the stored placeholders of ``template``, or None if this version of it wasn't indexed."""
+        digest = content_hash(template)
+        try:
+            with open(self._path(digest), encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != _INDEX_VERSION or data.get('hash') != digest:
+            return None
+        return IndexedPlaceholders(digest, data['placeholders'], data['locations'])
+
+    def save(self, template: Union[str, Path], placeholders: Dict[str, str],
+             locations: Dict[str, List[Location]]) -> IndexedPlaceholders:
+        """Stores the placeholders of the current contents of ``template``."""
+        indexed = IndexedPlaceholders(content_hash(template), dict(placeholders), dict(locations))
+        self.folder.mkdir(parents=True, exist_ok=True)
+        data = {'version':      _INDEX_VERSION, 'hash': indexed.content_hash,
+                'placeholders': indexed.placeholders, 'locations': indexed.locations}
+        # Written to a temporary file first so a concurrent reader never sees half an index.
+        fd, temp = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp, self._path(indexed.content_hash))
+        except BaseException:
+            os.unlink(temp)
+            raise
+        return indexed
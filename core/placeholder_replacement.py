@@ -0,0 +1,67 @@
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List
+
+from core.placeholder_scanner import PLACEHOLDER_PATTERN
+
+
+def _remove_ph_escaped_text(input_string: str) -> str:
+    """
+    Removes all text enclosed by || || from the input string.
+
+    :param input_string (str): The string to process.
+    :return: A string with text inside || || removed.
+    """
+    # Use regex to match ||text|| and replace it with an empty string
+    return re.sub(r'\|.*?\|', '', input_string).strip()
+
+
+def replace_in_runs(runs, new_values) -> bool:
+    """
+    Replaces the placeholders of one paragraph, given as its runs: anything with a settable ``text`` (python-docx
+    runs, or ``w:t`` elements wrapped by ``core.zip_render``).
+
+    A replacement takes the place of the placeholder in the run where the placeholder starts; the placeholder's text
+    is cut from every other run it spans, however many. Runs are located with a prefix-offset array and ``bisect``,
+    and each run's new text is built in one left-to-right sweep: O(runs + matches · log runs) per paragraph. Only
+    runs whose text changes are written.
+
+    :return: whether anything was replaced.
+    """
+    if not runs:
+        return False
+    texts = [run.text for run in runs]
+    full_text = ''.join(texts)
+    # starts[i] is the offset of run i in full_text; starts[-1] is its length.
+    starts = list(accumulate(map(len, texts), initial=0))
+    pieces: List[List[str]] = [[] for _ in runs]
+
+    def keep(begin: int, end: int) -> None:
+        """Copies ``full_text[begin:end]`` to the runs it came from."""
+        i = bisect_right(starts, begin) - 1
+        while begin < end:
+            stop = min(end, starts[i + 1])
+            pieces[i].append(full_text[begin:stop])
+            begin = stop
+            i += 1
+
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(full_text):
+        placeholder = match.group(0)
+        if placeholder not in new_values:
+            continue
+        start, end = match.span()
+        keep(position, start)
+        # The last run starting at or before ``start``, skipping empty runs at that offset.
+        pieces[bisect_right(starts, start) - 1].append(_remove_ph_escaped_text(new_values[placeholder]))
+        position = end
+    if position == 0:
+        return False
+    keep(position, len(full_text))
+
+    for run, old_text, new_pieces in zip(runs, texts, pieces):
+        new_text = ''.join(new_pieces)
+        if new_text != old_text:
+            run.text = new_text
+    return True
@@ -0,0 +1,119 @@
+import re
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from lxml import etree
+
+from core.placeholder_index import Location
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+PLACEHOLDER_PATTERN = re.compile(r'{{([^}]*)}}+|\[\[([^\]]*)\]\]+')
+"""Same as ``DocManager._find_placeholders``."""
+
+_BLOCK_CONTAINERS = {_W + 'body', _W + 'hdr', _W + 'ftr', _W + 'tc', _W + 'txbxContent'}
+_COUNTED = {_W + 'p': _BLOCK_CONTAINERS, _W + 'tbl': _BLOCK_CONTAINERS, _W + 'tr': {_W + 'tbl'},
+            _W + 'tc': {_W + 'tr'}}
+"""Elements that get an index in a location, and the containers they're counted in."""
+_CONTAINERS = _BLOCK_CONTAINERS | {_W + 'tbl', _W + 'tr'}
+_TEXT = {_W + 't': None, _W + 'tab': '\t', _W + 'br': '\n', _W + 'cr': '\n'}
+"""Run content that makes up a paragraph's text, as in python-docx's ``Paragraph.text``."""
+
+
+def _story_parts(names: Iterable[str]) -> List[str]:
+    """The main document, then the headers and the footers, in name order."""
+    stories = [n for n in names if re.fullmatch(r'word/(header|footer)\d*\.xml', n)]
+    return ['word/document.xml'] + sorted(stories, key=lambda n: (not n.startswith('word/header'), n))
+
+
+def _part_label(name: str) -> str:
+    """The first item of a location: ``'body'`` for the main document, else the part's name (``'header1'``...)."""
+    return 'body' if name == 'word/document.xml' else Path(name).stem
+
+
+def _scan_events(events: Iterator[Tuple[str, Any]], part: str, clear: bool) -> Iterator[Tuple[str, Location]]:
+    containers: List[Tuple[str, List[int]]] = []  # (tag, [number of counted children so far])
+    counted: List[bool] = []  # whether each open counted element added an index to location
+    location: Location = [part]
+    texts: List[List[str]] = []  # text of each open paragraph; text boxes nest paragraphs in runs
+    skip = 0  # depth inside mc:Fallback, which repeats the mc:Choice content
+    for event, element in events:
+        tag = element.tag
+        if tag == _MC + 'Fallback':
+            skip += 1 if event == 'start' else -1
+        elif skip:
+            continue
+        elif event == 'start':
+            if tag in _COUNTED:
+                is_counted = bool(containers) and containers[-1][0] in _COUNTED[tag]
+                if is_counted:
+                    location.append(containers[-1][1][0])
+                    containers[-1][1][0] += 1
+                counted.append(is_counted)
+            if tag in _CONTAINERS:
+                containers.append((tag, [0]))
+            if tag == _W + 'p':
+                texts.append([])
+        elif tag in _TEXT:
+            if texts:
+                texts[-1].append((element.text or '') if _TEXT[tag] is None else _TEXT[tag])
+        elif tag in _CONTAINERS or tag in _COUNTED:
+            if tag == _W + 'p':
+                for match in PLACEHOLDER_PATTERN.finditer(''.join(texts.pop())):
+                    yield match.group(0), list(location)
+            if tag in _CONTAINERS:
+                containers.pop()
+            if tag in _COUNTED and counted.pop():
+                location.pop()
+            if clear:  # Keep memory flat: finished blocks aren't needed any more.
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+
+def _collect(found: Iterable[Tuple[str, Location]], placeholders: Dict[str, str],
+             locations: Dict[str, List[Location]]) -> None:
+    for text, location in found:
+        placeholders[text] = text[2:-2] if text.startswith('[[') else ''
+        locations.setdefault(text, []).append(location)
+
+
+def scan_placeholders(template: Union[str, Path]) -> Tuple[Dict[str, str], Dict[str, List[Location]]]:
+    """
+    Finds the placeholders of a .docx in one streaming pass over its XML, without building python-docx objects.
+
+    Reads ``word/document.xml``, then every header and footer part. Locations start with the part (``'body'``,
+    ``'header1'``, ``'footer2'``...), followed by the index of each enclosing block, row and cell: ``['body', 2, 0, 1,
+    0]`` is the first block of the second cell of the first row of the third body block. Unlike ``row.cells``, a
+    merged cell is seen once, and nested tables and text boxes are included. In a cell, paragraphs and tables share
+    the block numbering.
+
+    :return: placeholder text -> default value (as ``DocManager.placeholders``), and placeholder text -> locations.
+    """
+    placeholders: Dict[str, str] = {}
+    locations: Dict[str, List[Location]] = {}
+    with zipfile.ZipFile(template) as package:
+        for name in _story_parts(package.namelist()):
+            with package.open(name) as stream:
+                events = etree.iterparse(stream, events=('start', 'end'))
+                _collect(_scan_events(events, _part_label(name), clear=True), placeholders, locations)
+    return placeholders, locations
+
+
+def scan_document(document) -> Tuple[Dict[str, str], Dict[str, List[Location]]]:
+    """
+    ``scan_placeholders`` for a python-docx ``Document`` already in memory (e.g. after replacements), walking its
+    parts' XML without changing it. Gives the same placeholders and locations as ``scan_placeholders`` does for the
+    saved file.
+    """
+    parts = {'word/document.xml': document.element}
+    for rel in document.part.rels.values():
+        if not rel.is_external and rel.reltype.endswith(('/header', '/footer')):
+            parts[str(rel.target_part.partname).lstrip('/')] = rel.target_part.element
+    placeholders: Dict[str, str] = {}
+    locations: Dict[str, List[Location]] = {}
+    for name in _story_parts(parts):
+        events = etree.iterwalk(parts[name], events=('start', 'end'))
+        _collect(_scan_events(events, _part_label(name), clear=False), placeholders, locations)
+    return placeholders, locations
@@ -0,0 +1,85 @@
+import copy
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple, Union
+
+from docx import Document
+from docx.document import Document as DocumentObject
+
+from utils.path_utils import PathManager, PathFlag
+
+_Key = Tuple[str, int, int]
+
+
+class TemplateCache:
+    """
+    Keeps parsed, pristine copies of the most recently used templates and hands out deep copies of them.
+
+    Opening a template unzips the package and parses every XML part; copying the parsed tree is cheaper, and the copy
+    can be filled in and saved without touching the cached one. An entry is keyed on the template's path, modification
+    time and size, so an edited template is parsed again on its next ``open``.
+
+    Least recently used entries are evicted past ``max_entries`` templates or ``max_bytes`` of template files (the
+    size on disk, a lower bound of the parsed size).
+    """
+
+    def __init__(self, max_entries: int = 16, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[_Key, DocumentObject]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: Union[str, Path]) -> _Key:
+        path = str(PathManager.resolve_path(path, PathFlag.FROM_PROJECT_ROOT))
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+
+    @property
+    def size(self) -> int:
+        """Total size on disk of the cached templates."""
+        return sum(key[2] for key in self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def open(self, path: Union[str, Path]) -> DocumentObject:
+        """
+        :param path: relative paths are from the project root.
+        :return: a new ``Document`` of the template at ``path``, parsed from disk only if it isn't cached or changed.
+        :raises FileNotFoundError: if there's no file at ``path``.
+        """
+        key = self._key(path)
+        with self._lock:
+            pristine = self._entries.get(key)
+            if pristine is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(pristine)
+        pristine = Document(key[0])
+        with self._lock:
+            self.misses += 1
+            for stale in [k for k in self._entries if k[0] == key[0]]:
+                del self._entries[stale]
+            if key[2] <= self.max_bytes:
+                self._entries[key] = pristine
+                self._evict()
+        return copy.deepcopy(pristine)
+
+    def _evict(self) -> None:
+        total = self.size
+        while self._entries and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            key, _ = self._entries.popitem(last=False)
+            total -= key[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+TEMPLATES = TemplateCache()
+"""Templates opened by ``DocManager``."""
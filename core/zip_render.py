@@ -0,0 +1,254 @@
+import os
+import re
+import struct
+import zipfile
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import quote, unquote
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+from core.placeholder_replacement import replace_in_runs, _remove_ph_escaped_text
+from core.placeholder_scanner import PLACEHOLDER_PATTERN
+from utils.path_utils import PathManager, PathFlag
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+_STORY_PART = re.compile(r'word/(document|header\d*|footer\d*)\.xml')
+_STORY_RELS = re.compile(r'word/_rels/(document|header\d*|footer\d*)\.xml\.rels')
+_URL_SAFE = ":/?#[]@!$&'()*+,;=%~"
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+"""A zip member's local file header, up to its name; see the zip APPNOTE, 4.3.7."""
+
+
+class _TextRun:
+    """One ``w:t`` of a paragraph, shaped like a python-docx run for ``replace_in_runs``."""
+
+    def __init__(self, element):
+        self._element = element
+
+    @property
+    def text(self) -> str:
+        return self._element.text or ''
+
+    @text.setter
+    def text(self, value: str):
+        self._element.text = value
+        if value != value.strip():
+            self._element.set(_XML_SPACE, 'preserve')
+
+
+@dataclass
+class RenderStats:
+    rewritten: List[str] = field(default_factory=list)
+    """Members that were changed, re-serialized and compressed."""
+    copied: List[str] = field(default_factory=list)
+    """Members copied from the template as they were, still compressed."""
+
+
+def _paragraph_runs(paragraph) -> List[_TextRun]:
+    # A text box's paragraphs are inside this one's runs; they're replaced on their own.
+    return [_TextRun(t) for t in paragraph.iter(_W + 't')
+            if next(t.iterancestors(_W + 'p')) is paragraph]
+
+
+def _render_rels(xml: bytes, new_values: Dict[str, str], links: Dict[str, str]) -> Optional[bytes]:
+    """Replaces hyperlink targets found in ``links``, and placeholders in targets (also when percent-encoded)."""
+    root = etree.fromstring(xml)
+    changed = False
+    for relationship in root:
+        target = relationship.get('Target')
+        if target is None or relationship.get('TargetMode') != 'External':
+            continue
+        new_target = links.get(target, target)
+        decoded = unquote(new_target)
+        filled = PLACEHOLDER_PATTERN.sub(
+            lambda m: quote(str(new_values[m.group(0)]), safe=_URL_SAFE) if m.group(0) in new_values else m.group(0),
+            decoded)
+        if filled != decoded:
+            new_target = filled
+        if new_target != target:
+            relationship.set('Target', new_target)
+            changed = True
+    if not changed:
+        return None
+    return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _copy_member(source: zipfile.ZipFile, target: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+    """
+    Appends a member of ``source`` to ``target`` as it is stored: no decompression, no recompression.
+
+    ``zipfile`` has no public way to do this; this writes the member the way ``ZipFile.write`` does, with the
+    already-compressed bytes.
+    """
+    source.fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(source.fp.read(_LOCAL_HEADER.size))
+    name_length, extra_length = header[-2:]
+    source.fp.seek(info.header_offset + _LOCAL_HEADER.size + name_length + extra_length)
+    data = source.fp.read(info.compress_size)
+
+    copied = zipfile.ZipInfo(info.filename, info.date_time)
+    copied.compress_type = info.compress_type
+    copied.external_attr = info.external_attr
+    copied.create_system = info.create_system
+    copied.flag_bits = info.flag_bits & ~0x08  # sizes and CRC go in the header, not in a trailing descriptor
+    copied.CRC, copied.compress_size, copied.file_size = info.CRC, info.compress_size, info.file_size
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+    with target._lock:
+        copied.header_offset = target.fp.tell()
+        target._didModify = True
+        target.fp.write(copied.FileHeader(zip64))
+        target.fp.write(data)
+        target.filelist.append(copied)
+        target.NameToInfo[copied.filename] = copied
+        target.start_dir = target.fp.tell()
+
+
+class _Slots(dict):
+    """Placeholder -> sentinel text, for every placeholder asked about; a sentinel marks where a value goes."""
+
+    def __contains__(self, placeholder) -> bool:
+        return True
+
+    def __missing__(self, placeholder: str) -> str:
+        self[placeholder] = sentinel = f'\ue000{len(self)}\ue001'
+        return sentinel
+
+
+_SENTINEL = re.compile('\ue000(\\d+)\ue001'.encode())
+
+
+@dataclass
+class _CompiledPart:
+    chunks: List[bytes]
+    """The serialized part, split at each slot: ``chunks[0] slot[0] chunks[1] ... slot[n-1] chunks[n]``."""
+    slots: List[str]
+    """Placeholder that fills each slot."""
+    prefix: str
+    """Namespace prefix of WordprocessingML in this part, for the ``w:br``/``w:tab`` of multi-line values."""
+
+    def render(self, new_values: Dict[str, Any]) -> bytes:
+        parts = [self.chunks[0]]
+        for placeholder, chunk in zip(self.slots, self.chunks[1:]):
+            parts.append(self._fill(placeholder, new_values))
+            parts.append(chunk)
+        return b''.join(parts)
+
+    def _fill(self, placeholder: str, new_values: Dict[str, Any]) -> bytes:
+        if placeholder not in new_values:
+            return escape(placeholder).encode()
+        value = escape(_remove_ph_escaped_text(str(new_values[placeholder] or '')))
+        # As python-docx's Run.text does: line breaks and tabs are elements, not characters.
+        w = self.prefix
+        value = value.replace('\t', f'</{w}t><{w}tab/><{w}t xml:space="preserve">')
+        value = re.sub(r'\r\n|\r|\n', f'</{w}t><{w}br/><{w}t xml:space="preserve">', value)
+        return value.encode()
+
+
+def _compile_story(xml: bytes) -> Optional[_CompiledPart]:
+    """:return: the part as chunks and slots, or None if it has no placeholders."""
+    root = etree.fromstring(xml)
+    slots = _Slots()
+    for paragraph in root.iter(_W + 'p'):
+        runs = _paragraph_runs(paragraph)
+        if replace_in_runs(runs, slots):
+            for run in runs:
+                if '\ue000' in run.text:
+                    run._element.set(_XML_SPACE, 'preserve')  # the value may start or end with a space
+    if not slots:
+        return None
+    serialized = etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+    pieces = _SENTINEL.split(serialized)
+    by_index = {int(sentinel[1:-1]): placeholder for placeholder, sentinel in slots.items()}
+    prefix = next((f'{p}:' for p, uri in root.nsmap.items() if uri == _W[1:-1] and p), '')
+    return _CompiledPart(pieces[0::2], [by_index[int(i)] for i in pieces[1::2]], prefix)
+
+
+@dataclass
+class RenderPlan:
+    """
+    What rendering a template takes, worked out once: the story parts with placeholders, pre-serialized and split at
+    each placeholder, and the members to copy as they are. ``render`` joins the pieces with the values; it doesn't
+    parse or search anything.
+    """
+    template: str
+    members: List[zipfile.ZipInfo]
+    parts: Dict[str, _CompiledPart]
+    """Member name -> compiled story part, for the parts with placeholders."""
+    rels: Dict[str, bytes]
+    """Member name -> XML, for the story parts' relationships; hyperlink targets are replaced on each render."""
+
+    @property
+    def placeholders(self) -> List[str]:
+        return list(dict.fromkeys(p for part in self.parts.values() for p in part.slots))
+
+    def render(self, output: Union[str, Path], new_values: Dict[str, Any],
+               links: Optional[Dict[str, str]] = None) -> RenderStats:
+        stats = RenderStats()
+        links = links or {}
+        with zipfile.ZipFile(self.template) as source, \
+                zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as target:
+            for info in self.members:
+                part = self.parts.get(info.filename)
+                if part is not None and any(placeholder in new_values for placeholder in part.slots):
+                    rendered = part.render(new_values)
+                elif info.filename in self.rels:
+                    rendered = _render_rels(self.rels[info.filename], new_values, links)
+                else:
+                    rendered = None
+                if rendered is None:
+                    _copy_member(source, target, info)
+                    stats.copied.append(info.filename)
+                else:
+                    target.writestr(zipfile.ZipInfo(info.filename, info.date_time), rendered,
+                                    compress_type=zipfile.ZIP_DEFLATED)
+                    stats.rewritten.append(info.filename)
+        return stats
+
+
+@lru_cache(maxsize=16)
+def _compile(template: str, mtime_ns: int, size: int) -> RenderPlan:
+    with zipfile.ZipFile(template) as source:
+        members = source.infolist()
+        parts, rels = {}, {}
+        for info in members:
+            if _STORY_PART.fullmatch(info.filename):
+                compiled = _compile_story(source.read(info))
+                if compiled is not None:
+                    parts[info.filename] = compiled
+            elif _STORY_RELS.fullmatch(info.filename):
+                rels[info.filename] = source.read(info)
+    return RenderPlan(template, members, parts, rels)
+
+
+def compile_plan(template: Union[str, Path]) -> RenderPlan:
+    """
+    The render plan of ``template``; compiled on first use, and again when the file changes (path, modification time
+    and size). The last 16 plans are kept. A relative ``template`` is from the project root, not the working
+    directory.
+    """
+    path = str(PathManager.resolve_path(template, PathFlag.FROM_PROJECT_ROOT))
+    stat = os.stat(path)
+    return _compile(path, stat.st_mtime_ns, stat.st_size)
+
+
+def render_docx(template: Union[str, Path], output: Union[str, Path], new_values: Dict[str, Any],
+                links: Optional[Dict[str, str]] = None) -> RenderStats:
+    """
+    Writes ``template`` with its placeholders replaced to ``output``, working on the zip rather than a python-docx
+    ``Document``: only the main document, headers and footers that have placeholders (and relationships with changed
+    hyperlink targets) are written anew; every other member (images, styles, fonts...) is copied compressed, byte for
+    byte.
+
+    Placeholders are replaced as ``DocManager.apply_replacements`` does, paragraph by paragraph across runs (in
+    headers and footers too), and in external hyperlink targets. The template is compiled into a ``RenderPlan`` the
+    first time; later renders of it only fill in values.
+
+    :param new_values: placeholder text -> value.
+    :param links: old hyperlink target -> new target.
+    """
+    return compile_plan(template).render(output, new_values, links)
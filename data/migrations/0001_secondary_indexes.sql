@@ -0,0 +1,25 @@
+-------------------------------------------------
+------------- SECONDARY INDEXES -----------------
+-------------------------------------------------
+-- Access paths used by the dashboard and the data views.
+-- Checked by tests/test_query_plans.py.
+
+-- Jobs by employer (select_jobs_by_employer, joins, foreign key checks).
+CREATE INDEX IF NOT EXISTS idx_jobs_employer ON Jobs (employerID);
+
+-- Jobs by status.
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON Jobs (status);
+
+-- Covering index for the dashboard's job picker:
+-- WHERE status != 'Rejected' ORDER BY last_updated DESC, joined to Employers on employerID.
+-- Read in order, so no table lookups and no sorting.
+CREATE INDEX IF NOT EXISTS idx_jobs_picker ON Jobs (last_updated DESC, status, employerID, job_title);
+
+-- Documents of a job, by type (apply_replacements, select_documents_by_job).
+CREATE INDEX IF NOT EXISTS idx_documents_job_type ON Documents (jobID, documentType);
+
+-- Storage entries of a document.
+CREATE INDEX IF NOT EXISTS idx_document_storage_document ON Document_Storage (documentID);
+
+-- Documents using a variable (foreign key checks when deleting variables).
+CREATE INDEX IF NOT EXISTS idx_document_variables_variable ON Document_Variables (variableID);
@@ -0,0 +1,5 @@
+-- Numeric pay range next to the free-text annual_pay (e.g. '$80,000 - $95,000', '90k'), so jobs can be sorted and
+-- filtered by pay. Filled from annual_pay by the batched data migration 0003 (core/migrations.py).
+ALTER TABLE Jobs ADD COLUMN annual_pay_min REAL DEFAULT NULL;
+ALTER TABLE Jobs ADD COLUMN annual_pay_max REAL DEFAULT NULL;
+CREATE INDEX IF NOT EXISTS idx_jobs_annual_pay ON Jobs (annual_pay_min, annual_pay_max);
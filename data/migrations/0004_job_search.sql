@@ -0,0 +1,53 @@
+-------------------------------------------------
+--------------- JOB FULL-TEXT SEARCH -------------
+-------------------------------------------------
+-- FTS5 index of job postings; rowid = Jobs.jobID. Used by search_jobs (core/database_interaction_methods.py).
+-- Kept in sync with Jobs and Employers by the triggers below.
+CREATE VIRTUAL TABLE IF NOT EXISTS Jobs_Search USING fts5(
+    job_title,
+    employer_name,
+    location,
+    job_text,
+    notes,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+
+INSERT INTO Jobs_Search (rowid, job_title, employer_name, location, job_text, notes)
+SELECT j.jobID, j.job_title, e.employer_name, j.location, j.job_text, j.notes
+FROM Jobs j
+         LEFT JOIN Employers e ON e.employerID = j.employerID;
+
+CREATE TRIGGER IF NOT EXISTS jobs_search_insert
+    AFTER INSERT
+    ON Jobs
+BEGIN
+    INSERT INTO Jobs_Search (rowid, job_title, employer_name, location, job_text, notes)
+    SELECT new.jobID, new.job_title, (SELECT employer_name FROM Employers WHERE employerID = new.employerID),
+           new.location, new.job_text, new.notes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_search_update
+    AFTER UPDATE OF job_title, employerID, location, job_text, notes
+    ON Jobs
+BEGIN
+    DELETE FROM Jobs_Search WHERE rowid = old.jobID;
+    INSERT INTO Jobs_Search (rowid, job_title, employer_name, location, job_text, notes)
+    SELECT new.jobID, new.job_title, (SELECT employer_name FROM Employers WHERE employerID = new.employerID),
+           new.location, new.job_text, new.notes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_search_delete
+    AFTER DELETE
+    ON Jobs
+BEGIN
+    DELETE FROM Jobs_Search WHERE rowid = old.jobID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS jobs_search_employer_rename
+    AFTER UPDATE OF employer_name
+    ON Employers
+BEGIN
+    UPDATE Jobs_Search
+    SET employer_name = new.employer_name
+    WHERE rowid IN (SELECT jobID FROM Jobs WHERE employerID = new.employerID);
+END;
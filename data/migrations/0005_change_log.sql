@@ -0,0 +1,97 @@
+-------------------------------------------------
+------------------ CHANGE LOG -------------------
+-------------------------------------------------
+-- One row per inserted/updated/deleted row of the tables shown in the data views, written by the triggers below.
+-- Read by utils.change_feed.ChangeFeed, which tells the views which rows to patch. Works for writes from any
+-- connection or process.
+CREATE TABLE IF NOT EXISTS Change_Log (
+    changeID   INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT    NOT NULL,
+    row_id     INTEGER NOT NULL,
+    operation  TEXT    NOT NULL CHECK (operation IN ('INSERT', 'UPDATE', 'DELETE')),
+    changed_at DATETIME DEFAULT (datetime('now'))
+);
+
+CREATE TRIGGER IF NOT EXISTS change_log_employers_insert
+    AFTER INSERT
+    ON Employers
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Employers', new.employerID, 'INSERT');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_employers_update
+    AFTER UPDATE
+    ON Employers
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Employers', new.employerID, 'UPDATE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_employers_delete
+    AFTER DELETE
+    ON Employers
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Employers', old.employerID, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_jobs_insert
+    AFTER INSERT
+    ON Jobs
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Jobs', new.jobID, 'INSERT');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_jobs_update
+    AFTER UPDATE
+    ON Jobs
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Jobs', new.jobID, 'UPDATE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_jobs_delete
+    AFTER DELETE
+    ON Jobs
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Jobs', old.jobID, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_documents_insert
+    AFTER INSERT
+    ON Documents
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Documents', new.documentID, 'INSERT');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_documents_update
+    AFTER UPDATE
+    ON Documents
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Documents', new.documentID, 'UPDATE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_documents_delete
+    AFTER DELETE
+    ON Documents
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Documents', old.documentID, 'DELETE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_document_storage_insert
+    AFTER INSERT
+    ON Document_Storage
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Document_Storage', new.storageID, 'INSERT');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_document_storage_update
+    AFTER UPDATE
+    ON Document_Storage
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Document_Storage', new.storageID, 'UPDATE');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_document_storage_delete
+    AFTER DELETE
+    ON Document_Storage
+BEGIN
+    INSERT INTO Change_Log (table_name, row_id, operation) VALUES ('Document_Storage', old.storageID, 'DELETE');
+END;
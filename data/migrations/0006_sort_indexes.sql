@@ -0,0 +1,11 @@
+-------------------------------------------------
+------------- DATA VIEW SORT INDEXES ------------
+-------------------------------------------------
+-- Columns the data views sort by (DatabaseView.sort_by). With an index, a page sorted by a column reads that many
+-- index entries instead of sorting the whole table. The row ID is implied as the tie breaker.
+CREATE INDEX IF NOT EXISTS idx_jobs_title ON Jobs (job_title);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON Jobs (location);
+CREATE INDEX IF NOT EXISTS idx_jobs_date_added ON Jobs (date_added);
+CREATE INDEX IF NOT EXISTS idx_jobs_date_applied ON Jobs (date_applied);
+CREATE INDEX IF NOT EXISTS idx_employers_industry ON Employers (industry);
+CREATE INDEX IF NOT EXISTS idx_employers_location ON Employers (location);
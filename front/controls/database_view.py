@@ -1,52 +1,96 @@
 from copy import copy
-from typing import Optional, Tuple, Union, Any, Dict, List
+from itertools import zip_longest
+import sqlite3
+from typing import Optional, Tuple, Union, Any, List, Dict
 
-from flet import Container, Column, Control, DataTable, DataColumn, DataRow, DataCell
+from flet import Container, Column, Control, DataTable, DataColumn, DataRow, DataCell, TextButton, IconButton, \
+    Icons, OnScrollEvent, TextField, DataColumnSortEvent
 from flet.core.row import Row
 from flet.core.text import Text
 from flet.core.text_style import TextThemeStyle
 from flet.core.types import TextAlign, MainAxisAlignment, ControlStateValue, ColorValue, \
-    OptionalControlEventCallable, ScrollMode
+    OptionalControlEventCallable, ScrollMode, OptionalEventCallable
 from flet.core.border import all as all_borders, BorderSide
 
 from front.controls.link_button import link_button, path_button
+from utils.change_feed import ChangeFeed, Change
 from utils.database_handler import DatabaseHandler
+from utils.enums import RowMode
+from utils.pagination import fetch_page, Keyset
 
 
 class DatabaseView(Container):
-    def __init__(self, db_path: str,
+    def __init__(self, db: Union[str, DatabaseHandler],
                  table_or_view_name: str,
                  select_query: str,
                  column_names: List[str],
                  select_params: Optional[Tuple] = None,
                  edit_row_cell: Optional[DataCell] = None,
                  row_colors: ControlStateValue[ColorValue] = None,
-                 interlaced_rows: Optional[bool] = None) -> None:
+                 interlaced_rows: Optional[bool] = None,
+                 order_by: Optional[List[str]] = None,
+                 page_size: Optional[int] = None,
+                 virtualized: bool = False,
+                 change_feed: Optional[ChangeFeed] = None,
+                 source_table: Optional[str] = None,
+                 key_column: Optional[str] = None,
+                 sortable: bool = False,
+                 filterable: bool = False) -> None:
         """
-        :param db_path:
+        :param db: The database's handler, with ``RowMode.ROW`` rows; or its path, for a handler of the view's own
+            (with the default PRAGMA profile).
         :param table_or_view_name:
         :param select_query: WITHOUT sorting.
-        :param edit_row_cell:
+        :param edit_row_cell: Not shown when ``virtualized``.
+        :param order_by: Sort keys (result column names, optionally with ``DESC``); unique together.
+        :param page_size: With ``order_by``: rows per page (keyset pagination); more are loaded on demand.
+        :param virtualized: Shows one window of ``page_size`` rows (default 50) at a time, with page controls and
+            scrolling past the end moving to the next window. The row controls are made once and refilled, so the
+            number of live controls doesn't depend on the size of the table. Needs ``order_by``.
+        :param change_feed: With ``source_table`` and ``key_column``: rows of ``source_table`` changed elsewhere are
+            patched in place (see ``apply_changes``) instead of the view being rebuilt.
+        :param source_table: The table whose changes the view follows.
+        :param key_column: Result column holding ``source_table``'s row ID; doesn't have to be displayed.
+        :param sortable: Clicking a column header sorts by it (ORDER BY in the query, ``key_column`` breaking ties).
+            Needs ``key_column``.
+        :param filterable: Shows a filter field per column; rows are filtered in the query (case-insensitive
+            "contains", with bound parameters).
         """
         super().__init__()
         self.expand = False
-        self.db = DatabaseHandler(db_path)
-        self.db.execute_mode(True)
+        if virtualized and not order_by:
+            raise ValueError("A virtualized DatabaseView needs order_by.")
+        if sortable and not key_column:
+            raise ValueError("A sortable DatabaseView needs key_column.")
+        self.key_column = key_column
+        self.filters: Dict[str, str] = {}
+        """Column name to the text its values must contain."""
+        if isinstance(db, DatabaseHandler):
+            if db.row_mode is not RowMode.ROW:
+                raise ValueError("DatabaseView needs a handler with RowMode.ROW rows.")
+            self.db = db
+        else:
+            self.db = DatabaseHandler(db, execute_mode=RowMode.ROW)
         self.select_params = select_params or ()
-        self.data = self.db.execute_query(select_query, self.select_params, fetch_mode=-1)
-        self.table_name = table_or_view_name
         self.select_query = select_query
+        self.order_by = order_by
+        self.virtualized = virtualized
+        self.page_size = page_size or (50 if virtualized else None)
+        self.cursor: Optional[str] = None
+        self.page_index = 0
+        self._page_cursors: List[Optional[str]] = [None]
+        """Cursor of every window visited so far (``None`` for the first), so going back doesn't re-scan."""
+        self.data = self._fetch()
+        if virtualized and self.cursor is not None:
+            self._page_cursors.append(self.cursor)
+        self.table_name = table_or_view_name
         self.column_headers = column_names
-        cols = [self._make_column(h) for h in self.column_headers]
+        cols = [self._make_column(h, on_sort=self._on_sort if sortable else None) for h in self.column_headers]
         self.edit_row_cell = edit_row_cell
-        if interlaced_rows:
-            rows = [self._make_row(r, color=row_colors, even_or_odd=(i % 2 == 0)) for i, r in enumerate(self.data)]
-        else:
-            rows = [self._make_row(r, color=row_colors) for r in self.data]
-        if self.edit_row_cell:
-            rows.append(edit_row_cell)
+        self.row_colors = row_colors
+        self.interlaced_rows = interlaced_rows
         self.table = DataTable(columns=cols,
-                               rows=rows,
+                               rows=self._make_window() if virtualized else self._make_rows(self.data),
                                expand=False,
                                border=all_borders(1),
                                horizontal_lines=BorderSide(1),
@@ -54,14 +98,235 @@ class DatabaseView(Container):
                                horizontal_margin=5,
                                data_row_min_height=10,
                                )
+        self.more_button = TextButton('Load more', on_click=lambda e: self.load_more(),
+                                      visible=not virtualized and self.cursor is not None)
+        self.range_text = Text()
+        self.previous_buttons = [IconButton(Icons.FIRST_PAGE, tooltip='First rows',
+                                            on_click=lambda e: self.show_window(0)),
+                                 IconButton(Icons.CHEVRON_LEFT, tooltip='Previous rows',
+                                            on_click=lambda e: self.show_window(self.page_index - 1))]
+        self.next_button = IconButton(Icons.CHEVRON_RIGHT, tooltip='Next rows',
+                                      on_click=lambda e: self.show_window(self.page_index + 1))
+        self.pager = Row([*self.previous_buttons, self.range_text, self.next_button], visible=virtualized)
+        self.filter_fields = Row([TextField(label=h, dense=True, width=140, data=h,
+                                            on_change=lambda e: self.filter_by(e.control.data, e.control.value))
+                                  for h in self.column_headers], visible=filterable, wrap=True)
+        if virtualized:
+            self._fill_window()
+        self.source_table = source_table
+        if change_feed and source_table and key_column:
+            change_feed.subscribe(source_table, self._on_changes)
         self.content = Row([Column(controls=[Text(self.table_name.capitalize(),
                                                   style=TextThemeStyle.HEADLINE_SMALL, text_align=TextAlign.CENTER),
-                                             self.table
+                                             self.pager,
+                                             self.filter_fields,
+                                             self.table,
+                                             self.more_button
                                              ], scroll=ScrollMode.AUTO,
+                                   on_scroll=self._on_scroll if virtualized else None,
                                    alignment=MainAxisAlignment.CENTER)], scroll=ScrollMode.AUTO
                            )
 
-    def _make_row(self, row_data: Dict[str, Any],
+    def refresh(self, select_query: Optional[str] = None, select_params: Optional[Tuple] = None,
+                order_by: Optional[List[str]] = None) -> None:
+        """
+        Re-runs the query from the first page and rebuilds the rows.
+
+        :param select_query: Replaces the view's query, e.g. to show search results. Same columns, WITHOUT sorting.
+        :param select_params: Replaces the query parameters.
+        :param order_by: Replaces the sort keys.
+        """
+        if select_query is not None:
+            self.select_query = select_query
+        if select_params is not None:
+            self.select_params = select_params
+        if order_by is not None:
+            self.order_by = order_by
+        if self.virtualized:
+            self._page_cursors = [None]
+            self.show_window(0)
+            return
+        self.cursor = None
+        self.data = self._fetch()
+        self.table.rows = self._make_rows(self.data)
+        self.more_button.visible = self.cursor is not None
+        if self.page:
+            self.update()
+
+    def load_more(self) -> None:
+        """Appends the next page."""
+        if self.cursor is None or self.virtualized:
+            return
+        rows = self._fetch()
+        new_rows = self._make_rows(rows, start=len(self.data))
+        self.data.extend(rows)
+        if self.edit_row_cell:
+            self.table.rows[-1:-1] = new_rows[:-1]
+        else:
+            self.table.rows.extend(new_rows)
+        self.more_button.visible = self.cursor is not None
+        if self.page:
+            self.update()
+
+    def show_window(self, index: int) -> None:
+        """Virtualized mode: shows the ``index``-th window of rows (0-based), if it exists."""
+        if not self.virtualized or not 0 <= index < len(self._page_cursors):
+            return
+        self.page_index = index
+        self.cursor = self._page_cursors[index]
+        self.data = self._fetch()
+        if self.cursor is not None and len(self._page_cursors) == index + 1:
+            self._page_cursors.append(self.cursor)
+        self._fill_window()
+        if self.page:
+            self.update()
+
+    def sort_by(self, column: str, ascending: bool = True) -> None:
+        """Sorts the view by ``column`` (then ``key_column``), in the query, from the first row."""
+        order_by = [column if ascending else f'{column} DESC']
+        if column != self.key_column:
+            order_by.append(self.key_column)
+        if column in self.column_headers:
+            self.table.sort_column_index = self.column_headers.index(column)
+            self.table.sort_ascending = ascending
+        self.refresh(order_by=order_by)
+
+    def filter_by(self, column: str, text: Optional[str]) -> None:
+        """Shows only rows whose ``column`` contains ``text`` (ignoring case); blank ``text`` removes the filter."""
+        if text and text.strip():
+            self.filters[column] = text.strip()
+        else:
+            self.filters.pop(column, None)
+        self.refresh()
+
+    def _on_sort(self, e: DataColumnSortEvent) -> None:
+        self.sort_by(self.column_headers[e.column_index], e.ascending)
+
+    def _query(self) -> Tuple[str, Tuple]:
+        """``select_query`` with ``filters`` applied, and its parameters."""
+        if not self.filters:
+            return self.select_query, tuple(self.select_params)
+        conditions, params = [], []
+        for column, text in self.filters.items():
+            quoted = '"' + column.replace('"', '""') + '"'
+            escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            conditions.append(f"{quoted} LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+        return (f"SELECT * FROM ({self.select_query}) WHERE {' AND '.join(conditions)}",
+                tuple(self.select_params) + tuple(params))
+
+    def _on_changes(self, changes: List[Change]) -> None:
+        """Change feed callback; may run on any thread, so a view on a page is patched on the page's loop."""
+        if self.page:
+            self.page.run_task(self._apply_changes_async, changes)
+        else:
+            self.apply_changes(changes)
+
+    async def _apply_changes_async(self, changes: List[Change]) -> None:
+        self.apply_changes(changes)
+
+    def apply_changes(self, changes: List[Change]) -> None:
+        """
+        Patches the rows of ``changes`` (rows of ``source_table``): each one is re-read on its own, then replaced,
+        removed or - if every row is loaded - appended. A virtualized view re-reads its current window instead.
+        """
+        key = self.key_column
+        query, params = self._query()
+        row_query = f'SELECT * FROM ({query}) WHERE "{key}" = ?'
+        refill = False
+        for change in changes:
+            if change.table != self.source_table:
+                continue
+            found = self.db.execute_query(row_query, params + (change.row_id,), fetch_mode=-1)
+            new_row = found[0] if found else None
+            index = next((i for i, r in enumerate(self.data) if r[key] == change.row_id), None)
+            if self.virtualized:
+                refill = refill or index is not None or (new_row is not None and self.cursor is None)
+            elif index is not None and new_row is not None:
+                self.data[index] = new_row
+                self.table.rows[index] = self._make_rows([new_row], start=index)[0]
+            elif index is not None:
+                del self.data[index]
+                del self.table.rows[index]
+            elif new_row is not None and self.cursor is None:
+                self.table.rows.insert(len(self.data), self._make_rows([new_row], start=len(self.data))[0])
+                self.data.append(new_row)
+        if refill:
+            self.show_window(self.page_index)
+        elif self.page:
+            self.update()
+
+    def _on_scroll(self, e: OnScrollEvent) -> None:
+        if e.event_type == 'end' and e.pixels >= e.max_scroll_extent and self.cursor is not None:
+            self.show_window(self.page_index + 1)
+            e.control.scroll_to(offset=0, duration=0)
+
+    def _make_window(self) -> List[DataRow]:
+        """Virtualized mode: ``page_size`` reusable rows; see ``_fill_window``."""
+        return [DataRow(cells=[DataCell(link_button('', 'open') if h.startswith('URL') else Text())
+                               for h in self.column_headers],
+                        color=self.row_colors.with_opacity(0.5, self.row_colors)
+                        if self.interlaced_rows and i % 2 == 0 else self.row_colors,
+                        visible=False)
+                for i in range(self.page_size)]
+
+    def _fill_window(self) -> None:
+        """Virtualized mode: puts ``data`` into the existing row controls; unused rows are hidden."""
+        for row, row_data in zip_longest(self.table.rows, self.data):
+            row.visible = row_data is not None
+            row.data = row_data
+            if row_data is None:
+                continue
+            for cell, ch in zip(row.cells, self.column_headers):
+                if ch.startswith('URL'):
+                    cell.content.url = cell.content.tooltip = row_data[ch]
+                elif ch.startswith('Path'):
+                    cell.content = path_button(row_data[ch], 'open')  # icon depends on the file; cheap to remake
+                else:
+                    self._set_text(cell.content, row_data[ch])
+        first = self.page_index * self.page_size
+        self.range_text.value = f'Rows {first + 1}-{first + len(self.data)}' if self.data else 'No rows'
+        for button in self.previous_buttons:
+            button.disabled = self.page_index == 0
+        self.next_button.disabled = self.cursor is None
+
+    @staticmethod
+    def _set_text(ctrl: Text, value: Any) -> None:
+        """Same rendering as ``_make_cell``, on an existing ``Text``."""
+        ctrl.color = 'black'
+        ctrl.selectable = True
+        if isinstance(value, str):
+            ctrl.value, ctrl.no_wrap, ctrl.text_align = value, len(value) < 50, None
+        elif isinstance(value, int):
+            ctrl.value, ctrl.no_wrap, ctrl.text_align = str(value), None, TextAlign.CENTER
+        elif value:
+            ctrl.value, ctrl.no_wrap, ctrl.text_align = str(value), False, None
+        else:
+            ctrl.value, ctrl.no_wrap, ctrl.text_align = '--', False, TextAlign.CENTER
+
+    def _fetch(self) -> List[sqlite3.Row]:
+        """The next page (from ``cursor``) when paged, otherwise all rows."""
+        query, params = self._query()
+        if not self.order_by:
+            return self.db.execute_query(query, params, fetch_mode=-1)
+        if not self.page_size:
+            return self.db.execute_query(f'SELECT * FROM ({query}) ORDER BY {Keyset(self.order_by).order_clause()}',
+                                         params, fetch_mode=-1)
+        page = fetch_page(self.db, query, params, self.order_by, self.page_size, self.cursor)
+        self.cursor = page.cursor
+        return page.rows
+
+    def _make_rows(self, data: List[sqlite3.Row], start: int = 0) -> List[DataRow]:
+        if self.interlaced_rows:
+            rows = [self._make_row(r, color=self.row_colors, even_or_odd=(i % 2 == 0))
+                    for i, r in enumerate(data, start)]
+        else:
+            rows = [self._make_row(r, color=self.row_colors) for r in data]
+        if self.edit_row_cell:
+            rows.append(self.edit_row_cell)
+        return rows
+
+    def _make_row(self, row_data: sqlite3.Row,
                   color: ControlStateValue[ColorValue] = None,
                   selected: Optional[bool] = None,
                   on_long_press: OptionalControlEventCallable = None,
@@ -146,10 +411,12 @@ class DatabaseView(Container):
                      heading_row_alignment: Optional[MainAxisAlignment] = "start",
                      ref=None,
                      visible: Optional[bool] = None, disabled: Optional[bool] = None,
-                     data: Any = None, ) -> DataColumn:
+                     data: Any = None,
+                     on_sort: OptionalEventCallable[DataColumnSortEvent] = None, ) -> DataColumn:
         table_column = DataColumn(
             label=Text(title, theme_style=TextThemeStyle.TITLE_SMALL, ) if isinstance(title, str) else title,
             numeric=numeric,
+            on_sort=on_sort,
             heading_row_alignment=heading_row_alignment,
             tooltip=tooltip,
             visible=visible,
@@ -2,20 +2,38 @@ import flet as ft
 from flet.core.text_style import TextThemeStyle
 from flet.core.types import TextAlign
 
+from core.global_handlers import CHANGE_FEED
 from front.controls.dark_theme_toggle import theme_toggle_button
 from front.data_window import data_window
 from front.home_window import home_window
 from front.template_dashboard_window import template_dashboard_window
+from front.view_cache import ViewCache, HOME_VIEW, DASHBOARD_VIEW, DATA_VIEW
 
 
 def on_page_resized(e):
     e.control.update()
 
 
-def initiate_content(index: int = 0, parent=None):
-    r = [home_window(), template_dashboard_window(), data_window()][index]
+_NAVIGATION = [HOME_VIEW, DASHBOARD_VIEW, DATA_VIEW]
+"""View of each navigation rail destination."""
+
+
+def make_views(page: ft.Page) -> ViewCache:
+    """The views of one page. The dashboard's job picker and employer dropdown are read when it's built."""
+    views = ViewCache(page)
+    views.register(HOME_VIEW, home_window)
+    views.register(DASHBOARD_VIEW, template_dashboard_window)
+    views.register(DATA_VIEW, data_window)
+    views.watch(CHANGE_FEED, 'Jobs', DASHBOARD_VIEW)
+    views.watch(CHANGE_FEED, 'Employers', DASHBOARD_VIEW)
+    return views
+
+
+def initiate_content(views: ViewCache, index: int = 0, parent=None):
+    r = views.get(_NAVIGATION[index])
     if parent:
         parent.content = r
+        parent.data = index
         parent.update()
     else:
         return r
@@ -27,6 +45,9 @@ def main_window(page: ft.Page):
     page.title = "Job Application Tracking Database"
     page.padding = 20
     page.theme_mode = ft.ThemeMode.LIGHT
+    # Kept with the page: the change feed only holds the cache weakly.
+    views = make_views(page)
+    page.session.set('views', views)
     header = ft.Container(
         content=ft.Row(
             [
@@ -40,8 +61,9 @@ def main_window(page: ft.Page):
     )
     # Create a placeholder for the main content
     content_area = ft.Pagelet(
-        content=initiate_content(),
-        expand=True
+        content=initiate_content(views),
+        expand=True,
+        data=0
     )
 
     # Create the sidebar navigation
@@ -66,7 +88,8 @@ def main_window(page: ft.Page):
                 label="Data Views"
             )
         ],
-        on_change=lambda e: initiate_content(e.control.selected_index, content_area)
+        # An invalidated view stays on screen (with whatever was typed into it) until the user moves away from it.
+        on_change=lambda e: initiate_content(views, e.control.selected_index, content_area)
     )
     nav_area = ft.Column([nav_rail, theme_toggle_button(page)], alignment=ft.MainAxisAlignment.SPACE_BETWEEN, width=100,
                          expand=False)
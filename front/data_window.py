@@ -1,13 +1,15 @@
-from flet import Text, Tabs, Tab, Icon, Row
+import json
+
+from flet import Text, Tabs, Tab, Icon, Row, Column, TextField
 from flet.core.icons import Icons
-from flet.core.types import VerticalAlignment, CrossAxisAlignment
+from flet.core.types import VerticalAlignment, CrossAxisAlignment, ScrollMode
 
+from core.database_interaction_methods import search_jobs
+from core.global_handlers import CHANGE_FEED, UNIVERSAL_DATABASE_HANDLER as UDH
 from front.controls.database_view import DatabaseView
 
 
-def data_window():
-    jobs_table = DatabaseView('data/applications.sqlite', 'Jobs',
-                              select_query=r'''
+_JOBS_QUERY = r'''
                        SELECT jobID                 as ID,
                        job_title                    as Title,
                        e.employer_name              as Employer,
@@ -23,6 +25,32 @@ def data_window():
                        j.notes as Notes
                         FROM Jobs j
                          JOIN Employers e on e.employerID = j.employerID'''
+
+_JOBS_SEARCH_QUERY = f'''SELECT q.*, m.key AS Rank
+                          FROM ({_JOBS_QUERY}) q
+                                   JOIN json_each(?) m ON m.value = q.ID'''
+"""Jobs tab rows for a list of job IDs (JSON array); sort by Rank to keep the list order."""
+
+_PAGE_SIZE = 100
+
+
+def _search_box(jobs_table: DatabaseView) -> TextField:
+    def on_search(e):
+        text = e.control.value.strip()
+        jobs_table.table.sort_column_index = None  # results come in rank (or ID) order, not by a column
+        if not text:
+            jobs_table.refresh(_JOBS_QUERY, (), ['ID'])
+            return
+        ids = [row['jobID'] for row in search_jobs(text, limit=200)]
+        jobs_table.refresh(_JOBS_SEARCH_QUERY, (json.dumps(ids),), ['Rank'])
+
+    return TextField(label='Search jobs', hint_text='Title, employer, posting text or notes',
+                     prefix_icon=Icons.SEARCH, dense=True, on_change=on_search, on_submit=on_search)
+
+
+def data_window():
+    jobs_table = DatabaseView(UDH, 'Jobs',
+                              select_query=_JOBS_QUERY
                               , column_names=['ID',
                                               'Title',
                                               'Employer',
@@ -34,8 +62,11 @@ def data_window():
                                               'Format',
                                               'Added',
                                               'Applied on',
-                                              'Updated', ])
-    employers_table = DatabaseView('data/applications.sqlite', 'Employers',
+                                              'Updated', ],
+                              order_by=['ID'], page_size=_PAGE_SIZE, virtualized=True,
+                              change_feed=CHANGE_FEED, source_table='Jobs', key_column='ID',
+                              sortable=True, filterable=True)
+    employers_table = DatabaseView(UDH, 'Employers',
                                    select_query=r'''SELECT employerID as 'ID', 
                                    employer_name as 'Employer',  
                                    industry as 'Industry',  
@@ -48,14 +79,18 @@ def data_window():
                                                  'Industry',
                                                  'Location',
                                                  'Notes',
-                                                 'Last Updated'])
-    documents_table = DatabaseView('data/applications.sqlite', 'Documents', r"""
+                                                 'Last Updated'],
+                                   order_by=['Employer'], page_size=_PAGE_SIZE,
+                                   change_feed=CHANGE_FEED, source_table='Employers', key_column='ID',
+                                   sortable=True, filterable=True)
+    documents_table = DatabaseView(UDH, 'Documents', r"""
 SELECT Documents.jobID                                                AS 'ID',
        Employers.employer_name                                        AS 'Employer',
        Jobs.job_title                                                 AS 'Title',
        Documents.documentType                                         AS 'Document Type',
        Document_Storage.file_name                                     AS 'File Name',
-       concat(Document_Storage.path, '\', Document_Storage.file_name) AS 'Path'
+       concat(Document_Storage.path, '\', Document_Storage.file_name) AS 'Path',
+       Document_Storage.storageID                                     AS 'StorageID'
 FROM Jobs
          INNER JOIN Documents ON Documents.jobID = Jobs.jobID
          JOIN Document_Storage ON Documents.documentID = Document_Storage.documentID
@@ -65,14 +100,16 @@ FROM Jobs
                                                  'Title',
                                                  'Document Type',
                                                  'File Name',
-                                                 'Path']
+                                                 'Path'],
+                                   change_feed=CHANGE_FEED, source_table='Document_Storage', key_column='StorageID',
+                                   sortable=True, filterable=True
                                    )
     t = Tabs(
         selected_index=0, animation_duration=300,
         tabs=[
             Tab(tab_content=
                 Row([Icon(Icons.WORK), Text("Jobs")], expand=True, vertical_alignment=CrossAxisAlignment.START),
-                content=jobs_table),
+                content=Column([_search_box(jobs_table), jobs_table], scroll=ScrollMode.AUTO)),
             Tab(tab_content=
                 Row([Icon(Icons.BUSINESS), Text("Employers")], expand=True,
                     vertical_alignment=CrossAxisAlignment.START),
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from typing import Optional, Callable, Set, List
 
@@ -11,7 +12,8 @@ from flet.core.responsive_row import ResponsiveRow
 from flet.core.row import Row
 from flet.core.text_style import TextThemeStyle
 
-from core.database_interaction_methods import insert_employers, insert_jobs
+from core.database_interaction_methods import insert_employers_async, insert_jobs_async
+from core.global_handlers import CHANGE_FEED, UNIVERSAL_DATABASE_HANDLER as UDH
 from core.placeholder_parsing import PlaceholderParser, FieldData
 from front.controls.create_button_methods import create_add_button, create_clear_button, create_restore_button
 from front.controls.group_form import GroupForm
@@ -46,16 +48,17 @@ def column_sizes(size_ratio: int):
 
 def create_employer_group_form(call_after_insert: Optional[Callable] = None,
                                call_after_clear: Optional[Callable] = None) -> GroupForm:
-    def insert(e):
+    async def insert(e):
         nonlocal gf
         data = gf.values
         if 'employer_name' not in data.keys():
             return False
-        insert_employers(
-            data['employer_name'] if 'employer_name' in data.keys else '',
-            data['industry'] if 'industry' in data.keys else '',
-            data['location'] if 'location' in data.keys else '',
-            data['notes'] if 'notes' in data.keys else '')
+        await insert_employers_async(
+            data.get('employer_name', ''),
+            data.get('industry', ''),
+            data.get('location', ''),
+            data.get('notes', ''))
+        await asyncio.to_thread(CHANGE_FEED.poll)  # it takes the write lock: not on the event loop
         call_after_insert() if call_after_insert else None
 
     def clear(e):
@@ -115,19 +118,19 @@ def job_form(call_after_insert: Optional[Callable] = None,
         :param db: DatabaseHandler instance for querying the database.
         """
         employers = db.execute_query(
-            "SELECT employerID, employer_name FROM Employers ORDER BY employerID DESC", fetch_mode=True
+            "SELECT employerID, employer_name FROM Employers ORDER BY employerID DESC", fetch_mode=-1
         )
 
         dropdown.options = [
             Option(key=str(employer[0]), text=employer[1]) for employer in employers
         ]
 
-    def insert(e):
+    async def insert(e):
         nonlocal gf
         data = gf.values
         if 'job_title' not in data.keys() or 'employer_id' not in data.keys():
             return False
-        insert_jobs(
+        await insert_jobs_async(
             data.get('job_title', ''),  # Default: empty string if missing
             data.get('employer_id', ''),  # Default: empty string
             data.get('location', 'Toronto, ON'),  # Default: Toronto, ON
@@ -143,6 +146,7 @@ def job_form(call_after_insert: Optional[Callable] = None,
             data.get('notes', ''),  # Default: empty string
             data.get('archived', False)  # Default: False
         )
+        await asyncio.to_thread(CHANGE_FEED.poll)
         call_after_insert() if call_after_insert else None
 
     def clear(e):
@@ -162,7 +166,7 @@ def job_form(call_after_insert: Optional[Callable] = None,
         hint_text="Pick employer",
         col=column_sizes(4)
     )
-    update_employer_dropdown(employer_id_field, DatabaseHandler('data/applications.sqlite'))
+    update_employer_dropdown(employer_id_field, UDH)
     location_field = TextField(
         label="Location",
         hint_text="City, Province/State",
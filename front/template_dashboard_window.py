@@ -1,3 +1,4 @@
+import asyncio
 import os
 from sqlite3 import DatabaseError
 from typing import List, Optional, Dict, Set, Tuple
@@ -12,8 +13,10 @@ from flet.core.text_style import TextThemeStyle
 from flet.core.textfield import TextField
 from flet.core.types import ScrollMode
 
+from core.database_interaction_methods import upsert_document_variables, queue_document_storage
 from core.doc_manager import DocManager
-from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as UDH, LOGGER
+from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as UDH, ASYNC_DATABASE_HANDLER as ADH, LOGGER, \
+    CHANGE_FEED
 from core.placeholder_parsing import FieldData, PlaceholderParser
 from front.controls.create_button_methods import create_add_button, create_clear_button, create_restore_button
 from front.controls.group_form import GroupForm
@@ -128,7 +131,7 @@ ORDER BY j.last_updated DESC;
     )
     options = []
     for job in result:
-        row = ft.Row([ft.Text(value=i) for i in job.values()])
+        row = ft.Row([ft.Text(value=i) for i in job])
         op = ft.dropdown.Option(key=job['id'], content=row)
         options.append(op)
     docs_job_picker.options = options
@@ -273,21 +276,20 @@ def template_dashboard_window():
     column = ft.Column(expand=True, scroll=ScrollMode.AUTO)
     container = ft.Container(content=column, expand=True)
 
-    def apply_replacements(doc_path, replacements, job_title, employer_name, job_id, doc_type, on_complete):
+    async def apply_replacements(doc_path, replacements, job_title, employer_name, job_id, doc_type, on_complete):
         nonlocal result_label
         nonlocal container
         file_name = os.path.basename(doc_path)
-        doc_manager = DocManager(PathManager.resolve_path(doc_path, PathFlag.FROM_PROJECT_ROOT))
+        # Parsing, rendering and the database run on worker threads; the window keeps responding meanwhile.
+        doc_manager = await asyncio.to_thread(DocManager,
+                                              PathManager.resolve_path(doc_path, PathFlag.FROM_PROJECT_ROOT))
         if not doc_manager.callable:
             return
 
-        doc_manager.apply_replacements(replacements)
-
-        result_label.value = f'{result_label.value}\nApplied Replacements to {file_name}'
         new_file_name = f"{file_name.replace('.docx', '')} - {job_title} - {employer_name}.docx"
         pdf_output_path = f"{file_name.replace('.docx', '')} - {job_title}.pdf"
         # Check if there's a Document for this document.
-        doc_id = UDH.execute_query(
+        doc_id = await ADH.execute_query(
             "SELECT documentID FROM Documents WHERE jobID = ? AND documentType = ?",
             (job_id, doc_type,),
             fetch_mode=-1
@@ -298,72 +300,55 @@ def template_dashboard_window():
             print("Marker 3.1")
         else:  # Insert if not.
             print("Marker 3.2")
-            doc_id = UDH.execute_query(
+            doc_id = await ADH.execute_query(
                 "INSERT INTO Documents (jobID, documentType) VALUES (?, ?)",
                 (job_id, doc_type),
                 True
             )
 
         # create new data for storage.
-        new_file_path = doc_manager.save_docx(new_file_name)
+        new_file_path = await asyncio.to_thread(doc_manager.render_docx, new_file_name, replacements)
+        result_label.value = f'{result_label.value}\nApplied Replacements to {file_name}'
         new_file_directory = os.path.dirname(new_file_path)
 
         # update label:
         result_label.value = f'{result_label.value}\nSaved the new file to {new_file_path}.'
-        check_storage = UDH.execute_query(
-            "SELECT StorageID FROM Document_Storage WHERE documentID = ?",
-            (doc_id,)
-        )
-        # check storage, insert or update as needed
-        if not check_storage:
-            UDH.execute_query(
-                "INSERT INTO Document_Storage (documentID, fileType, path, file_name) VALUES (?, ?, ?, ?)",
-                (doc_id, 'docx', new_file_directory, file_name)
-            )
-        else:
-            UDH.execute_query(
-                """
-                UPDATE Document_Storage 
-                SET fileType = ?, path = ?, file_name = ?, date_created = datetime('now') 
-                WHERE documentID = ?
-                """, ('docx', new_file_directory, new_file_name, doc_id))
+        stored = queue_document_storage(doc_id, 'docx', new_file_directory, new_file_name)
+        stored.add_done_callback(lambda _: CHANGE_FEED.poll())  # the data views show the new file once written
         
         print("Marker 10")
         result_label.value = f'{result_label.value}\nDatabases updated.'
-        doc_manager.save_pdf(pdf_output_path)
-        json_success = doc_manager.save_placeholders_to_json()
+
+        page = result_label.page
+
+        async def show_pdf_result(message):
+            result_label.value = f'{result_label.value}\n{message}'
+            result_label.update()
+
+        def on_pdf_saved(future):
+            # Runs on a conversion thread: the label is updated on the page's loop.
+            try:
+                pdf_path = future.result()
+            except Exception as err:
+                message = f'Failed to save {pdf_output_path}: {err}'
+            else:
+                queue_document_storage(doc_id, 'pdf', os.path.dirname(pdf_path), os.path.basename(pdf_path)) \
+                    .add_done_callback(lambda _: CHANGE_FEED.poll())
+                message = f'Saved the PDF to {pdf_path}.'
+            if page:
+                page.run_task(show_pdf_result, message)
+
+        doc_manager.save_pdf_async(pdf_output_path, on_pdf_saved)
+        json_success = await asyncio.to_thread(doc_manager.save_placeholders_to_json)
         if json_success:
             result_label.value = f'{result_label.value}\n{json_success}.'
         else:
             result_label.value = f'{result_label.value}\nFailed to save json.'
         on_complete(new_file_name)
-        for placeholder, value in replacements.items():
-            # Insert variable name if it doesn't already exist
-            UDH.execute_query(
-                "INSERT OR IGNORE INTO Variables (variable_name) VALUES (?)",
-                (placeholder.strip('{}[]'),)  # Ensure it's a single-item tuple
-            )
-
-            # Retrieve the variable ID
-            variable_id_result = UDH.execute_query(
-                "SELECT variableID FROM Variables WHERE variable_name = ?",
-                (placeholder.strip('{}[]'),),  # Ensure it's a single-item tuple
-                fetch_mode=-1
-            )
-
-            # Extract the variableID if it exists
-            variable_id = variable_id_result[0][0] if variable_id_result else None
-
-            if variable_id is None:
-                # Log or handle the error if variable_id could not be retrieved
-                result_label.value += f"\nError: Variable ID not found for placeholder '{placeholder}'"
-                continue
-
-            # Insert the relationship between document and variable
-            UDH.execute_query(
-                "INSERT OR IGNORE INTO Document_Variables (documentID, variableID, placeholder_name) VALUES (?, ?, ?)",
-                (doc_id, variable_id, placeholder.strip('{}[]'))
-            )
+        try:
+            await asyncio.to_thread(upsert_document_variables, doc_id, replacements)
+        except DatabaseError as err:
+            result_label.value += f"\nError: failed to save the placeholders' variables: {err}"
 
     def load_employers():
         nonlocal employers
@@ -379,7 +364,7 @@ def template_dashboard_window():
             underlying_employers_set.add(e)
         employers = employers_from_db
 
-    def add_employer(e):
+    async def add_employer(e):
         nonlocal result_label
         text = f"""{e.control}, 
 
@@ -393,7 +378,7 @@ def template_dashboard_window():
             update_page(e)
             return
         try:
-            new_employer_id = UDH.execute_query(
+            new_employer_id = await ADH.execute_query(
                 "INSERT INTO Employers (employer_name, location, notes) VALUES (?, ?, ?)",
                 (employer_name_field.value.strip(), employer_location_field.value.strip(),
                  employer_notes_field.value.strip()), True)
@@ -402,6 +387,7 @@ def template_dashboard_window():
             add_employer_result_label.value = f"Failed to add employer.\n Error: {err}"
             update_page(e)
             return
+        await asyncio.to_thread(CHANGE_FEED.poll)  # it takes the write lock: not on the event loop
         nonlocal employer_dropdown
         clear_employer_fields()
         update_employer_dropdown()
@@ -409,13 +395,13 @@ def template_dashboard_window():
         employer_dropdown.value = new_employer_id
         update_page(e)
 
-    def add_job(e):
+    async def add_job(e):
         selected_employer_id = employer_dropdown.value
         if not selected_employer_id:
             add_job_result_label.value = "Please select an employer."
             update_page(e)
             return
-        new_id = UDH.execute_query(
+        new_id = await ADH.execute_query(
             "INSERT INTO Jobs (job_title, employerID, location, URL, status, notes) VALUES (?, ?, ?, ?, ?, ?)",
             (job_title_field.value.strip(),
              selected_employer_id.strip(),
@@ -424,6 +410,7 @@ def template_dashboard_window():
              job_status_field.value.strip(),
              job_notes_field.value.strip()),
             True)
+        await asyncio.to_thread(CHANGE_FEED.poll)
         title, employer = get_title_and_employer(new_id)
         add_job_result_label.value = (f"Job added successfully!\nJob ID: {new_id}\n"
                                       f"Title: {title}\n"
@@ -514,7 +501,7 @@ def template_dashboard_window():
         update_page(e)
 
 
-    def apply_replacements_and_generate(e):
+    async def apply_replacements_and_generate(e):
         def get_replacements():
             candidates = placeholders_list.controls
             while len(candidates) > 0:
@@ -543,10 +530,10 @@ def template_dashboard_window():
             update_page(e)
             return
 
-        job_title, employer_name = UDH.execute_query("""SELECT j.job_title as title, e.employer_name as employer
+        job_title, employer_name = (await ADH.execute_query("""SELECT j.job_title as title, e.employer_name as employer
         FROM Jobs j
                  INNER JOIN Employers e ON j.employerID = e.employerID
-         WHERE  j.jobID = ?""", (job_id,), fetch_mode=-1)[0]
+         WHERE  j.jobID = ?""", (job_id,), fetch_mode=-1))[0]
 
         for i in '{}[]':
             job_title = job_title.replace(i, '')
@@ -554,7 +541,7 @@ def template_dashboard_window():
 
         if not job_title:
             try:
-                UDH.execute_query("""
+                await ADH.execute_query("""
                 SELECT             
                 """)
             except Exception as e:
@@ -567,20 +554,20 @@ def template_dashboard_window():
         try:
             generate_button.disabled = True
             if template1_name_field.value:
-                apply_replacements(template1_name_field.value,
-                                   replacements.copy(),
-                                   job_title,
-                                   employer_name,
-                                   job_id,
-                                   'resume',
-                                   on_complete)
+                await apply_replacements(template1_name_field.value,
+                                         replacements.copy(),
+                                         job_title,
+                                         employer_name,
+                                         job_id,
+                                         'resume',
+                                         on_complete)
             if template2_name_field.value:
-                apply_replacements(template2_name_field.value,
-                                   replacements.copy(),
-                                   job_title, employer_name,
-                                   job_id,
-                                   'cover_letter',
-                                   on_complete)
+                await apply_replacements(template2_name_field.value,
+                                         replacements.copy(),
+                                         job_title, employer_name,
+                                         job_id,
+                                         'cover_letter',
+                                         on_complete)
         except Exception as ee:
             result_label.value = f"Failed to generate documents.\nError: {ee}"
             update_page(e)
@@ -0,0 +1,77 @@
+from typing import Callable, Dict, List, Optional, Set
+
+from flet import Control, Page
+
+from utils.change_feed import Change, ChangeFeed
+
+HOME_VIEW = 'home'
+DASHBOARD_VIEW = 'dashboard'
+DATA_VIEW = 'data'
+"""Data views (front/data_window.py). They patch themselves from ``CHANGE_FEED``; writers poll it instead."""
+
+
+class ViewCache:
+    """
+    Builds each view the first time it's shown and keeps it, so switching between them doesn't re-run their queries.
+
+    A control belongs to one page, so each page (session) has a cache of its own; see
+    front/controls/main_window.py. Views built from data that changes elsewhere are dropped by ``invalidate``, by
+    hand or through ``watch``, and rebuilt the next time they're shown.
+    """
+
+    def __init__(self, page: Optional[Page] = None):
+        """
+        :param page: the page the views are shown on; ``watch`` invalidates views on its loop.
+        """
+        self.page = page
+        self._factories: Dict[str, Callable[[], Control]] = {}
+        self._views: Dict[str, Control] = {}
+        self._watched: Dict[str, Set[str]] = {}
+        """Table name to the views built from it."""
+        self.builds: Dict[str, int] = {}
+        """Number of times each view was built; for tests and debugging."""
+        self.on_invalidate: Optional[Callable[[str], None]] = None
+        """Called with the name of every invalidated view that was built."""
+
+    def register(self, name: str, factory: Callable[[], Control]) -> None:
+        """Registers (or replaces) the factory of a view. Nothing is built until ``get``."""
+        self._factories[name] = factory
+        self._views.pop(name, None)
+
+    def get(self, name: str) -> Control:
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = self._factories[name]()
+            self.builds[name] = self.builds.get(name, 0) + 1
+        return view
+
+    def is_built(self, name: str) -> bool:
+        return name in self._views
+
+    def invalidate(self, *names: str) -> None:
+        """Drops the named views (all views if none are given); they're rebuilt on their next ``get``."""
+        for name in names or list(self._views):
+            if self._views.pop(name, None) is not None and self.on_invalidate:
+                self.on_invalidate(name)
+
+    def watch(self, feed: ChangeFeed, table: str, *names: str) -> None:
+        """
+        Invalidates the named views whenever ``feed`` reports changes to ``table``. The feed holds this cache weakly:
+        a cache that is thrown away (its page closed) stops following it.
+        """
+        if table not in self._watched:
+            feed.subscribe(table, self._on_changes)
+        self._watched.setdefault(table, set()).update(names)
+
+    def _on_changes(self, changes: List[Change]) -> None:
+        """Change feed callback; may run on any thread, so a cache with a page invalidates on the page's loop."""
+        names = sorted(self._watched.get(changes[0].table, ()))
+        if not names:  # invalidate() without names would drop every view
+            return
+        if self.page:
+            self.page.run_task(self._invalidate_async, *names)
+        else:
+            self.invalidate(*names)
+
+    async def _invalidate_async(self, *names: str) -> None:
+        self.invalidate(*names)
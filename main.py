@@ -1,6 +1,8 @@
 import flet as ft
 
+from core.global_handlers import prepare_database
 from front.controls.main_window import main_window
 
 if __name__ == "__main__":
+    prepare_database()
     ft.app(target=main_window)
@@ -0,0 +1,59 @@
+"""
+Shared test set-up.
+
+The app database (``core.global_handlers.DATABASE_PATH``) is a copy of data/applications.sqlite made for the
+session, so running the tests never changes the tracked file. Tests that need their own database get a new one from
+``make_app_db`` or ``migrated_db``.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from core.migrations import APP_MIGRATIONS
+from utils.database_handler import DatabaseHandler
+from utils.enums import RowMode
+from utils.migrations import MigrationRunner
+from utils.path_utils import PathManager, PathFlag
+
+_SESSION_FOLDER = tempfile.mkdtemp(prefix='application-tracker-tests-')
+# Set before any test module imports core.global_handlers, which reads it.
+os.environ['APPLICATION_TRACKER_DATABASE'] = shutil.copy(
+    PathManager.resolve_path('data/applications.sqlite', PathFlag.FROM_PROJECT_ROOT), _SESSION_FOLDER)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def app_database():
+    """The session's copy of the app database, migrated as at app start-up."""
+    from core.global_handlers import UNIVERSAL_DATABASE_HANDLER, prepare_database
+    prepare_database()
+    yield UNIVERSAL_DATABASE_HANDLER
+    shutil.rmtree(_SESSION_FOLDER, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def make_app_db(tmp_path_factory):
+    """
+    Makes new, empty app databases in temporary folders: data/make_db_script.sql, then (if ``migrate``) the
+    migrations, as at app start-up. Takes ``execute_mode``, ``pragma_profile`` and ``migrate``.
+    """
+    handlers = []
+
+    def make(execute_mode=RowMode.ROW, pragma_profile='interactive', migrate: bool = True) -> DatabaseHandler:
+        db = DatabaseHandler(tmp_path_factory.mktemp('db') / 'applications.sqlite', 'data/make_db_script.sql',
+                             execute_mode=execute_mode, pragma_profile=pragma_profile)
+        if migrate:
+            MigrationRunner(db, 'data/migrations', APP_MIGRATIONS).migrate()
+        handlers.append(db)
+        return db
+
+    yield make
+    for db in handlers:
+        db.close()
+
+
+@pytest.fixture
+def migrated_db(make_app_db) -> DatabaseHandler:
+    """A new app database with every migration applied; ``sqlite3.Row`` rows."""
+    return make_app_db()
@@ -0,0 +1,52 @@
+"""
+First-paint cost of ``DatabaseView`` on the Jobs tab query, for 10k and 100k jobs: time to build the control
+(query + row controls) and the number of live controls sent to the client, per mode.
+
+Run from the project root: ``python -m tests.manual_benchmark_database_view``
+"""
+import os
+import tempfile
+import time
+
+from flet import Control
+
+from front.controls.database_view import DatabaseView
+from utils.database_handler import DatabaseHandler
+
+SIZES = [10_000, 100_000]
+QUERY = '''SELECT jobID as ID, job_title as Title, e.employer_name as Employer, j.location as Location, URL,
+                  annual_pay as Salary, strftime('%F', date_added) as Added
+           FROM Jobs j JOIN Employers e on e.employerID = j.employerID'''
+COLUMNS = ['ID', 'Title', 'Employer', 'Location', 'URL', 'Salary', 'Added']
+MODES = {
+    'all rows':       {},
+    'load more, 100': {'order_by': ['ID'], 'page_size': 100},
+    'virtualized, 50': {'order_by': ['ID'], 'virtualized': True},
+}
+
+
+def make_database(rows: int) -> str:
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    db = DatabaseHandler(path, 'data/make_db_script.sql', execute_mode=False, pragma_profile='bulk-load')
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+    db.insert_bulk_data('''INSERT INTO Jobs (job_title, employerID, location, URL, annual_pay)
+                           VALUES (?, 1, 'Toronto, ON', ?, '100000')''',
+                        [(f'Job {i}', f'https://example.com/{i}') for i in range(rows)])
+    db.close()
+    return path
+
+
+def count_controls(control: Control) -> int:
+    return 1 + sum(count_controls(child) for child in control._get_children())
+
+
+if __name__ == '__main__':
+    print(f"{'rows':>8}  {'mode':<18}{'seconds':>10}{'controls':>12}")
+    for size in SIZES:
+        path = make_database(size)
+        for mode, options in MODES.items():
+            start = time.perf_counter()
+            view = DatabaseView(path, 'Jobs', QUERY, COLUMNS, **options)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>8}  {mode:<18}{elapsed:>10.3f}{count_controls(view):>12}")
+            view.db.close()
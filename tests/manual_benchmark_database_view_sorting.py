@@ -0,0 +1,59 @@
+"""
+Sorting and filtering the Jobs tab (``DatabaseView.sort_by``/``filter_by``) on 50k jobs: time until the first
+window of the new order is ready, per column and direction.
+
+Run from the project root: ``python -m tests.manual_benchmark_database_view_sorting``
+"""
+import os
+import random
+import tempfile
+import time
+
+from core.migrations import APP_MIGRATIONS
+from front.controls.database_view import DatabaseView
+from front.data_window import _JOBS_QUERY
+from utils.database_handler import DatabaseHandler
+from utils.migrations import MigrationRunner
+
+JOBS = 50_000
+COLUMNS = ['ID', 'Title', 'Employer', 'Location', 'URL', 'Salary', 'Ft/Pt', 'Job Type', 'Format', 'Added',
+           'Applied on', 'Updated']
+CITIES = ['Toronto, ON', 'Ottawa, ON', 'Montreal, QC', 'Vancouver, BC', 'Calgary, AB', None]
+
+
+def make_database() -> str:
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    db = DatabaseHandler(path, 'data/make_db_script.sql', execute_mode=False, pragma_profile='bulk-load')
+    MigrationRunner(db, 'data/migrations', APP_MIGRATIONS).migrate()
+    db.insert_bulk_data("INSERT INTO Employers (employer_name) VALUES (?)", [(f'Employer {i}',) for i in range(500)])
+    db.insert_bulk_data('''INSERT INTO Jobs (job_title, employerID, location, URL, annual_pay, date_added,
+                                             date_applied)
+                           VALUES (?, ?, ?, ?, ?, date('2024-01-01', ?), ?)''',
+                        [(f'{rng.choice(["Senior", "Junior", "Lead"])} Developer {i}', rng.randint(1, 500),
+                          rng.choice(CITIES), f'https://example.com/{i}', str(rng.randrange(50, 150) * 1000),
+                          f'+{rng.randrange(365)} days', rng.choice([None, '2024-06-01']))
+                         for i in range(JOBS)])
+    db.close()
+    return path
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    view = DatabaseView(make_database(), 'Jobs', _JOBS_QUERY, COLUMNS, order_by=['ID'], page_size=100,
+                        virtualized=True, key_column='ID', sortable=True, filterable=True)
+    print(f"{'sort by':<14}{'asc ms':>10}{'desc ms':>10}{'next ms':>10}")
+    for column in COLUMNS:
+        ascending = timed(lambda: view.sort_by(column))
+        descending = timed(lambda: view.sort_by(column, ascending=False))
+        next_window = timed(lambda: view.show_window(1))
+        print(f"{column:<14}{ascending:>10.1f}{descending:>10.1f}{next_window:>10.1f}")
+    view.sort_by('Title')
+    for column, text in [('Title', 'lead'), ('Location', 'ottawa'), ('Employer', 'employer 42')]:
+        print(f"filter {column} ~ {text!r}: {timed(lambda: view.filter_by(column, text)):.1f} ms")
+    view.db.close()
@@ -0,0 +1,59 @@
+"""
+``search_jobs`` (FTS5) against a ``LIKE '%…%'`` scan of posting text and notes, on 50k postings.
+
+Run from the project root: ``python -m tests.manual_benchmark_job_search``
+"""
+import os
+import random
+import tempfile
+import time
+
+from core.database_interaction_methods import search_jobs
+from core.migrations import APP_MIGRATIONS
+from utils.database_handler import DatabaseHandler
+from utils.enums import RowMode
+from utils.migrations import MigrationRunner
+
+POSTINGS = 50_000
+REPEATS = 20
+TERMS = ['kubernetes', 'payroll', 'django', 'forklift', 'accessibility']
+WORDS = ('team build manage customer support data report design develop test deploy service client product '
+         'process quality office remote schedule budget analysis system network security training').split()
+
+LIKE_QUERY = """SELECT jobID, job_title FROM Jobs
+                WHERE job_text LIKE '%' || ? || '%' OR notes LIKE '%' || ? || '%'"""
+"""No LIMIT: like ``search_jobs``, which has to find (and rank) every match before returning the best 20."""
+
+
+def make_database() -> DatabaseHandler:
+    rng = random.Random(0)
+    db = DatabaseHandler(os.path.join(tempfile.mkdtemp(), 'bench.sqlite'), 'data/make_db_script.sql',
+                         execute_mode=RowMode.ROW, pragma_profile='bulk-load')
+    MigrationRunner(db, 'data/migrations', APP_MIGRATIONS).migrate()
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+
+    def text(words: int) -> str:
+        chosen = rng.choices(WORDS, k=words)
+        chosen[rng.randrange(words)] = rng.choice(TERMS) if rng.random() < 0.05 else chosen[0]
+        return ' '.join(chosen)
+
+    db.insert_bulk_data('''INSERT INTO Jobs (job_title, employerID, job_text, notes) VALUES (?, 1, ?, ?)''',
+                        [(f'Job {i}', text(300), text(20)) for i in range(POSTINGS)])
+    return db
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+if __name__ == '__main__':
+    handler = make_database()
+    print(f"{'term':<16}{'LIKE ms':>10}{'FTS5 ms':>10}")
+    for term in TERMS + ['zeppelin']:  # the last one matches nothing
+        like_ms = timed(lambda: handler.execute_query(LIKE_QUERY, (term, term)))
+        fts_ms = timed(lambda: search_jobs(term, db=handler))
+        print(f"{term:<16}{like_ms:>10.2f}{fts_ms:>10.2f}")
+    handler.close()
@@ -0,0 +1,55 @@
+"""
+Per-document PDF latency: a LibreOffice process per document (cold) vs one office kept running and driven over UNO
+(warm). The first warm conversion includes starting the office; the rest don't.
+
+Needs LibreOffice; the warm backend also needs its ``uno`` module (run with LibreOffice's Python, or a Python that
+has ``python3-uno``).
+
+Run from the project root: ``python -m tests.manual_benchmark_pdf_conversion``
+"""
+import os
+import statistics
+import tempfile
+import time
+
+from docx import Document
+
+from utils.pdf_conversion import ConversionError, LibreOfficeBackend, LibreOfficeDaemonBackend, PdfBackend
+
+DOCUMENTS = 10
+
+
+def make_documents(count: int) -> list:
+    folder = tempfile.mkdtemp()
+    paths = []
+    for i in range(count):
+        doc = Document()
+        doc.add_heading(f'Cover letter {i}', 1)
+        for _ in range(12):
+            doc.add_paragraph('Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 6)
+        paths.append(os.path.join(folder, f'letter_{i}.docx'))
+        doc.save(paths[-1])
+    return paths
+
+
+def timings(backend: PdfBackend, paths: list) -> list:
+    result = []
+    for path in paths:
+        start = time.perf_counter()
+        backend.convert(path, path.replace('.docx', f'.{backend.name}.pdf'))
+        result.append(time.perf_counter() - start)
+    backend.close()
+    return result
+
+
+if __name__ == '__main__':
+    documents = make_documents(DOCUMENTS)
+    print(f"{'backend':<22}{'first (s)':>12}{'median of rest (s)':>22}")
+    for make in (LibreOfficeBackend, LibreOfficeDaemonBackend):
+        try:
+            backend = make()
+        except ConversionError as e:
+            print(f"{make.name:<22}skipped: {e}")
+            continue
+        seconds = timings(backend, documents)
+        print(f"{backend.name:<22}{seconds[0]:>12.2f}{statistics.median(seconds[1:]):>22.3f}")
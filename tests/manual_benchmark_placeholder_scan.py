@@ -0,0 +1,53 @@
+"""
+Placeholder discovery on a generated 50-page template (paragraphs and tables, a placeholder or two per block):
+``scan_document`` on a python-docx parse (what ``DocManager`` does for an edited document) vs
+``scan_placeholders`` (one streaming pass over the zip's XML, what it does for a pristine template).
+
+Run from the project root: ``python -m tests.manual_benchmark_placeholder_scan``
+"""
+import os
+import tempfile
+import time
+
+from docx import Document
+
+from core.placeholder_scanner import scan_document, scan_placeholders
+
+PAGES = 50
+RUNS = 10
+
+
+def make_template(pages: int) -> str:
+    doc = Document()
+    for page in range(pages):
+        for i in range(25):
+            doc.add_paragraph(f'Paragraph {i} of page {page}: {{{{Field {i}}}}} and some text around it.')
+        table = doc.add_table(rows=4, cols=3)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f'[[Default {r}-{c}]]'
+        doc.add_page_break()
+    path = os.path.join(tempfile.mkdtemp(), 'fifty_pages.docx')
+    doc.save(path)
+    return path
+
+
+def python_docx_scan(path: str) -> dict:
+    return scan_document(Document(path))[0]
+
+
+def best_of(function, path: str) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    path = make_template(PAGES)
+    assert python_docx_scan(path) == scan_placeholders(path)[0]
+    print(f"{PAGES}-page template, {os.path.getsize(path) // 1024} KiB, best of {RUNS}")
+    print(f"{'python-docx':<20}{best_of(python_docx_scan, path) * 1000:>10.1f} ms")
+    print(f"{'scan_placeholders':<20}{best_of(lambda p: scan_placeholders(p), path) * 1000:>10.1f} ms")
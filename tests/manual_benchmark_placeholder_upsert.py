@@ -0,0 +1,48 @@
+"""
+Saving a template's placeholders to Variables/Document_Variables: the old per-placeholder loop (insert, select,
+insert; one transaction each) vs ``upsert_document_variables``.
+
+Run from the project root: ``python -m tests.manual_benchmark_placeholder_upsert``
+"""
+import os
+import tempfile
+import time
+
+from core.database_interaction_methods import upsert_document_variables
+from utils.database_handler import DatabaseHandler
+
+
+def make_database() -> DatabaseHandler:
+    db = DatabaseHandler(os.path.join(tempfile.mkdtemp(), 'bench.sqlite'), 'data/make_db_script.sql',
+                         execute_mode=False)
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+    db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('Job', 1)")
+    return db
+
+
+def per_placeholder(db: DatabaseHandler, document_id: int, replacements: dict):
+    for placeholder in replacements:
+        name = placeholder.strip('{}[]')
+        db.execute_query("INSERT OR IGNORE INTO Variables (variable_name) VALUES (?)", (name,))
+        variable_id = db.execute_query("SELECT variableID FROM Variables WHERE variable_name = ?", (name,))[0][0]
+        db.execute_query("INSERT OR IGNORE INTO Document_Variables (documentID, variableID, placeholder_name) "
+                         "VALUES (?, ?, ?)", (document_id, variable_id, name))
+
+
+def bulk(db: DatabaseHandler, document_id: int, replacements: dict):
+    upsert_document_variables(document_id, replacements, db)
+
+
+if __name__ == '__main__':
+    print(f"{'placeholders':>12}{'loop (ms)':>12}{'bulk (ms)':>12}")
+    for count in (10, 100, 500, 1000):
+        replacements = {f'{{{{Placeholder {i}}}}}': f'value {i}' for i in range(count)}
+        timings = []
+        for method in (per_placeholder, bulk):
+            db = make_database()
+            document_id = db.execute_query("INSERT INTO Documents (jobID, documentType) VALUES (1, 'resume')")
+            start = time.perf_counter()
+            method(db, document_id, replacements)
+            timings.append((time.perf_counter() - start) * 1000)
+            db.close()
+        print(f"{count:>12}{timings[0]:>12.1f}{timings[1]:>12.1f}")
@@ -0,0 +1,65 @@
+"""
+Read/write concurrency per PRAGMA profile.
+
+One writer commits small transactions while reader threads run the job-picker style query.
+``rollback-journal`` is the configuration the app used before PRAGMA profiles existed.
+
+Run from the project root: ``python -m tests.manual_benchmark_pragma_profiles``
+"""
+import os
+import tempfile
+import threading
+import time
+
+from utils.database_handler import DatabaseHandler, PRAGMA_PROFILES
+
+DURATION = 3.0
+READERS = 4
+ROWS = 5000
+
+PROFILES = {'rollback-journal': {'journal_mode': 'DELETE'}, **PRAGMA_PROFILES}
+
+
+def run(profile_name, profile) -> dict:
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, 'bench.sqlite')
+    script = os.path.join(folder, 'schema.sql')
+    with open(script, 'w') as f:
+        f.write('CREATE TABLE jobs (id INTEGER PRIMARY KEY, title TEXT, status TEXT, last_updated REAL);')
+    db = DatabaseHandler(path, script, execute_mode=False, pool_size=READERS + 1, pragma_profile=profile)
+    db.insert_bulk_data('INSERT INTO jobs (title, status, last_updated) VALUES (?, ?, ?)',
+                        [(f'Job {i}', 'applied', i) for i in range(ROWS)])
+    stop = time.perf_counter() + DURATION
+    counts = {'reads': 0, 'writes': 0, 'read_errors': 0}
+    lock = threading.Lock()
+
+    def writer():
+        while time.perf_counter() < stop:
+            db.execute_query('UPDATE jobs SET last_updated = ? WHERE id = ?', (time.time(), counts['writes'] % ROWS))
+            counts['writes'] += 1
+
+    def reader():
+        while time.perf_counter() < stop:
+            try:
+                db.execute_query("SELECT id, title FROM jobs WHERE status != 'rejected' "
+                                 "ORDER BY last_updated DESC LIMIT 50")
+                with lock:
+                    counts['reads'] += 1
+            except Exception:
+                with lock:
+                    counts['read_errors'] += 1
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(READERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    db.close()
+    return {k: v / DURATION for k, v in counts.items()}
+
+
+if __name__ == '__main__':
+    print(f"{'profile':<18}{'reads/s':>12}{'writes/s':>12}{'read errors/s':>16}")
+    for name, pragmas in PROFILES.items():
+        r = run(name, pragmas)
+        print(f"{name:<18}{r['reads']:>12.0f}{r['writes']:>12.0f}{r['read_errors']:>16.1f}")
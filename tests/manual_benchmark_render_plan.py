@@ -0,0 +1,43 @@
+"""
+Rendering the same template 1,000 times with different values: ``DocManager`` (parse, ``apply_replacements``, save)
+vs ``render_docx`` with the template's compiled ``RenderPlan`` (compiled on the first render).
+
+Run from the project root: ``python -m tests.manual_benchmark_render_plan``
+"""
+import os
+import tempfile
+import time
+
+from core.doc_manager import DocManager
+from core.zip_render import compile_plan, render_docx
+
+TEMPLATE = 'docs/templates/demo_template_resume.docx'
+RENDERS = 1000
+
+
+def values(placeholders, i: int) -> dict:
+    return {p: f'Value {i} for {p.strip("{}[]")}' for p in placeholders}
+
+
+def with_doc_manager(output: str, i: int, placeholders):
+    manager = DocManager(TEMPLATE)
+    manager.apply_replacements(values(placeholders, i), save_placeholders=False)
+    manager.doc.save(output)
+
+
+def with_render_plan(output: str, i: int, placeholders):
+    render_docx(TEMPLATE, output, values(placeholders, i))
+
+
+if __name__ == '__main__':
+    output = os.path.join(tempfile.mkdtemp(), 'out.docx')
+    start = time.perf_counter()
+    placeholders = compile_plan(TEMPLATE).placeholders
+    print(f"compiling the plan: {(time.perf_counter() - start) * 1000:.1f} ms, {len(placeholders)} placeholders")
+    print(f"{'':<14}{'total (s)':>10}{'per render (ms)':>18}")
+    for name, function in (('DocManager', with_doc_manager), ('render plan', with_render_plan)):
+        start = time.perf_counter()
+        for i in range(RENDERS):
+            function(output, i, placeholders)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<14}{elapsed:>10.2f}{elapsed / RENDERS * 1000:>18.2f}")
@@ -0,0 +1,46 @@
+"""
+Memory and latency of each ``RowMode`` when fetching 100k job rows.
+
+Run from the project root: ``python -m tests.manual_benchmark_row_modes``
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from utils.database_handler import DatabaseHandler
+from utils.enums import RowMode
+
+ROWS = 100_000
+QUERY = '''SELECT jobID, job_title, employerID, location, URL, status, annual_pay, ft_pt, job_type, work_model,
+                  date_added, date_applied, notes, archived, last_updated
+           FROM Jobs'''
+
+
+def make_database() -> DatabaseHandler:
+    folder = tempfile.mkdtemp()
+    db = DatabaseHandler(os.path.join(folder, 'bench.sqlite'), 'data/make_db_script.sql', execute_mode=False,
+                         pragma_profile='bulk-load')
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+    db.insert_bulk_data('''INSERT INTO Jobs (job_title, employerID, location, URL, annual_pay, notes)
+                           VALUES (?, 1, 'Toronto, ON', ?, '100000', 'notes')''',
+                        [(f'Job {i}', f'https://example.com/{i}') for i in range(ROWS)])
+    return db
+
+
+if __name__ == '__main__':
+    handler = make_database()
+    print(f"{'mode':<14}{'seconds':>10}{'peak MB':>10}")
+    for mode in RowMode:
+        handler.execute_mode(mode)
+        handler.execute_query(QUERY)  # warm up the statement cache
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = handler.execute_query(QUERY)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assert len(rows) == ROWS
+        del rows
+        print(f"{mode.value:<14}{elapsed:>10.3f}{peak / 2 ** 20:>10.1f}")
+    handler.close()
@@ -0,0 +1,73 @@
+"""
+Saving a filled-in, image-heavy template (a one-page resume with several logos): ``DocManager.apply_replacements`` +
+saving the python-docx ``Document`` vs ``render_docx``, which copies every member without placeholders as it is.
+Time and peak Python memory per render.
+
+Run from the project root: ``python -m tests.manual_benchmark_zip_render``
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from docx import Document
+from docx.shared import Inches
+
+import core.doc_manager
+from core.doc_manager import DocManager
+from core.template_cache import TemplateCache
+from core.zip_render import render_docx
+from tests.test_zip_render import make_png
+
+LOGOS = 8
+RUNS = 20
+VALUES = {'{{Name}}': 'Jon', '{{Email}}': 'jon@example.com', '{{Company}}': 'Initech', '{{Job Title}}': 'Developer'}
+
+
+def make_template() -> str:
+    folder = tempfile.mkdtemp()
+    doc = Document()
+    doc.add_paragraph('{{Name}} - {{Email}}')
+    for i in range(LOGOS):
+        logo = os.path.join(folder, f'logo_{i}.png')
+        with open(logo, 'wb') as f:
+            f.write(make_png(400 + i, 400, noise=True))  # photos and logos don't compress much
+        doc.add_picture(logo, width=Inches(1))
+        doc.add_paragraph(f'Experience {i}: {{{{Job Title}}}} at {{{{Company}}}}. ' * 3)
+    path = os.path.join(folder, 'resume_with_logos.docx')
+    doc.save(path)
+    return path
+
+
+def with_doc_manager(template: str, output: str):
+    manager = DocManager(template)
+    manager.apply_replacements(VALUES, save_placeholders=False)
+    manager.doc.save(output)
+
+
+def with_zip_render(template: str, output: str):
+    render_docx(template, output, VALUES)
+
+
+def measure(function, template: str, output: str):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function(template, output)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function(template, output)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+if __name__ == '__main__':
+    core.doc_manager.TEMPLATES = TemplateCache(max_entries=0)  # parse the template every time, as before the cache
+    template = make_template()
+    output = template.replace('.docx', '.out.docx')
+    print(f"template: {os.path.getsize(template) // 1024} KiB, {LOGOS} images; best of {RUNS}")
+    print(f"{'':<24}{'ms':>8}{'peak KiB':>12}")
+    for name, function in (('DocManager + save', with_doc_manager), ('render_docx', with_zip_render)):
+        seconds, peak = measure(function, template, output)
+        print(f"{name:<24}{seconds * 1000:>8.1f}{peak // 1024:>12}")
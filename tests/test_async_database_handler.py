@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.async_database_handler import AsyncDatabaseHandler
+from utils.database_handler import DatabaseHandler
+
+DB_NAME = r"tests/data/test_database.db"
+CREATION_SCRIPT = r"tests/data/dummy_data.sql"
+
+
+@pytest.fixture
+def async_db():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    adh = AsyncDatabaseHandler(handler)
+    yield adh
+    adh.close()
+    handler.close()
+
+
+def test_async_select(async_db):
+    result = asyncio.run(async_db.execute_query("SELECT name FROM users ORDER BY id", fetch_mode=1))
+    assert result == ('Alice',)
+
+
+def test_async_select_all(async_db):
+    result = asyncio.run(async_db.select_all("users"))
+    assert len(result) == 5
+
+
+def test_writes_run_on_writer_thread(async_db):
+    async def write_and_read():
+        thread_names = []
+        original = async_db.handler.execute_query
+
+        def spy(*args):
+            thread_names.append(threading.current_thread().name)
+            return original(*args)
+
+        async_db.handler.execute_query = spy
+        try:
+            row_id = await async_db.execute_query("INSERT INTO products (name, price, stock) VALUES (?, ?, ?)",
+                                                  ("Async Widget", 1.5, 3))
+            row = await async_db.execute_query("SELECT name FROM products WHERE id = ?", (row_id,), 1)
+            await async_db.execute_query("DELETE FROM products WHERE id = ?", (row_id,))
+        finally:
+            del async_db.handler.execute_query
+        return row, thread_names
+
+    row, thread_names = asyncio.run(write_and_read())
+    assert row == ('Async Widget',)
+    assert thread_names[0].startswith('db-writer')
+    assert thread_names[1].startswith('db-reader')
+    assert thread_names[2].startswith('db-writer')
+
+
+def test_event_loop_not_blocked(async_db):
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await async_db.execute_query("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 200000) "
+                                     "SELECT COUNT(*) FROM c", fetch_mode=1)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 1
@@ -0,0 +1,95 @@
+import subprocess
+import sys
+
+import pytest
+from docx import Document
+
+import core.bulk_generation
+from core.bulk_generation import generate, plan_generation, render
+from utils.path_utils import get_project_root
+
+
+@pytest.fixture
+def db(migrated_db):
+    migrated_db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Initech'), ('Globex')")
+    migrated_db.insert_bulk_data("INSERT INTO Jobs (job_title, employerID, location) VALUES (?, ?, ?)", [
+        ('Python Developer', 1, 'Toronto, ON'),
+        ('Data/ML Analyst', 2, None),
+    ])
+    return migrated_db
+
+
+@pytest.fixture
+def templates(tmp_path):
+    resume = Document()
+    resume.add_paragraph('{{Name}} - {{Job Title}}')
+    resume.save(str(tmp_path / 'resume.docx'))
+    letter = Document()
+    letter.add_paragraph('Dear {{Company}}, [[|Location|Remote]] {{Signature}}')
+    letter.save(str(tmp_path / 'letter.docx'))
+    return {'resume': str(tmp_path / 'resume.docx'), 'cover_letter': str(tmp_path / 'letter.docx')}
+
+
+def test_plan_fills_placeholders_from_jobs(db, templates, tmp_path):
+    tasks = plan_generation([1, 2, 99], templates, {'{{Name}}': 'Jon'}, str(tmp_path / 'out'), db=db)
+    assert [(t.job_id, t.doc_type) for t in tasks] == [(1, 'resume'), (1, 'cover_letter'),
+                                                        (2, 'resume'), (2, 'cover_letter')]
+    assert tasks[0].replacements == {'{{Name}}': 'Jon', '{{Job Title}}': 'Python Developer'}
+    assert tasks[1].replacements == {'{{Company}}': 'Initech', '[[|Location|Remote]]': 'Toronto, ON'}
+    assert tasks[1].missing == ['{{Signature}}']
+    assert tasks[3].replacements['[[|Location|Remote]]'] == 'Remote'  # no location: the default
+    assert tasks[2].output_path.endswith('resume - Data-ML Analyst - Globex - 2.docx')
+
+
+def test_plan_names_are_unique_per_job(db, templates, tmp_path):
+    db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('Python Developer', 1)")
+    tasks = plan_generation([1, 3], templates, output_dir=str(tmp_path / 'out'), db=db)
+    assert len({t.output_path for t in tasks}) == len(tasks) == 4
+    results = [render(t) for t in tasks]
+    assert all(r.ok for r in results)
+    assert len(list((tmp_path / 'out').iterdir())) == 4
+
+
+def test_render_captures_errors(db, templates, tmp_path):
+    task = plan_generation([1], {'resume': templates['resume']}, output_dir=str(tmp_path / 'out'), db=db)[0]
+    task.template = str(tmp_path / 'missing.docx')
+    result = render(task)
+    assert not result.ok and result.docx_path is None and 'missing.docx' in result.error
+
+
+def test_render_pdf(db, templates, tmp_path, monkeypatch):
+    class FakeBackend:
+        def convert(self, docx_path, pdf_path):
+            with open(pdf_path, 'w') as f:
+                f.write(docx_path)
+
+    monkeypatch.setattr(core.bulk_generation, '_pdf_backend', FakeBackend())
+    task = plan_generation([1], {'resume': templates['resume']}, output_dir=str(tmp_path / 'out'), pdf=True,
+                           db=db)[0]
+    result = render(task)
+    assert result.ok and result.pdf_path == task.output_path[:-len('.docx')] + '.pdf'
+    assert open(result.pdf_path).read() == task.output_path
+
+
+def test_workers_do_not_import_global_handlers():
+    """A worker unpickling ``render`` imports its module; the app's database start-up must stay in the parent."""
+    code = ('import sys, core.bulk_generation, core.zip_render; '
+            'assert "core.global_handlers" not in sys.modules, sorted(m for m in sys.modules if m.startswith("core"))')
+    subprocess.run([sys.executable, '-c', code], cwd=get_project_root(), check=True, capture_output=True)
+
+
+def test_generate(db, templates, tmp_path):
+    tasks = plan_generation([1, 2], templates, {'{{Name}}': 'Jon'}, str(tmp_path / 'out'), db=db)
+    tasks[3].template = str(tmp_path / 'missing.docx')
+    progress = []
+    results = generate(tasks, workers=2, progress=lambda done, total, _: progress.append((done, total)), db=db)
+    assert progress == [(i, 4) for i in range(1, 5)]
+    assert [r.ok for r in results] == [True, True, True, False]
+    assert Document(results[0].docx_path).paragraphs[0].text == 'Jon - Python Developer'
+    stored = db.execute_query('''SELECT d.jobID, d.documentType, s.fileType, s.path || '/' || s.file_name
+                                 FROM Documents d JOIN Document_Storage s ON s.documentID = d.documentID''',
+                              fetch_mode=-1)
+    assert sorted(tuple(row) for row in stored) == sorted((t.job_id, t.doc_type, 'docx', t.output_path)
+                                                          for t in tasks[:3])
+    assert {row[0] for row in db.execute_query('SELECT variable_name FROM Variables', fetch_mode=-1)} == {
+        'Name', 'Job Title', 'Company', '|Location|Remote'}
@@ -0,0 +1,124 @@
+import asyncio
+import gc
+import threading
+
+import pytest
+
+from front.controls.database_view import DatabaseView
+from utils.change_feed import ChangeFeed, Change
+from utils.database_handler import DatabaseHandler
+from utils.enums import RowMode
+
+
+@pytest.fixture
+def db_path(migrated_db):
+    migrated_db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Initech')")
+    return migrated_db.database
+
+
+@pytest.fixture
+def db(db_path):
+    handler = DatabaseHandler(db_path, execute_mode=RowMode.ROW)
+    yield handler
+    handler.close()
+
+
+def test_poll_delivers_latest_change_per_row(db):
+    feed = ChangeFeed(db)
+    received = []
+    feed.subscribe('Jobs', received.append)
+    job_id = db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('Dev', 1)")
+    db.execute_query("UPDATE Jobs SET status = 'interview' WHERE jobID = ?", (job_id,))
+    db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('QA', 1)")
+    changes = feed.poll()
+    assert changes == [Change('Jobs', job_id, 'UPDATE'), Change('Jobs', job_id + 1, 'INSERT')]
+    assert received == [changes]
+    assert feed.poll() == []
+    assert received == [changes]  # nothing new: not called
+
+
+def test_subscribers_only_get_their_table(db):
+    feed = ChangeFeed(db)
+    jobs, employers = [], []
+    feed.subscribe('Jobs', jobs.append)
+    feed.subscribe('Employers', employers.append)
+    db.execute_query("UPDATE Employers SET industry = 'Software' WHERE employerID = 1")
+    feed.poll()
+    assert jobs == []
+    assert employers == [[Change('Employers', 1, 'UPDATE')]]
+    feed.unsubscribe('Employers', employers.append)
+    db.execute_query("DELETE FROM Employers WHERE employerID = 1")
+    feed.poll()
+    assert len(employers) == 1
+
+
+def test_subscribers_are_held_weakly(db):
+    class View:
+        def __init__(self):
+            self.changes = []
+
+        def on_change(self, changes):
+            self.changes.extend(changes)
+
+    feed = ChangeFeed(db)
+    view = View()
+    feed.subscribe('Employers', view.on_change)
+    del view
+    gc.collect()
+    db.execute_query("UPDATE Employers SET industry = 'Software' WHERE employerID = 1")
+    assert feed.poll() == [Change('Employers', 1, 'UPDATE')]
+    assert feed._subscribers['Employers'] == []
+
+
+def test_old_log_entries_are_pruned(db):
+    feed = ChangeFeed(db, keep=2)
+    db.insert_bulk_data("INSERT INTO Jobs (job_title, employerID) VALUES (?, 1)", [(f"Job {i}",) for i in range(5)])
+    feed.poll()
+    assert db.execute_query("SELECT COUNT(*) AS n FROM Change_Log")[0]['n'] == 2
+
+
+@pytest.mark.parametrize("options", [{}, {'order_by': ['ID'], 'virtualized': True, 'page_size': 3}])
+def test_database_view_patches_changed_rows(db, db_path, options):
+    db.insert_bulk_data("INSERT INTO Jobs (job_title, employerID) VALUES (?, 1)", [("A",), ("B",)])
+    feed = ChangeFeed(db)
+    view = DatabaseView(str(db_path), 'Jobs', "SELECT jobID AS ID, job_title AS Title FROM Jobs", ['ID', 'Title'],
+                        change_feed=feed, source_table='Jobs', key_column='ID', **options)
+    first_row = view.table.rows[0]
+    db.execute_query("UPDATE Jobs SET job_title = 'B2' WHERE jobID = 2")
+    db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('C', 1)")
+    feed.poll()
+    assert [(r['ID'], r['Title']) for r in view.data] == [(1, 'A'), (2, 'B2'), (3, 'C')]
+    assert view.table.rows[0] is first_row  # untouched rows keep their controls
+    db.execute_query("DELETE FROM Jobs WHERE jobID = 1")
+    feed.poll()
+    assert [r['ID'] for r in view.data] == [2, 3]
+    assert sum(row.visible is not False for row in view.table.rows) == 2
+    view.db.close()
+
+
+def test_database_view_on_a_page_is_patched_on_the_page_loop(db, db_path):
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
+    updated_on = []
+
+    class Page:
+        def run_task(self, handler, *args):
+            return asyncio.run_coroutine_threadsafe(handler(*args), loop)
+
+        def update(self, *controls):
+            updated_on.append(threading.current_thread())
+
+    feed = ChangeFeed(db)
+    view = DatabaseView(str(db_path), 'Jobs', "SELECT jobID AS ID, job_title AS Title FROM Jobs", ['ID', 'Title'],
+                        change_feed=feed, source_table='Jobs', key_column='ID')
+    view.page = Page()
+    db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('A', 1)")
+    poller = threading.Thread(target=feed.poll)  # as from a WriteQueue callback
+    poller.start()
+    poller.join()
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(timeout=5)  # runs after the patch
+    assert [r['Title'] for r in view.data] == ['A']
+    assert updated_on == [loop_thread]
+    loop.call_soon_threadsafe(loop.stop)
+    view.db.close()
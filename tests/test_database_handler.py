@@ -1,7 +1,10 @@
 import os
+import sqlite3
+import threading
 
 import pytest
-from utils.database_handler import DatabaseHandler
+from utils.database_handler import ConnectionPool, DatabaseHandler, PRAGMA_PROFILES, WriteQueue
+from utils.enums import RowMode
 from utils.path_utils import PathManager, PathFlag
 
 DB_NAME = r"tests/data/test_database.db"
@@ -76,8 +79,304 @@ def test_get_table_metadata(db_handler):
 @pytest.mark.parametrize("factory, expected_type", [
     (False, tuple),
     (True, dict),
+    (RowMode.ROW, sqlite3.Row),
+    ('named_tuple', tuple),
 ])
 def test_use_row_factory(db_handler, factory, expected_type):
     db_handler.execute_mode(factory)
     result = db_handler.execute_query("SELECT * FROM users", fetch_mode=-1)
     assert isinstance(result[0], expected_type)
+
+
+# ---- Connection Pool Tests ----
+
+def test_connections_are_reused(db_handler):
+    opened = db_handler.connections_opened
+    for _ in range(20):
+        db_handler.execute_query("SELECT * FROM users", fetch_mode=-1)
+    assert db_handler.connections_opened == opened
+
+
+def test_pool_size_bounds_connections():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, pool_size=2)
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        for _ in range(10):
+            handler.execute_query("SELECT * FROM users", fetch_mode=-1)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert 1 <= handler.connections_opened <= 2
+    handler.close()
+
+
+def test_unhealthy_connection_is_replaced():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, pool_size=1)
+    with handler.connection() as conn:
+        pass
+    conn.close()  # simulate a connection that died while idle
+    assert handler.execute_query("SELECT COUNT(*) AS c FROM users", fetch_mode=1)['c'] == 5
+    assert handler.connections_opened == 2
+    handler.close()
+
+
+@pytest.fixture
+def traced_pool(tmp_path):
+    """A pool whose connections record every statement they run."""
+    statements = []
+    pool = ConnectionPool(tmp_path / 'pool.db', pool_size=1,
+                          on_connect=lambda c: c.set_trace_callback(statements.append))
+    yield pool, statements
+    pool.close()
+
+
+def test_checkout_does_not_query(traced_pool):
+    pool, statements = traced_pool
+    for _ in range(5):
+        with pool.connection():
+            pass
+    assert statements == [] and pool.connections_opened == 1
+
+
+def test_connection_is_tested_after_an_error(traced_pool):
+    pool, statements = traced_pool
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.connection() as conn:
+            conn.execute('SELECT * FROM missing')
+    with pool.connection():
+        pass
+    assert statements[-1] == 'SELECT 1'
+    with pool.connection():
+        pass
+    assert statements.count('SELECT 1') == 1  # passed: trusted again
+    assert pool.connections_opened == 1
+
+
+def test_connection_is_tested_after_idling(tmp_path):
+    statements = []
+    pool = ConnectionPool(tmp_path / 'pool.db', on_connect=lambda c: c.set_trace_callback(statements.append),
+                          health_check_after=0)
+    for _ in range(2):
+        with pool.connection():
+            pass
+    assert statements == ['SELECT 1']
+    pool.close()
+
+
+def test_closed_handler_refuses_queries():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT)
+    handler.execute_query("SELECT 1")
+    handler.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        handler.execute_query("SELECT 1")
+
+
+# ---- PRAGMA Profile Tests ----
+
+@pytest.mark.parametrize("profile", list(PRAGMA_PROFILES))
+def test_pragma_profile_applied(profile):
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False, pragma_profile=profile)
+    expected = PRAGMA_PROFILES[profile]
+    assert handler.execute_query("PRAGMA journal_mode", fetch_mode=-1) is None  # not a SELECT
+    with handler.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0].upper() == expected['journal_mode']
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == expected['cache_size']
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == expected['busy_timeout']
+    handler.close()
+
+
+def test_unknown_pragma_profile():
+    with pytest.raises(ValueError):
+        DatabaseHandler(DB_NAME, CREATION_SCRIPT, pragma_profile='fastest')
+
+
+def test_wal_readers_do_not_block_on_writer():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    with handler.connection() as writer:
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("UPDATE users SET age = age + 1 WHERE id = 1")
+        # a second thread can still read the last committed state while the write is open
+        result = []
+        reader = threading.Thread(
+            target=lambda: result.append(handler.execute_query("SELECT age FROM users WHERE id = 1", fetch_mode=1)))
+        reader.start()
+        reader.join(timeout=2)
+        writer.rollback()
+    assert result == [(30,)]
+    handler.close()
+
+
+# ---- Statement Cache Tests ----
+
+def test_statement_cache_hits():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=True)
+    query = "SELECT id, name FROM users WHERE age > ?"
+    handler.execute_query(query, (0,))
+    misses = handler.statement_cache.misses
+    for _ in range(5):
+        result = handler.execute_query(query, (0,))
+    assert handler.statement_cache.misses == misses
+    assert handler.statement_cache.get(query).columns == ('id', 'name')
+    assert result[0] == {'id': 1, 'name': 'Alice'}
+    handler.close()
+
+
+def test_statement_cache_cleared_on_schema_change():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=True)
+    handler.execute_query("CREATE TABLE IF NOT EXISTS cache_probe (a INTEGER)")
+    handler.execute_query("INSERT INTO cache_probe (a) VALUES (1)")
+    assert handler.execute_query("SELECT * FROM cache_probe") == [{'a': 1}]
+    handler.execute_query("ALTER TABLE cache_probe RENAME COLUMN a TO b")
+    assert handler.execute_query("SELECT * FROM cache_probe") == [{'b': 1}]
+    handler.execute_query("DROP TABLE cache_probe")
+    handler.close()
+
+
+# ---- Streaming Tests ----
+
+def test_iter_query_rows(db_handler):
+    db_handler.execute_mode(False)
+    rows = list(db_handler.iter_query("SELECT * FROM users ORDER BY id", batch_size=2))
+    assert rows == db_handler.execute_query("SELECT * FROM users ORDER BY id")
+
+
+def test_iter_query_batches(db_handler):
+    db_handler.execute_mode(True)
+    batches = list(db_handler.iter_query("SELECT id FROM users ORDER BY id", batch_size=2, batches=True))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert batches[0][0] == {'id': 1}
+
+
+def test_iter_query_releases_connection_when_closed():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, pool_size=1)
+    rows = handler.iter_query("SELECT * FROM users", batch_size=1)
+    next(rows)
+    rows.close()
+    assert handler.execute_query("SELECT COUNT(*) AS c FROM users", fetch_mode=1) == {'c': 5}
+    handler.close()
+
+
+def test_iter_query_inside_transaction_uses_its_connection():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False, pool_size=1)
+    with pytest.raises(ZeroDivisionError):
+        with handler.transaction() as conn:
+            conn.execute("INSERT INTO users (name, age, email) VALUES ('Uncommitted', 1, 'uncommitted@example.com')")
+            names = [row[0] for row in handler.iter_query("SELECT name FROM users ORDER BY id", batch_size=2)]
+            assert names[-1] == 'Uncommitted' and len(names) == 6
+            1 / 0
+    assert handler.execute_query("SELECT COUNT(*) FROM users", fetch_mode=1) == (5,)
+    assert handler.connections_opened == 1
+    handler.close()
+
+
+# ---- Row Mode Tests ----
+
+def test_row_mode_sqlite_row(db_handler):
+    db_handler.execute_mode(RowMode.ROW)
+    row = db_handler.execute_query("SELECT id, name AS 'Full Name' FROM users ORDER BY id", fetch_mode=1)
+    assert row['Full Name'] == row[1] == 'Alice'
+    assert row['ID'] == 1  # sqlite3.Row lookups are case-insensitive
+    assert dict(row) == {'id': 1, 'Full Name': 'Alice'}
+
+
+def test_row_mode_named_tuple_class_is_shared(db_handler):
+    db_handler.execute_mode(RowMode.NAMED_TUPLE)
+    query = "SELECT id, name, email AS 'e-mail' FROM users ORDER BY id"
+    rows = db_handler.execute_query(query)
+    assert rows[0].name == 'Alice'
+    assert rows[0][2] == 'alice@example.com'
+    assert type(rows[0]) is type(rows[-1]) is db_handler.statement_cache.get(query).row_class
+    assert list(db_handler.iter_query(query)) == rows
+
+
+# ---- Write Queue Tests ----
+
+def test_write_queue_group_commit():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    write_queue = WriteQueue(handler, interval=0.5, max_batch=10)
+    futures = [write_queue.submit("INSERT INTO products (name, price, stock) VALUES (?, ?, ?)", (f"queued {i}", 1, i))
+               for i in range(10)]
+    ids = [f.result(timeout=5) for f in futures]
+    assert write_queue.commits == 1
+    assert ids == list(range(ids[0], ids[0] + 10))
+    deleted = write_queue.submit("DELETE FROM products WHERE name LIKE 'queued %'")
+    write_queue.close()
+    assert deleted.result() == 10
+
+
+def test_write_queue_failed_write_does_not_undo_group():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    write_queue = WriteQueue(handler, interval=0.5)
+    good = write_queue.submit("UPDATE users SET age = age WHERE id = 1")
+    bad = write_queue.submit("INSERT INTO users (name, age, email) VALUES ('Dup', 1, 'alice@example.com')")
+    write_queue.flush(timeout=5)
+    assert good.result() == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result()
+    write_queue.close()
+    with pytest.raises(RuntimeError):
+        write_queue.submit("DELETE FROM users WHERE id = -1")
+
+
+def test_write_queue_close_flushes():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    write_queue = WriteQueue(handler, interval=10)
+    future = write_queue.submit("INSERT INTO products (name, price, stock) VALUES ('flushed', 1, 1)")
+    write_queue.close()
+    assert future.done()
+    assert handler.execute_query("DELETE FROM products WHERE name = 'flushed'") == 1
+
+
+def test_write_queue_submit_all_is_one_unit():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    write_queue = WriteQueue(handler, interval=10)
+    insert = "INSERT INTO products (name, price, stock) VALUES (?, 1, 1)"
+    good = write_queue.submit_all([(insert, ('unit 1',)), ("DELETE FROM products WHERE name = 'unit 1'", None)])
+    bad = write_queue.submit_all([(insert, ('unit 2',)),
+                                  ("INSERT INTO users (name, age, email) VALUES ('Dup', 1, 'alice@example.com')", None)])
+    write_queue.close()
+    assert good.result()[1] == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result()
+    assert handler.execute_query("SELECT * FROM products WHERE name LIKE 'unit %'") == []
+    handler.close()
+
+
+def test_write_queue_submit_racing_close():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    for _ in range(20):
+        write_queue = WriteQueue(handler, interval=0)
+        futures, start = [], threading.Barrier(5)
+
+        def submit():
+            start.wait()
+            for _ in range(20):
+                try:
+                    futures.append(write_queue.submit("UPDATE users SET age = age WHERE id = 1"))
+                except RuntimeError:
+                    return
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        write_queue.close()
+        for thread in threads:
+            thread.join()
+        assert all(future.result(timeout=5) == 1 for future in futures)  # nothing was left behind the stop marker
+    handler.close()
+
+
+def test_transaction_rolls_back_on_error():
+    handler = DatabaseHandler(DB_NAME, CREATION_SCRIPT, execute_mode=False)
+    with pytest.raises(sqlite3.IntegrityError):
+        with handler.transaction() as conn:
+            conn.execute("INSERT INTO products (name, price, stock) VALUES ('rolled back', 1, 1)")
+            handler.execute_query("INSERT INTO users (name, age, email) VALUES ('Dup', 1, 'alice@example.com')")
+    assert handler.execute_query("SELECT * FROM products WHERE name = 'rolled back'") == []
+    handler.close()
@@ -1,3 +1,4 @@
+import asyncio
 import random
 import sqlite3
 import string
@@ -5,7 +6,10 @@ import string
 import pytest
 
 from core.database_interaction_methods import insert_variables, insert_employers, insert_jobs, \
-    insert_documents, insert_document_storage, insert_document_variables
+    insert_documents, insert_document_storage, insert_document_variables, select_all_jobs, iter_all_jobs, \
+    upsert_document_variables, search_jobs, job_search_expression, select, search_employers_page, \
+    _JOBS_COLUMNS_WITHOUT_TEXT, insert_employers_async, insert_jobs_async, queue_document_storage
+from core.global_handlers import UNIVERSAL_DATABASE_HANDLER as UDH
 
 
 def random_string(length=10):
@@ -14,7 +18,7 @@ def random_string(length=10):
 
 @pytest.fixture
 def db_connection():
-    conn = sqlite3.connect("../data/applications.sqlite")
+    conn = sqlite3.connect(UDH.database)
     yield conn
     conn.close()
 
@@ -79,6 +83,18 @@ def test_insert_and_verify_document_storage(db_connection):
     db_connection.commit()
 
 
+def test_queue_document_storage(db_connection):
+    file_type = random_string()
+    updated, storage_id = queue_document_storage(1, file_type, "/some/path/", "first.docx").result(timeout=5)
+    assert updated == 0 and storage_id > 0
+    assert queue_document_storage(1, file_type, "/other/path/", "second.docx").result(timeout=5) == [1, 0]
+    cursor = db_connection.cursor()
+    cursor.execute("SELECT storageID, file_name FROM Document_Storage WHERE fileType = ?", (file_type,))
+    assert cursor.fetchall() == [(storage_id, "second.docx")]
+    cursor.execute("DELETE FROM Document_Storage WHERE storageID = ?", (storage_id,))
+    db_connection.commit()
+
+
 def test_insert_and_verify_variables(db_connection):
     variable_name = random_string()
     insert_variables(variable_name)
@@ -102,3 +118,91 @@ def test_insert_and_verify_document_variables(db_connection):
     assert result is not None
     cursor.execute("DELETE FROM Document_Variables WHERE documentID = ? AND variableID = ?", (document_id, variable_id))
     db_connection.commit()
+
+
+def test_insert_async(db_connection):
+    employer_id = asyncio.run(insert_employers_async(random_string(), random_string()))
+    job_id = asyncio.run(insert_jobs_async(random_string(), employer_id, annual_pay='90k'))
+    cursor = db_connection.cursor()
+    cursor.execute("SELECT employerID, annual_pay_min, annual_pay_max FROM Jobs WHERE jobID = ?", (job_id,))
+    assert cursor.fetchone() == (employer_id, 90000.0, 90000.0)
+    cursor.execute("DELETE FROM Jobs WHERE jobID = ?", (job_id,))
+    cursor.execute("DELETE FROM Employers WHERE employerID = ?", (employer_id,))
+    db_connection.commit()
+
+
+def test_iter_all_jobs_matches_select_all(db_connection):
+    all_jobs = select_all_jobs()
+    streamed = list(iter_all_jobs(include_job_text=True, batch_size=3))
+    assert streamed == all_jobs
+    assert all('job_text' not in job for job in iter_all_jobs(batch_size=3))
+
+
+def test_upsert_document_variables(make_app_db):
+    db = make_app_db(execute_mode=False)
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+    db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('Job', 1)")
+    document_id = db.execute_query("INSERT INTO Documents (jobID, documentType) VALUES (1, 'resume')")
+    existing_id = db.execute_query("INSERT INTO Variables (variable_name) VALUES ('Company')")
+
+    replacements = {'{{Company}}': 'ACME', '[[Position]]': 'Developer', '[[Company]]': 'ACME'}
+    ids = upsert_document_variables(document_id, replacements, db)
+    assert ids['Company'] == existing_id
+    assert set(ids) == {'Company', 'Position'}
+    assert upsert_document_variables(document_id, replacements, db) == ids  # idempotent
+
+    links = db.execute_query("SELECT variableID, placeholder_name FROM Document_Variables WHERE documentID = ?",
+                             (document_id,))
+    assert sorted(links) == sorted((v, k) for k, v in ids.items())
+    assert upsert_document_variables(document_id, {}, db) == {}
+
+
+def test_search_jobs(migrated_db):
+    db = migrated_db
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Initech'), ('Globex')")
+    db.insert_bulk_data("INSERT INTO Jobs (job_title, employerID, job_text, notes) VALUES (?, ?, ?, ?)", [
+        ('Python Developer', 1, 'Build services in Django.', None),
+        ('Data Analyst', 2, 'SQL reporting; some Python scripting.', 'Referral from Sam'),
+        ('Office Manager', 2, 'Scheduling and budgets.', None),
+    ])
+    results = search_jobs('python', db=db)
+    assert [r['job_title'] for r in results] == ['Python Developer', 'Data Analyst']  # title matches rank higher
+    assert '[Python]' in results[1]['snippet']
+    assert [r['jobID'] for r in search_jobs('referr', db=db)] == [2]  # prefix of the last word
+    assert [r['jobID'] for r in search_jobs('globex budgets', db=db)] == [3]
+    assert search_jobs('python', limit=1, offset=1, db=db)[0]['jobID'] == 2
+    assert search_jobs('   ', db=db) == []
+    assert search_jobs('"unbalanced AND OR -', db=db) == []
+
+    db.execute_query("UPDATE Jobs SET job_text = 'Rust services.' WHERE jobID = 1")
+    db.execute_query("UPDATE Employers SET employer_name = 'Umbrella' WHERE employerID = 2")
+    db.execute_query("DELETE FROM Jobs WHERE jobID = 3")
+    assert [r['jobID'] for r in search_jobs('rust', db=db)] == [1]
+    assert [r['jobID'] for r in search_jobs('umbrella', db=db)] == [2]
+    assert search_jobs('globex', db=db) == []
+    assert search_jobs('budgets', db=db) == []
+
+
+def test_jobs_columns_without_text(migrated_db):
+    columns = [row['name'] for row in migrated_db.execute_query("SELECT name FROM PRAGMA_TABLE_INFO('Jobs')")]
+    assert [c.strip() for c in _JOBS_COLUMNS_WITHOUT_TEXT.split(',')] == [c for c in columns if c != 'job_text']
+
+
+def test_job_search_expression():
+    assert job_search_expression('python  dev') == '"python" "dev"*'
+    assert job_search_expression('say "hi"') == '"say" """hi"""*'
+    assert job_search_expression(' ') == ''
+
+
+def test_search_employers_page(db_connection):
+    industry = random_string()
+    names = sorted(random_string() for _ in range(3))
+    for name in names:
+        insert_employers(name, industry)
+    first = search_employers_page(industry=industry, limit=2)
+    second = search_employers_page(industry=industry, limit=2, cursor=first.cursor)
+    assert [r['employer_name'] for r in first.rows + second.rows] == names
+    assert second.cursor is None
+    assert len(select('Employers', ['employerID'], 'WHERE industry = ?', (industry,), limit=5)) == 3
+    db_connection.execute("DELETE FROM Employers WHERE industry = ?", (industry,))
+    db_connection.commit()
@@ -0,0 +1,64 @@
+import pytest
+
+from front.controls.database_view import DatabaseView
+from utils.database_handler import DatabaseHandler
+from utils.enums import RowMode
+
+QUERY = "SELECT jobID AS ID, job_title AS Title, location AS Location FROM Jobs"
+COLUMNS = ['ID', 'Title', 'Location']
+
+
+@pytest.fixture
+def db_path(make_app_db):
+    db = make_app_db(execute_mode=False, migrate=False)
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+    db.insert_bulk_data("INSERT INTO Jobs (job_title, employerID, location) VALUES (?, 1, ?)",
+                        [('Developer', 'Toronto'), ('Analyst', None), ('100%_Remote dev', 'Remote'),
+                         ('Designer', 'Ottawa'), ('Developer', 'Ottawa')])
+    return db.database
+
+
+@pytest.mark.parametrize("options", [{}, {'order_by': ['ID'], 'page_size': 2, 'virtualized': True}])
+def test_sort_by(db_path, options):
+    view = DatabaseView(str(db_path), 'Jobs', QUERY, COLUMNS, key_column='ID', sortable=True, **options)
+    view.sort_by('Title')
+    assert [r['ID'] for r in view.data][:2] == [3, 2]
+    view.sort_by('Location', ascending=False)
+    if options:
+        view.show_window(1)
+        view.show_window(2)
+        assert [r['ID'] for r in view.data] == [2]  # NULLs last when descending
+    else:
+        assert [r['ID'] for r in view.data] == [1, 3, 4, 5, 2]
+    assert view.table.sort_column_index == 2 and view.table.sort_ascending is False
+    view.db.close()
+
+
+def test_filter_by(db_path):
+    view = DatabaseView(str(db_path), 'Jobs', QUERY, COLUMNS, order_by=['ID'], page_size=10, key_column='ID',
+                        filterable=True)
+    view.filter_by('Title', 'DEV')
+    assert [r['ID'] for r in view.data] == [1, 3, 5]
+    view.filter_by('Location', 'ottawa')
+    assert [r['ID'] for r in view.data] == [5]
+    view.filter_by('Location', ' ')
+    view.filter_by('Title', '%_')  # wildcards are taken literally
+    assert [r['ID'] for r in view.data] == [3]
+    view.db.close()
+
+
+def test_sortable_needs_key_column(db_path):
+    with pytest.raises(ValueError):
+        DatabaseView(str(db_path), 'Jobs', QUERY, COLUMNS, sortable=True)
+
+
+def test_shares_a_given_handler(db_path):
+    handler = DatabaseHandler(db_path, execute_mode=RowMode.ROW, pragma_profile=None)
+    view = DatabaseView(handler, 'Jobs', QUERY, COLUMNS, order_by=['ID'], page_size=2)
+    assert view.db is handler and [r['ID'] for r in view.data] == [1, 2]
+    assert handler.connections_opened == 1
+    handler.close()
+    tuples = DatabaseHandler(db_path, execute_mode=False)
+    with pytest.raises(ValueError):
+        DatabaseView(tuples, 'Jobs', QUERY, COLUMNS)
+    tuples.close()
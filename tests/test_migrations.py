@@ -0,0 +1,121 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from core.migrations import APP_MIGRATIONS, parse_annual_pay
+from utils.database_handler import DatabaseHandler
+from utils.migrations import MigrationRunner, Migration, BatchedMigration
+from utils.path_utils import PathManager, PathFlag, get_project_root
+
+
+@pytest.fixture
+def db(tmp_path):
+    script = tmp_path / "create.sql"
+    script.write_text("CREATE TABLE Items (itemID INTEGER PRIMARY KEY, name TEXT);")
+    handler = DatabaseHandler(tmp_path / "test.db", script, execute_mode=False)
+    yield handler
+    handler.close()
+
+
+@pytest.fixture
+def migrations(tmp_path):
+    folder = tmp_path / "migrations"
+    folder.mkdir()
+    (folder / "0001_add_price.sql").write_text("ALTER TABLE Items ADD COLUMN price REAL;\n")
+    (folder / "0002_log.sql").write_text("""
+        -- Keeps a log of renamed items.
+        CREATE TABLE Log (name TEXT);
+        CREATE TRIGGER log_rename AFTER UPDATE OF name ON Items
+        BEGIN
+            INSERT INTO Log VALUES (new.name);
+        END;
+    """)
+    (folder / "notes.txt").write_text("not a migration")
+    return folder
+
+
+def user_version(db):
+    return next(db.iter_query("PRAGMA user_version"))[0]
+
+
+def test_migrate_applies_pending_in_order(db, migrations):
+    runner = MigrationRunner(db, migrations)
+    assert [m.version for m in runner.pending()] == [1, 2]
+    applied = runner.migrate()
+    assert [m.name for m in applied] == ['add_price', 'log']
+    assert user_version(db) == 2
+    db.execute_query("INSERT INTO Items (name, price) VALUES ('a', 1.5)")
+    db.execute_query("UPDATE Items SET name = 'b'")
+    assert db.execute_query("SELECT name FROM Log") == [('b',)]
+    assert runner.migrate() == []
+
+
+def test_migrate_up_to_target(db, migrations):
+    runner = MigrationRunner(db, migrations)
+    assert [m.version for m in runner.migrate(target=1)] == [1]
+    assert user_version(db) == 1
+    assert [m.version for m in runner.migrate()] == [2]
+
+
+def test_failed_migration_rolls_back_the_batch(db, migrations):
+    (migrations / "0003_broken.sql").write_text("CREATE TABLE Other (x);\nINSERT INTO Missing VALUES (1);\n")
+    with pytest.raises(sqlite3.OperationalError):
+        MigrationRunner(db, migrations).migrate()
+    assert user_version(db) == 0
+    tables = {row[0] for row in db.execute_query("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {'Items'}
+
+
+def test_duplicate_versions_rejected(db, migrations):
+    (migrations / "0002_again.sql").write_text("SELECT 1;\n")
+    with pytest.raises(ValueError):
+        MigrationRunner(db, migrations).migrations()
+
+
+def test_batched_migration_runs_in_chunks(db, migrations):
+    db.insert_bulk_data("INSERT INTO Items (name) VALUES (?)", [(f"item {i}",) for i in range(1, 26)])
+    batched = BatchedMigration(table='Items', key='itemID', columns=['name'], targets=['price'],
+                               transform=lambda row: (float(row[0].split()[1]),),
+                               where='price IS NULL', batch_size=10)
+    runner = MigrationRunner(db, migrations, [Migration(3, 'prices', batched=batched)])
+    assert [m.version for m in runner.migrate()] == [1, 2, 3]
+    assert user_version(db) == 3
+    assert db.execute_query("SELECT COUNT(*) FROM Items WHERE price = itemID") == [(25,)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('$80,000 - $95,000', (80000.0, 95000.0)),
+    ('90k', (90000.0, 90000.0)),
+    ('75.5K-80K', (75500.0, 80000.0)),
+    (120000, (120000.0, 120000.0)),
+    (0, (None, None)),
+    ('Competitive', (None, None)),
+    (None, (None, None)),
+])
+def test_parse_annual_pay(text, expected):
+    assert parse_annual_pay(text) == expected
+
+
+def test_app_migrations_split_annual_pay(make_app_db):
+    db = make_app_db(execute_mode=False, migrate=False)
+    db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+    db.insert_bulk_data("INSERT INTO Jobs (job_title, employerID, annual_pay) VALUES (?, 1, ?)",
+                        [('a', '$80,000 - $95,000'), ('b', None), ('c', 'TBD'), ('d', '100k')])
+    MigrationRunner(db, 'data/migrations', APP_MIGRATIONS).migrate()
+    rows = db.execute_query("SELECT job_title, annual_pay_min, annual_pay_max FROM Jobs ORDER BY job_title")
+    assert rows == [('a', 80000.0, 95000.0), ('b', None, None), ('c', None, None), ('d', 100000.0, 100000.0)]
+    assert MigrationRunner(db, 'data/migrations', APP_MIGRATIONS).pending() == []
+
+
+def test_importing_global_handlers_leaves_the_database_alone(tmp_path):
+    database = shutil.copy(PathManager.resolve_path('data/applications.sqlite', PathFlag.FROM_PROJECT_ROOT), tmp_path)
+    before = open(database, 'rb').read()
+    subprocess.run([sys.executable, '-c', 'import core.global_handlers, core.database_interaction_methods'],
+                   cwd=get_project_root(), env={**os.environ, 'APPLICATION_TRACKER_DATABASE': database},
+                   check=True, capture_output=True)
+    assert open(database, 'rb').read() == before
+    assert os.listdir(tmp_path) == ['applications.sqlite']  # no -wal/-shm files either
@@ -0,0 +1,105 @@
+import pytest
+
+from utils.pagination import Keyset, fetch_page
+
+ROWS = 100_000
+PAGE = 500
+JOBS_QUERY = "SELECT jobID AS ID, job_title AS Title, status AS Status FROM Jobs"
+
+
+@pytest.fixture(scope="module")
+def db(make_app_db):
+    handler = make_app_db(pragma_profile='bulk-load', migrate=False)
+    handler.execute_query("INSERT INTO Employers (employer_name) VALUES ('Employer')")
+    handler.insert_bulk_data("INSERT INTO Jobs (job_title, employerID, status) VALUES (?, 1, ?)",
+                             [(f"Job {i:06}", ('applied', 'interview', 'rejected')[i % 3]) for i in range(ROWS)])
+    handler.execute_query("CREATE INDEX idx_test_status ON Jobs (status)")
+    return handler
+
+
+def count_steps(db, func):
+    """sqlite VM instructions (in thousands) used by ``func``; a deterministic stand-in for its run time."""
+    steps = [0]
+
+    def tick():
+        steps[0] += 1
+        return 0
+
+    with db.transaction() as conn:
+        conn.set_progress_handler(tick, 1000)
+        try:
+            result = func()
+        finally:
+            conn.set_progress_handler(None, 0)
+    return steps[0], result
+
+
+def test_pages_through_100k_rows_in_constant_time(db):
+    seen = 0
+    cursor = None
+    costs = []
+    while True:
+        cost, page = count_steps(db, lambda: fetch_page(db, JOBS_QUERY, (), ['ID'], PAGE, cursor))
+        costs.append(cost)
+        assert [row['ID'] for row in page.rows] == list(range(seen + 1, seen + len(page.rows) + 1))
+        seen += len(page.rows)
+        cursor = page.cursor
+        if cursor is None:
+            break
+    assert seen == ROWS
+    assert len(costs) == ROWS // PAGE
+    assert max(costs) <= 2 * costs[0] + 5
+
+    offset_cost, _ = count_steps(db, lambda: db.execute_query(f"{JOBS_QUERY} LIMIT {PAGE} OFFSET {ROWS - PAGE}"))
+    assert offset_cost > 10 * costs[-1]
+
+
+def test_pages_with_mixed_directions(db):
+    order_by = ['Status DESC', 'ID']
+    expected = db.execute_query(f"SELECT * FROM ({JOBS_QUERY}) WHERE ID <= 3000 ORDER BY Status DESC, ID")
+    query = f"{JOBS_QUERY} WHERE jobID <= ?"
+    rows, cursor = [], None
+    while True:
+        page = fetch_page(db, query, (3000,), order_by, 700, cursor)
+        rows.extend(page.rows)
+        if not (cursor := page.cursor):
+            break
+    assert [tuple(r) for r in rows] == [tuple(r) for r in expected]
+
+
+def test_deep_page_uses_index(db):
+    keyset = Keyset(['ID'])
+    first = fetch_page(db, JOBS_QUERY, (), ['ID'], 10)
+    query, params = keyset.query(JOBS_QUERY, (), 10, first.cursor)
+    plan = [row[3] for row in db.iter_query(f"EXPLAIN QUERY PLAN {query}", params)]
+    assert any(detail.startswith('SEARCH') for detail in plan), plan
+    assert not any('TEMP B-TREE' in detail for detail in plan), plan
+
+
+def test_cursor_is_checked(db):
+    page = fetch_page(db, JOBS_QUERY, (), ['ID'], 10)
+    with pytest.raises(ValueError):
+        fetch_page(db, JOBS_QUERY, (), ['Title'], 10, page.cursor)
+    with pytest.raises(ValueError):
+        fetch_page(db, JOBS_QUERY, (), ['ID'], 10, 'not a cursor')
+
+
+def test_last_page_has_no_cursor(db):
+    page = fetch_page(db, f"{JOBS_QUERY} WHERE jobID <= ?", (10,), 'ID', 10)
+    assert len(page.rows) == 10
+    assert page.cursor is None
+
+
+@pytest.mark.parametrize("order_by", [['Location', 'ID'], ['Location DESC', 'ID'], ['Location DESC', 'ID DESC']])
+def test_pages_over_nullable_keys(db, order_by):
+    query = "SELECT jobID AS ID, location AS Location FROM Jobs WHERE jobID <= ?"
+    db.execute_query("UPDATE Jobs SET location = CASE jobID % 4 WHEN 0 THEN NULL ELSE 'City ' || (jobID % 3) END "
+                     "WHERE jobID <= 200")
+    expected = db.execute_query(f"SELECT * FROM ({query}) ORDER BY {Keyset(order_by).order_clause()}", (200,))
+    rows, cursor = [], None
+    while True:
+        page = fetch_page(db, query, (200,), order_by, 7, cursor)
+        rows.extend(page.rows)
+        if not (cursor := page.cursor):
+            break
+    assert [tuple(r) for r in rows] == [tuple(r) for r in expected]
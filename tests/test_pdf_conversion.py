@@ -0,0 +1,155 @@
+import sys
+import time
+
+import pytest
+from docx import Document
+
+import core.doc_manager
+import utils.pdf_conversion
+from core.doc_manager import DocManager
+from utils.pdf_conversion import ConversionError, Docx2PdfBackend, LibreOfficeBackend, LibreOfficeDaemonBackend, \
+    PdfBackend, PdfConversionQueue, StubBackend, make_backend
+
+
+class FlakyBackend(PdfBackend):
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+        self.closed = False
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConversionError(f'attempt {self.calls} failed')
+        StubBackend().convert(docx_path, pdf_path)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def docx(tmp_path):
+    path = tmp_path / 'letter.docx'
+    path.write_bytes(b'not really a docx')
+    return path
+
+
+def test_conversion_and_callback(docx, tmp_path):
+    queue = PdfConversionQueue(StubBackend(), workers=2)
+    done = []
+    future = queue.submit(docx, tmp_path / 'letter.pdf', done.append)
+    assert future.result(5) == str(tmp_path / 'letter.pdf')
+    assert (tmp_path / 'letter.pdf').read_bytes().startswith(b'%PDF')
+    queue.close()
+    assert done == [future]
+
+
+def test_retries(docx, tmp_path):
+    backend = FlakyBackend(failures=2)
+    queue = PdfConversionQueue(backend, retries=2, retry_delay=0.01)
+    assert queue.submit(docx, tmp_path / 'letter.pdf').result(5)
+    assert backend.calls == 3
+    queue.close()
+    assert backend.closed
+
+
+def test_error_after_last_retry(docx, tmp_path):
+    backend = FlakyBackend(failures=5)
+    queue = PdfConversionQueue(backend, retries=1, retry_delay=0.01)
+    with pytest.raises(ConversionError, match='attempt 2'):
+        queue.submit(docx, tmp_path / 'letter.pdf').result(5)
+    queue.close()
+
+
+def test_backend_is_created_lazily_and_not_retried(docx, tmp_path):
+    made = []
+
+    def no_converter():
+        made.append(1)
+        raise ConversionError('No PDF converter found')
+
+    queue = PdfConversionQueue(no_converter, retries=3, retry_delay=10)
+    assert made == []
+    with pytest.raises(ConversionError):
+        queue.submit(docx, tmp_path / 'letter.pdf').result(5)
+    assert made == [1]
+    queue.close()
+
+
+def test_close_finishes_pending_conversions(docx, tmp_path):
+    queue = PdfConversionQueue(StubBackend(delay=0.01))
+    futures = [queue.submit(docx, tmp_path / f'{i}.pdf') for i in range(5)]
+    queue.close()
+    assert all(f.done() and f.exception() is None for f in futures)
+    with pytest.raises(RuntimeError):
+        queue.submit(docx, tmp_path / 'late.pdf')
+
+
+@pytest.fixture
+def soffice_without_uno(monkeypatch):
+    monkeypatch.setattr(utils.pdf_conversion, 'find_soffice', lambda: '/usr/bin/soffice')
+    monkeypatch.setitem(sys.modules, 'uno', None)  # import uno raises ImportError
+
+
+@pytest.mark.parametrize('platform', ['win32', 'darwin'])
+def test_auto_backend_prefers_word_on_windows_and_macos(platform, soffice_without_uno, monkeypatch):
+    pytest.importorskip('docx2pdf')
+    monkeypatch.setattr(sys, 'platform', platform)
+    assert isinstance(make_backend(), Docx2PdfBackend)
+
+
+@pytest.mark.parametrize('platform', ['win32', 'darwin'])
+def test_auto_backend_falls_back_to_libreoffice_without_docx2pdf(platform, soffice_without_uno, monkeypatch):
+    monkeypatch.setattr(sys, 'platform', platform)
+    monkeypatch.setitem(sys.modules, 'docx2pdf', None)
+    backend = make_backend()
+    assert isinstance(backend, LibreOfficeBackend)
+    backend.close()
+
+
+def test_auto_backend_is_libreoffice_on_linux(soffice_without_uno, monkeypatch):
+    monkeypatch.setattr(sys, 'platform', 'linux')
+    backend = make_backend()
+    assert isinstance(backend, LibreOfficeBackend)
+    backend.close()
+    monkeypatch.setattr(utils.pdf_conversion, 'find_soffice', lambda: None)
+    with pytest.raises(ConversionError):
+        make_backend()
+
+
+def test_libreoffice_daemon_is_reused_and_restarted(docx, tmp_path):
+    pytest.importorskip('uno')
+    try:
+        backend = LibreOfficeDaemonBackend()
+    except ConversionError as e:
+        pytest.skip(str(e))
+    Document().save(str(docx))
+    try:
+        backend.convert(str(docx), str(tmp_path / 'first.pdf'))
+        backend.convert(str(docx), str(tmp_path / 'second.pdf'))
+        assert backend.starts == 1
+        backend._process.kill()
+        backend._process.wait()
+        backend.convert(str(docx), str(tmp_path / 'third.pdf'))
+        assert backend.starts == 2
+        assert all((tmp_path / f'{name}.pdf').exists() for name in ('first', 'second', 'third'))
+    finally:
+        backend.close()
+    assert not backend.running
+
+
+def test_doc_manager_save_pdf_does_not_wait_for_the_queue(tmp_path, monkeypatch):
+    template = tmp_path / 'letter.docx'
+    Document().save(str(template))
+    queue = PdfConversionQueue(StubBackend(delay=0.2))
+    monkeypatch.setattr(core.doc_manager, 'PDF_CONVERTER', queue)
+    monkeypatch.setattr(DocManager, '_pdf_output_path', staticmethod(lambda name: str(tmp_path / name)))
+    pending = [queue.submit(template, tmp_path / f'queued {i}.pdf') for i in range(5)]
+    manager = DocManager(template)
+    manager.save_docx_path = str(template)
+    start = time.perf_counter()
+    assert manager.save_pdf('direct.pdf') == str(tmp_path / 'direct.pdf')
+    assert time.perf_counter() - start < 0.6  # one conversion, not the five queued before it
+    assert (tmp_path / 'direct.pdf').read_bytes() == StubBackend.PDF
+    assert not pending[-1].done()
+    queue.close()
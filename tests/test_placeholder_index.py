@@ -0,0 +1,48 @@
+import shutil
+
+import pytest
+from docx import Document
+
+from core.placeholder_index import PlaceholderIndex, content_hash
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = tmp_path / 'template.docx'
+    doc = Document()
+    doc.add_paragraph('Hello {{Name}}')
+    doc.save(str(path))
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    return PlaceholderIndex(tmp_path / 'index')
+
+
+def test_unindexed_template(index, template):
+    assert index.load(template) is None
+
+
+def test_save_and_load(index, template):
+    index.save(template, {'{{Name}}': ''}, {'{{Name}}': [['body', 0]]})
+    indexed = index.load(template)
+    assert indexed.content_hash == content_hash(template)
+    assert indexed.placeholders == {'{{Name}}': ''}
+    assert indexed.locations == {'{{Name}}': [['body', 0]]}
+
+
+def test_index_follows_contents_not_name(index, template, tmp_path):
+    index.save(template, {'{{Name}}': ''}, {})
+    copy = shutil.copy(template, tmp_path / 'copy.docx')
+    assert index.load(copy).placeholders == {'{{Name}}': ''}
+    doc = Document(str(template))
+    doc.add_paragraph('{{Date}}')
+    doc.save(str(template))
+    assert index.load(template) is None
+
+
+def test_unreadable_index_is_ignored(index, template):
+    index.save(template, {'{{Name}}': ''}, {})
+    (index.folder / f'{content_hash(template)}.json').write_text('{not json')
+    assert index.load(template) is None
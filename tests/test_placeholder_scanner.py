@@ -0,0 +1,160 @@
+import pytest
+from docx import Document
+from docx.oxml import parse_xml
+
+import core.doc_manager
+from core.doc_manager import DocManager
+from core.placeholder_index import PlaceholderIndex
+from core.placeholder_scanner import scan_placeholders
+from utils.path_utils import PathManager, PathFlag
+
+
+@pytest.fixture
+def template(tmp_path):
+    doc = Document()
+    doc.add_paragraph('Dear {{Name}},')
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = '{{Role}}'
+    table.cell(0, 1).merge(table.cell(1, 1)).text = '[[Toronto]]'
+    table.cell(1, 0).paragraphs[0].add_run('{{Na')
+    table.cell(1, 0).paragraphs[0].add_run('me}}')  # split across runs
+    doc.add_paragraph('Regards,\t{{Name}}')
+    doc.sections[0].header.paragraphs[0].text = '{{Date}}'
+    path = tmp_path / 'template.docx'
+    doc.save(str(path))
+    return path
+
+
+def test_scan_placeholders(template):
+    placeholders, locations = scan_placeholders(template)
+    assert placeholders == {'{{Name}}': '', '{{Role}}': '', '[[Toronto]]': 'Toronto', '{{Date}}': ''}
+    assert locations == {
+        '{{Name}}':    [['body', 0], ['body', 1, 1, 0, 0], ['body', 2]],
+        '{{Role}}':    [['body', 1, 0, 0, 0]],
+        '[[Toronto]]': [['body', 1, 0, 1, 0]],  # the merged cell is seen once
+        '{{Date}}':    [['header1', 0]],
+    }
+
+
+
+TEXT_BOX = '''
+<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+     xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+     xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+     xmlns:v="urn:schemas-microsoft-com:vml">
+  <mc:AlternateContent>
+    <mc:Choice Requires="wps">
+      <w:drawing><wps:wsp><wps:txbx><w:txbxContent>
+        <w:p><w:r><w:t>Call {{Phone}}</w:t></w:r></w:p>
+        <w:p><w:r><w:t>{{Email}}</w:t></w:r></w:p>
+      </w:txbxContent></wps:txbx></wps:wsp></w:drawing>
+    </mc:Choice>
+    <mc:Fallback>
+      <w:pict><v:shape><v:textbox><w:txbxContent>
+        <w:p><w:r><w:t>Call {{Phone}}</w:t></w:r></w:p>
+        <w:p><w:r><w:t>{{Email}}</w:t></w:r></w:p>
+      </w:txbxContent></v:textbox></v:shape></w:pict>
+    </mc:Fallback>
+  </mc:AlternateContent>
+</w:r>'''
+
+
+def test_text_box_in_alternate_content(tmp_path):
+    doc = Document()
+    doc.add_paragraph('{{Name}}')
+    paragraph = doc.add_paragraph('Contact: ')
+    paragraph._p.append(parse_xml(TEXT_BOX))
+    paragraph.add_run(' [[|Hours|9-5]]')
+    path = tmp_path / 'text_box.docx'
+    doc.save(str(path))
+
+    placeholders, locations = scan_placeholders(path)
+    assert placeholders == {'{{Name}}': '', '{{Phone}}': '', '{{Email}}': '', '[[|Hours|9-5]]': '|Hours|9-5'}
+    # The text box's paragraphs are blocks of the paragraph holding it; the mc:Fallback copy isn't counted again.
+    assert locations == {
+        '{{Name}}':        [['body', 0]],
+        '{{Phone}}':       [['body', 1, 0]],
+        '{{Email}}':       [['body', 1, 1]],
+        '[[|Hours|9-5]]':  [['body', 1]],
+    }
+
+
+def test_headers_and_footers(tmp_path):
+    doc = Document()
+    section = doc.sections[0]
+    section.different_first_page_header_footer = True
+    section.header.paragraphs[0].text = '{{Name}}'
+    section.header.add_paragraph('{{Date}}')
+    section.first_page_header.paragraphs[0].text = '{{Name}} - [[Resume]]'
+    section.footer.paragraphs[0].text = 'Page {{Page}}'
+    doc.add_paragraph('{{Name}}')
+    path = tmp_path / 'header_footer.docx'
+    doc.save(str(path))
+
+    placeholders, locations = scan_placeholders(path)
+    assert placeholders == {'{{Name}}': '', '{{Date}}': '', '[[Resume]]': 'Resume', '{{Page}}': ''}
+    assert locations == {
+        '{{Name}}':   [['body', 0], ['header1', 0], ['header2', 0]],
+        '{{Date}}':   [['header1', 1]],
+        '[[Resume]]': [['header2', 0]],
+        '{{Page}}':   [['footer1', 0]],
+    }
+
+
+def test_nested_tables(tmp_path):
+    doc = Document()
+    table = doc.add_table(rows=1, cols=2)
+    cell = table.cell(0, 0)
+    cell.paragraphs[0].text = '{{Role}}'
+    inner = cell.add_table(rows=2, cols=2)
+    inner.cell(1, 1).text = '{{Inner}}'
+    cell.add_paragraph('{{After}}')
+    table.cell(0, 1).text = '{{Role}}'
+    path = tmp_path / 'tables.docx'
+    doc.save(str(path))
+
+    placeholders, locations = scan_placeholders(path)
+    assert list(placeholders) == ['{{Role}}', '{{Inner}}', '{{After}}']
+    # In a cell, paragraphs and tables share the block numbering; add_table leaves an empty paragraph after the table.
+    assert locations == {
+        '{{Role}}':  [['body', 0, 0, 0, 0], ['body', 0, 0, 1, 0]],
+        '{{Inner}}': [['body', 0, 0, 0, 1, 1, 1, 0]],
+        '{{After}}': [['body', 0, 0, 0, 3]],
+    }
+
+
+@pytest.fixture(params=['everything', 'resume', 'cover_letter'])
+def any_template(request, tmp_path):
+    if request.param != 'everything':
+        return PathManager.resolve_path(f'docs/templates/demo_template_{request.param}.docx',
+                                        PathFlag.FROM_PROJECT_ROOT)
+    doc = Document()
+    doc.add_paragraph('Dear {{Name}},')
+    doc.add_paragraph('Contact: ')._p.append(parse_xml(TEXT_BOX))
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).merge(table.cell(1, 0)).text = '[[Toronto]]'
+    table.cell(0, 1).add_table(rows=1, cols=1).cell(0, 0).text = '{{Inner}}'
+    doc.sections[0].header.paragraphs[0].text = '{{Date}}'
+    doc.sections[0].footer.paragraphs[0].text = 'Page {{Page}}'
+    path = tmp_path / 'everything.docx'
+    doc.save(str(path))
+    return path
+
+
+def test_same_as_doc_manager(any_template, tmp_path, monkeypatch):
+    """DocManager stores the scanner's locations, from the file or, after replacements, from its document."""
+    index = PlaceholderIndex(tmp_path / 'index')
+    monkeypatch.setattr(core.doc_manager, 'PLACEHOLDER_INDEX', index)
+    expected = scan_placeholders(any_template)
+
+    manager = DocManager(any_template)
+    manager.get_placeholders()
+    assert (manager.placeholders, manager.placeholder_locations) == expected
+    assert list(manager.placeholders) == list(expected[0])
+    indexed = index.load(any_template)
+    assert (indexed.placeholders, indexed.locations) == expected
+
+    manager.apply_replacements({}, save_placeholders=False)  # walks the python-docx document from now on
+    manager.get_placeholders(force_refresh=True)
+    assert (manager.placeholders, manager.placeholder_locations) == expected
+    assert list(manager.placeholders) == list(expected[0])
@@ -0,0 +1,56 @@
+import re
+
+import pytest
+
+HOT_QUERIES = {
+    'job picker':                  """
+        SELECT j.jobID as id, j.job_title as title, e.employer_name as employer
+        FROM Jobs j
+                 INNER JOIN Employers e ON j.employerID = e.employerID
+        WHERE j.status != 'Rejected'
+        ORDER BY j.last_updated DESC""",
+    'title and employer':          """
+        SELECT j.job_title as 'job', e.employer_name as 'employer'
+        FROM Jobs j
+        INNER JOIN Employers e
+        ON j.employerID = e.employerID
+        WHERE j.jobID = ?""",
+    'document by job and type':    "SELECT documentID FROM Documents WHERE jobID = ? AND documentType = ?",
+    'storage by document':         "SELECT StorageID FROM Document_Storage WHERE documentID = ?",
+    'documents by job':            """
+        SELECT d.documentID, d.documentType, ds.fileType, ds.file_name
+        FROM Documents d
+        LEFT JOIN Document_Storage ds ON d.documentID = ds.documentID
+        WHERE d.jobID = ?
+        ORDER BY d.documentType""",
+    'jobs by employer id':         "SELECT * FROM Jobs WHERE employerID = ?",
+    'jobs by employer name':       """
+        SELECT * FROM Jobs
+        WHERE employerID IN (SELECT employerID FROM Employers WHERE employer_name = ?)""",
+    'jobs by status':              "SELECT jobID FROM Jobs WHERE status = ?",
+    'variable by name':            "SELECT variableID FROM Variables WHERE variable_name = ?",
+    'documents using a variable':  "SELECT documentID FROM Document_Variables WHERE variableID = ?",
+}
+
+ALLOWED_SCANS = {
+    # `status != ?` can't seek, so the picker reads its covering index in order instead of the table.
+    'job picker': 'SCAN j USING COVERING INDEX idx_jobs_picker',
+}
+
+FULL_SCAN = re.compile(r'^SCAN \w+( USING (COVERING )?INDEX \w+)?$')
+
+
+@pytest.fixture(scope="module")
+def app_db(make_app_db):
+    return make_app_db(execute_mode=False)
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_index(app_db, name):
+    query = HOT_QUERIES[name]
+    params = (None,) * query.count('?')
+    plan = [row[3] for row in app_db.iter_query(f"EXPLAIN QUERY PLAN {query}", params)]
+    scans = [detail for detail in plan if FULL_SCAN.match(detail) and detail != ALLOWED_SCANS.get(name)]
+    assert not scans, f"{name} falls back to a full scan: {plan}"
+    assert not any('TEMP B-TREE' in detail for detail in plan), f"{name} sorts in a temporary b-tree: {plan}"
+
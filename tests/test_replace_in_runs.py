@@ -0,0 +1,89 @@
+import random
+
+import pytest
+from docx import Document
+
+from core.doc_manager import DocManager, _remove_ph_escaped_text, replace_in_runs
+
+PLACEHOLDERS = ['{{Name}}', '{{Company}}', '{{Job Title}}', '[[|Location|Remote]]', '{{Missing}}']
+VALUES = {'{{Name}}': 'Jon', '{{Company}}': 'Initech', '{{Job Title}}': ' Developer |note| ',
+          '[[|Location|Remote]]': '', }
+FILLER = ['Dear ', 'a', ' ', 'x{', '}', '[', ']]', '|', 'the posting. ', '']
+
+
+class FakeRun:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def expected(text: str, new_values: dict) -> str:
+    pieces, position = [], 0
+    for match in DocManager._find_placeholders(text):
+        if match.group(0) in new_values:
+            pieces += [text[position:match.start()], _remove_ph_escaped_text(new_values[match.group(0)])]
+            position = match.end()
+    return ''.join(pieces) + text[position:]
+
+
+def random_split(rng: random.Random, text: str) -> list:
+    """Splits ``text`` at random offsets, empty runs included."""
+    cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, len(text) + 3)))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def random_paragraph(rng: random.Random) -> str:
+    return ''.join(rng.choice(PLACEHOLDERS) if rng.random() < 0.4 else rng.choice(FILLER)
+                   for _ in range(rng.randint(0, 12)))
+
+
+@pytest.mark.parametrize('seed', range(500))
+def test_any_split_gives_the_same_text(seed):
+    rng = random.Random(seed)
+    text = random_paragraph(rng)
+    runs = [FakeRun(t) for t in random_split(rng, text)]
+    original = [run.text for run in runs]
+
+    replaced = replace_in_runs(runs, VALUES)
+
+    assert ''.join(run.text for run in runs) == expected(text, VALUES)
+    assert replaced == any(m.group(0) in VALUES for m in DocManager._find_placeholders(text))
+    assert len(runs) == len(original)
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_runs_outside_placeholders_are_untouched(seed):
+    rng = random.Random(seed)
+    text = random_paragraph(rng)
+    texts = random_split(rng, text)
+    runs = [FakeRun(t) for t in texts]
+    replace_in_runs(runs, VALUES)
+
+    spans = [m.span() for m in DocManager._find_placeholders(text) if m.group(0) in VALUES]
+    start = 0
+    for run, original in zip(runs, texts):
+        end = start + len(original)
+        if not any(a < end and start < b for a, b in spans):
+            assert run.text == original
+        start = end
+
+
+def test_placeholder_spanning_many_runs():
+    runs = [FakeRun(t) for t in ['Dear {', '{', 'Na', '', 'm', 'e}', '}, from {{Company}}']]
+    assert replace_in_runs(runs, VALUES)
+    assert [run.text for run in runs] == ['Dear Jon', '', '', '', '', '', ', from Initech']
+
+
+def test_nothing_to_replace():
+    runs = [FakeRun('Dear '), FakeRun('{{Missing}}')]
+    assert not replace_in_runs(runs, VALUES)
+    assert not replace_in_runs([], VALUES)
+    assert [run.text for run in runs] == ['Dear ', '{{Missing}}']
+
+
+def test_docx_runs():
+    paragraph = Document().add_paragraph('Dear {{Na')
+    for text in ['m', 'e}}', ' at {', '{Company}}.']:
+        paragraph.add_run(text)
+    assert replace_in_runs(paragraph.runs, VALUES)
+    assert paragraph.text == 'Dear Jon at Initech.'
+    assert len(paragraph.runs) == 5
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+from docx import Document
+
+import core.doc_manager
+from core.doc_manager import DocManager
+from core.placeholder_index import PlaceholderIndex
+from core.template_cache import TemplateCache
+from utils.path_utils import get_project_root
+
+
+def make_template(path, text='Hello {{Name}}') -> str:
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def template(tmp_path):
+    return make_template(tmp_path / 'template.docx')
+
+
+def test_open_returns_independent_copies(template):
+    cache = TemplateCache()
+    first = cache.open(template)
+    first.paragraphs[0].text = 'Hello Jon'
+    second = cache.open(template)
+    assert second.paragraphs[0].text == 'Hello {{Name}}'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_changed_template_is_parsed_again(template):
+    cache = TemplateCache()
+    cache.open(template)
+    make_template(template, 'Dear {{Name}}, {{Body}}')
+    stat = os.stat(template)
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.open(template).paragraphs[0].text == 'Dear {{Name}}, {{Body}}'
+    assert cache.misses == 2
+    assert len(cache) == 1  # the stale entry is dropped
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    a, b, c = (make_template(tmp_path / f'{name}.docx') for name in 'abc')
+    cache = TemplateCache(max_entries=2)
+    cache.open(a)
+    cache.open(b)
+    cache.open(a)
+    cache.open(c)  # evicts b
+    cache.open(a)
+    cache.open(b)
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_byte_limit(template):
+    cache = TemplateCache(max_bytes=os.path.getsize(template) - 1)
+    cache.open(template)
+    cache.open(template)
+    assert len(cache) == 0 and cache.misses == 2
+
+
+def test_missing_template(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        TemplateCache().open(tmp_path / 'missing.docx')
+
+
+def test_relative_paths_are_from_the_project_root(monkeypatch):
+    cache = TemplateCache()
+    cache.open('docs/templates/demo_template_resume.docx')
+    monkeypatch.chdir(os.path.join(get_project_root(), 'tests'))
+    cache.open('docs/templates/demo_template_resume.docx')
+    assert cache.hits == 1 and len(cache) == 1
+
+
+def test_doc_manager_opens_the_template_on_first_use(template, tmp_path, monkeypatch):
+    cache = TemplateCache()
+    monkeypatch.setattr(core.doc_manager, 'TEMPLATES', cache)
+    monkeypatch.setattr(core.doc_manager, 'PLACEHOLDER_INDEX', PlaceholderIndex(tmp_path / 'index'))
+    manager = DocManager(template)
+    assert manager.callable
+    assert manager.get_placeholders() == {'{{Name}}': ''}  # not indexed yet: scanned from the file
+    assert DocManager(template).get_placeholders() == {'{{Name}}': ''}  # from the index
+    assert cache.misses == 0 and cache.hits == 0
+    assert manager.doc.paragraphs[0].text == 'Hello {{Name}}'
+    assert cache.misses == 1
+
+    missing = DocManager(tmp_path / 'missing.docx')
+    assert not missing.callable and missing.doc is None and missing.get_placeholders() is None
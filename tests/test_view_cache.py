@@ -0,0 +1,91 @@
+import asyncio
+import gc
+import weakref
+
+import pytest
+from flet import Text
+
+from front.view_cache import ViewCache
+from utils.change_feed import ChangeFeed
+
+
+@pytest.fixture
+def cache():
+    c = ViewCache()
+    c.register('a', lambda: Text('a'))
+    c.register('b', lambda: Text('b'))
+    return c
+
+
+def test_views_are_built_lazily_and_once(cache):
+    assert not cache.is_built('a')
+    first = cache.get('a')
+    assert cache.get('a') is first
+    assert cache.builds == {'a': 1}
+    assert not cache.is_built('b')
+
+
+def test_invalidate_rebuilds_on_next_get(cache):
+    invalidated = []
+    cache.on_invalidate = invalidated.append
+    first = cache.get('a')
+    cache.invalidate('a', 'b')  # 'b' was never built: nothing to drop
+    assert invalidated == ['a']
+    assert cache.get('a') is not first
+    assert cache.builds['a'] == 2
+
+
+def test_invalidate_all(cache):
+    cache.get('a')
+    cache.get('b')
+    cache.invalidate()
+    assert not cache.is_built('a') and not cache.is_built('b')
+
+
+@pytest.fixture
+def feed(migrated_db):
+    migrated_db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Initech')")
+    return ChangeFeed(migrated_db)
+
+
+def test_watch_invalidates_on_changes(cache, feed, migrated_db):
+    cache.watch(feed, 'Jobs', 'a')
+    cache.watch(feed, 'Employers', 'a')
+    cache.get('a')
+    cache.get('b')
+    migrated_db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('Dev', 1)")
+    migrated_db.execute_query("INSERT INTO Employers (employer_name) VALUES ('Globex')")
+    invalidated = []
+    cache.on_invalidate = invalidated.append
+    feed.poll()
+    assert invalidated == ['a']  # once, though both watched tables changed
+    assert not cache.is_built('a') and cache.is_built('b')
+
+
+def test_watch_invalidates_on_the_page_loop(cache, feed, migrated_db):
+    class FakePage:
+        def __init__(self):
+            self.tasks = []
+
+        def run_task(self, handler, *args):
+            self.tasks.append(handler(*args))
+
+    cache.page = FakePage()
+    cache.watch(feed, 'Jobs', 'a')
+    cache.get('a')
+    migrated_db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('Dev', 1)")
+    feed.poll()
+    assert cache.is_built('a')  # not on the polling thread
+    asyncio.run(cache.page.tasks.pop())
+    assert not cache.is_built('a')
+
+
+def test_dropped_cache_stops_watching(feed, migrated_db):
+    cache = ViewCache()
+    cache.watch(feed, 'Jobs', 'a')
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None  # the feed doesn't keep a closed page's views alive
+    migrated_db.execute_query("INSERT INTO Jobs (job_title, employerID) VALUES ('Dev', 1)")
+    feed.poll()
@@ -0,0 +1,127 @@
+import os
+import struct
+import tempfile
+import zipfile
+import zlib
+
+import pytest
+from docx import Document
+
+from core.zip_render import compile_plan, render_docx
+from utils.path_utils import PathManager, PathFlag, get_project_root
+
+
+def make_png(width: int = 4, height: int = 4, noise: bool = False) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    rows = b''.join(b'\x00' + (os.urandom(3 * width) if noise else b'\xff\x00\x00' * width) for _ in range(height))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+@pytest.fixture
+def template(tmp_path):
+    (tmp_path / 'logo.png').write_bytes(make_png())
+    doc = Document()
+    doc.add_picture(str(tmp_path / 'logo.png'))
+    paragraph = doc.add_paragraph('Dear ')
+    paragraph.add_run('{{Com')
+    paragraph.add_run('pany}}')
+    paragraph.add_run(', I saw the {{Job Title}} posting.')
+    doc.add_table(rows=1, cols=1).cell(0, 0).text = '[[|Location|Remote]]'
+    doc.sections[0].footer.paragraphs[0].text = 'Page footer {{Name}}'
+    path = tmp_path / 'template.docx'
+    doc.save(str(path))
+    return path
+
+
+VALUES = {'{{Company}}': 'Initech', '{{Job Title}}': 'Developer', '[[|Location|Remote]]': 'Toronto',
+          '{{Name}}': 'Jon'}
+
+
+def raw_member(path, name) -> bytes:
+    with zipfile.ZipFile(path) as z:
+        info = z.getinfo(name)
+        z.fp.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack('<HH', z.fp.read(4))
+        z.fp.seek(info.header_offset + 30 + name_length + extra_length)
+        return z.fp.read(info.compress_size)
+
+
+def test_render_replaces_placeholders(template, tmp_path):
+    output = tmp_path / 'out.docx'
+    render_docx(template, output, VALUES)
+    doc = Document(str(output))
+    assert doc.paragraphs[1].text == 'Dear Initech, I saw the Developer posting.'
+    assert doc.tables[0].cell(0, 0).text == 'Toronto'
+    assert doc.sections[0].footer.paragraphs[0].text == 'Page footer Jon'
+    with zipfile.ZipFile(output) as z:
+        assert z.testzip() is None
+
+
+def test_only_changed_parts_are_rewritten(template, tmp_path):
+    output = tmp_path / 'out.docx'
+    stats = render_docx(template, output, VALUES)
+    assert sorted(stats.rewritten) == ['word/document.xml', 'word/footer1.xml']
+    with zipfile.ZipFile(template) as z:
+        assert [i.filename for i in z.infolist()] == [i.filename for i in zipfile.ZipFile(output).infolist()]
+    for name in stats.copied:
+        assert raw_member(output, name) == raw_member(template, name)
+    assert any(name.startswith('word/media/') for name in stats.copied)
+
+
+def test_nothing_to_replace_copies_everything(template, tmp_path):
+    stats = render_docx(template, tmp_path / 'out.docx', {})
+    assert stats.rewritten == []
+
+
+def test_hyperlink_targets(tmp_path):
+    doc = Document()
+    paragraph = doc.add_paragraph()
+    r_id = doc.part.relate_to('https://example.com/{{Handle}}', 'http://schemas.openxmlformats.org/officeDocument/'
+                              '2006/relationships/hyperlink', is_external=True)
+    doc.part.relate_to('https://old.example.com', 'http://schemas.openxmlformats.org/officeDocument/2006/'
+                       'relationships/hyperlink', is_external=True)
+    paragraph.add_run(r_id)
+    doc.save(str(tmp_path / 'links.docx'))
+    render_docx(tmp_path / 'links.docx', tmp_path / 'out.docx', {'{{Handle}}': 'jon doe'},
+                {'https://old.example.com': 'https://new.example.com'})
+    targets = {rel.target_ref for rel in Document(str(tmp_path / 'out.docx')).part.rels.values() if rel.is_external}
+    assert targets == {'https://example.com/jon%20doe', 'https://new.example.com'}
+
+
+def test_plan_is_compiled_once_per_version(template, tmp_path):
+    plan = compile_plan(template)
+    assert compile_plan(template) is plan
+    assert plan.placeholders == ['{{Company}}', '{{Job Title}}', '[[|Location|Remote]]', '{{Name}}']
+    doc = Document(str(template))
+    doc.add_paragraph('{{Date}}')
+    doc.save(str(template))
+    assert '{{Date}}' in compile_plan(template).placeholders
+
+
+def test_relative_template_is_from_the_project_root(monkeypatch):
+    plan = compile_plan('docs/templates/demo_template_resume.docx')
+    monkeypatch.chdir(os.path.join(get_project_root(), 'tests'))
+    assert compile_plan('docs/templates/demo_template_resume.docx') is plan
+
+
+def test_values_are_escaped_and_keep_breaks(template, tmp_path):
+    output = tmp_path / 'out.docx'
+    render_docx(template, output, {'{{Company}}': ' R&D <Labs>', '{{Job Title}}': 'Lead\nDeveloper\tII'})
+    doc = Document(str(output))
+    assert doc.paragraphs[1].text == 'Dear R&D <Labs>, I saw the Lead\nDeveloper\tII posting.'  # stripped, as before
+    assert doc.tables[0].cell(0, 0).text == '[[|Location|Remote]]'  # no value: left as it was
+
+
+def test_same_text_as_doc_manager():
+    from core.doc_manager import DocManager
+    for name in ('resume', 'cover_letter'):
+        manager = DocManager(PathManager.resolve_path(f'docs/templates/demo_template_{name}.docx',
+                                                      PathFlag.FROM_PROJECT_ROOT))
+        values = {p: f'<{i}>' for i, p in enumerate(manager.get_placeholders())}
+        manager.apply_replacements(values, save_placeholders=False)
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, 'out.docx')
+            render_docx(manager.template_path, output, values)
+            assert [p.text for p in Document(output).paragraphs] == [p.text for p in manager.doc.paragraphs]
@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Tuple, Any, List
+
+from utils.database_handler import DatabaseHandler
+
+_READ_KINDS = ("SELECT", "WITH", "PRAGMA", "EXPLAIN")
+
+
+class AsyncDatabaseHandler:
+    """
+    ``async`` front for a ``DatabaseHandler``, for use in Flet's async event handlers.
+
+    Writes run one at a time on a dedicated writer thread (sqlite only allows one writer anyway); reads run on a
+    small reader pool. The event loop only awaits the result, so the window keeps rendering during slow queries.
+
+    Row mode is taken from the wrapped handler.
+    """
+
+    def __init__(self, handler: DatabaseHandler, readers: int = 2):
+        """
+        :param handler: the handler that runs the queries. Its pool should allow ``readers + 1`` connections.
+        :param readers: number of reader threads.
+        """
+        if readers < 1:
+            raise ValueError("readers must be at least 1.")
+        self._handler = handler
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix='db-reader')
+
+    @property
+    def handler(self) -> DatabaseHandler:
+        return self._handler
+
+    def _executor_for(self, query: str) -> ThreadPoolExecutor:
+        kind = self._handler.statement_cache.get(query).kind
+        return self._readers if kind in _READ_KINDS else self._writer
+
+    async def _run(self, executor: ThreadPoolExecutor, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args))
+
+    async def execute_query(self, query: str, params: Tuple[Any, ...] = None, fetch_mode: int = -1):
+        """Same as ``DatabaseHandler.execute_query``."""
+        return await self._run(self._executor_for(query), self._handler.execute_query, query, params, fetch_mode)
+
+    async def insert_bulk_data(self, query: str, data: List[Tuple[Any, ...]]) -> int:
+        """Same as ``DatabaseHandler.insert_bulk_data``."""
+        return await self._run(self._writer, self._handler.insert_bulk_data, query, data)
+
+    async def select_all(self, table_name: str):
+        """Same as ``DatabaseHandler.select_all``."""
+        return await self._run(self._readers, self._handler.select_all, table_name)
+
+    def close(self, wait: bool = True):
+        """Stops the worker threads; queued queries still run if ``wait`` is True. Doesn't close the handler."""
+        self._writer.shutdown(wait=wait)
+        self._readers.shutdown(wait=wait)
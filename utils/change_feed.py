@@ -0,0 +1,97 @@
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from utils.database_handler import DatabaseHandler
+
+
+@dataclass(frozen=True)
+class Change:
+    table: str
+    row_id: int
+    operation: str
+    """'INSERT', 'UPDATE' or 'DELETE'; for a row changed several times since the last poll, the latest."""
+
+
+class ChangeFeed:
+    """
+    Tells subscribers which rows changed, from the ``Change_Log`` table that the triggers of migration 0005 fill.
+
+    ``poll`` reads the log entries written since the last poll (by any connection) and calls the subscribers of
+    each table once, with that table's changes. Call it after writing, or on a timer. Subscribers are called on the
+    polling thread, which may be a worker thread (e.g. a ``WriteQueue`` callback); UI subscribers hand the work to
+    their page's loop themselves (see ``DatabaseView``).
+
+    Bound methods are held weakly: a view that is thrown away stops getting changes without unsubscribing. Other
+    callables are kept until ``unsubscribe``.
+    """
+
+    def __init__(self, handler: DatabaseHandler, log_table: str = 'Change_Log', keep: int = 1000, start: bool = True):
+        """
+        :param handler: handler of the logged database.
+        :param log_table: table written by the change log triggers.
+        :param keep: number of already-read log entries kept for other readers; older ones are deleted.
+        :param start: follow the log from its current end right away; otherwise ``start`` does (the log table may
+            not exist yet).
+        """
+        self._handler = handler
+        self._log_table = log_table
+        self._keep = keep
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Callable[[], Optional[Callable]]]] = {}
+        self.last_seen = 0
+        if start:
+            self.start()
+
+    def start(self) -> None:
+        """Skips the entries logged so far: ``poll`` delivers the ones written from now on."""
+        self.last_seen = self._max_id()
+
+    def _max_id(self) -> int:
+        with self._handler.connection() as conn:
+            return conn.execute(f'SELECT coalesce(max(changeID), 0) FROM {self._log_table}').fetchone()[0]
+
+    def subscribe(self, table: str, callback: Callable[[List[Change]], None]) -> None:
+        """``callback`` gets the changes of ``table`` found by each ``poll`` (at most once per poll)."""
+        try:
+            ref = weakref.WeakMethod(callback)
+        except TypeError:  # functions, lambdas, builtins: nothing else may be holding them
+            ref = lambda: callback
+        with self._lock:
+            self._subscribers.setdefault(table, []).append(ref)
+
+    def unsubscribe(self, table: str, callback: Callable[[List[Change]], None]) -> None:
+        with self._lock:
+            self._subscribers[table] = [r for r in self._subscribers.get(table, []) if r() not in (None, callback)]
+
+    def poll(self) -> List[Change]:
+        """
+        Delivers the changes logged since the last poll.
+
+        :return: all of them, one per changed row.
+        """
+        with self._lock:
+            with self._handler.transaction() as conn:
+                rows = conn.execute(f'''SELECT changeID, table_name, row_id, operation FROM {self._log_table}
+                                        WHERE changeID > ? ORDER BY changeID''', (self.last_seen,)).fetchall()
+                if rows:
+                    self.last_seen = rows[-1][0]
+                    conn.execute(f'DELETE FROM {self._log_table} WHERE changeID <= ?', (self.last_seen - self._keep,))
+            latest = {}
+            for _, table, row_id, operation in rows:
+                latest.pop((table, row_id), None)
+                latest[(table, row_id)] = Change(table, row_id, operation)
+            changes = list(latest.values())
+            by_table: Dict[str, List[Change]] = {}
+            for change in changes:
+                by_table.setdefault(change.table, []).append(change)
+            callbacks = []
+            for table, table_changes in by_table.items():
+                alive = [r for r in self._subscribers.get(table, []) if r() is not None]
+                self._subscribers[table] = alive
+                callbacks.extend((r(), table_changes) for r in alive)
+        for callback, table_changes in callbacks:
+            if callback is not None:
+                callback(table_changes)
+        return changes
@@ -1,22 +1,315 @@
+import atexit
 import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Tuple, Any, Union, Optional, List
+from queue import LifoQueue, Queue, Empty
+from typing import Tuple, Any, Union, Optional, List, Dict, Callable, Iterator
 
+from utils.enums import RowMode
 from utils.path_utils import PathManager, PathFlag
 
+_OPEN_POOLS = weakref.WeakSet()
+_OPEN_WRITE_QUEUES = weakref.WeakSet()
+
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    'interactive': {
+        'busy_timeout': 5000,
+        'journal_mode': 'WAL',
+        'synchronous':  'NORMAL',
+        'cache_size':   -16000,  # negative values are KiB, i.e. ~16MB
+        'mmap_size':    134217728,
+        'temp_store':   'MEMORY',
+    },
+    'bulk-load': {
+        'busy_timeout': 30000,
+        'journal_mode': 'WAL',
+        'synchronous':  'OFF',
+        'cache_size':   -64000,
+        'mmap_size':    268435456,
+        'temp_store':   'MEMORY',
+    },
+    'safe': {
+        'busy_timeout': 10000,
+        'journal_mode': 'WAL',
+        'synchronous':  'FULL',
+        'cache_size':   -2000,
+        'mmap_size':    0,
+        'temp_store':   'DEFAULT',
+    },
+}
+"""
+Named PRAGMA sets applied to every new connection.
+
+* ``interactive``: the app's default; readers never wait for the writer (WAL) and commits skip the extra fsync.
+* ``bulk-load``: for imports and migrations; no fsync at all, larger cache. Not crash safe.
+* ``safe``: fsync on every commit.
+"""
+
+
+def resolve_pragma_profile(profile: Union[str, Dict[str, Any], None]) -> Dict[str, Any]:
+    """
+    :param profile: a key of ``PRAGMA_PROFILES``, a ``{pragma: value}`` dictionary, or None for no PRAGMAs.
+    :return: the PRAGMAs to apply, in order.
+    :raises ValueError: for unknown profile names or invalid PRAGMA names.
+    """
+    if profile is None:
+        return {}
+    if isinstance(profile, str):
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Unknown PRAGMA profile '{profile}'. Options: {', '.join(PRAGMA_PROFILES)}.")
+        profile = PRAGMA_PROFILES[profile]
+    for name in profile:
+        if not name.isidentifier():
+            raise ValueError(f"Invalid PRAGMA name '{name}'.")
+    return dict(profile)
+
+
+def apply_pragmas(conn: sqlite3.Connection, pragmas: Dict[str, Any]):
+    for name, value in pragmas.items():
+        conn.execute(f'PRAGMA {name} = {value}').fetchall()
+
+
+@dataclass
+class StatementInfo:
+    kind: str
+    """First keyword of the statement, upper-cased (``SELECT``, ``INSERT``...)."""
+    columns: Optional[Tuple[str, ...]] = None
+    """Names of the result's columns; known after the statement ran once."""
+    row_class: Optional[type] = None
+    """namedtuple class for ``RowMode.NAMED_TUPLE``, built from ``columns`` on first use."""
+
+
+class StatementCache:
+    """
+    LRU cache of what ``execute_query`` learns about an SQL text, so repeated queries don't re-derive it.
+    The compiled statements themselves are cached by sqlite3 (see ``cached_statements``).
+    """
+
+    def __init__(self, max_size: int = 128):
+        self._max_size = max_size
+        self._entries: OrderedDict[str, StatementInfo] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, query: str) -> StatementInfo:
+        with self._lock:
+            info = self._entries.get(query)
+            if info is not None:
+                self._entries.move_to_end(query)
+                self.hits += 1
+                return info
+            self.misses += 1
+            info = StatementInfo(query.lstrip().upper().split()[0])
+            self._entries[query] = info
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+            return info
+
+    def clear(self):
+        """Forgets everything; needed after schema changes since ``SELECT *`` columns may differ."""
+        with self._lock:
+            self._entries.clear()
+
+
+class ConnectionPool:
+    """
+    Keeps a bounded number of persistent connections to a single database file.
+
+    A connection is checked out for the duration of a call and returned to the pool afterwards, so consecutive
+    queries reuse it instead of opening a new one. Nested checkouts on the same thread get the connection that
+    thread already holds.
+
+    Checking out an idle connection doesn't query the database: a connection is only tested with a round trip if
+    its last use raised an sqlite3 error or it sat idle for longer than ``health_check_after``.
+    """
+
+    def __init__(self, database: Union[str, Path], pool_size: int = 4, timeout: float = 5.0,
+                 on_connect: Optional[Callable[[sqlite3.Connection], None]] = None, cached_statements: int = 128,
+                 health_check_after: float = 60.0):
+        """
+        :param database: the path to the database.
+        :param pool_size: maximum number of connections open at the same time.
+        :param timeout: seconds to wait for a free connection (and for sqlite's own locks).
+        :param on_connect: called with every newly opened connection (e.g. to set PRAGMAs).
+        :param cached_statements: size of each connection's prepared statement cache.
+        :param health_check_after: seconds a connection may sit idle before it's tested on checkout.
+        """
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1.")
+        self._database = database
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._on_connect = on_connect
+        self._cached_statements = cached_statements
+        self._health_check_after = health_check_after
+        self._idle: LifoQueue = LifoQueue(maxsize=pool_size)
+        """(connection, time it was released in a good state, or None after an error)"""
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+        self._closed = False
+        self.connections_opened = 0
+        _OPEN_POOLS.add(self)
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._database, timeout=self._timeout, check_same_thread=False,
+                               cached_statements=self._cached_statements)
+        if self._on_connect:
+            try:
+                self._on_connect(conn)
+            except Exception:
+                conn.close()
+                raise
+        with self._lock:
+            self._connections.add(conn)
+            self.connections_opened += 1
+        return conn
+
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _is_healthy(conn: sqlite3.Connection, round_trip: bool) -> bool:
+        """Whether a pooled connection is still usable; without ``round_trip``, only that it wasn't closed."""
+        try:
+            conn.total_changes  # raises ProgrammingError once the connection is closed
+            if round_trip:
+                conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Checks out a connection, reusing an idle one when possible.
+
+        :raises sqlite3.ProgrammingError: if the pool was closed.
+        :raises TimeoutError: if no connection was released within the timeout.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed.")
+        if not self._slots.acquire(timeout=self._timeout):
+            raise TimeoutError(f"No free database connection after {self._timeout} seconds.")
+        try:
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except Empty:
+                return self._open()
+            suspect = released_at is None or time.monotonic() - released_at > self._health_check_after
+            if not self._is_healthy(conn, round_trip=suspect):
+                self._discard(conn)
+                conn = self._open()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection, failed: bool = False):
+        """
+        Returns a connection to the pool. Open transactions are rolled back.
+
+        :param failed: its last use raised an sqlite3 error; it's tested before it's handed out again.
+        """
+        try:
+            if self._closed:
+                self._discard(conn)
+                return
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.row_factory = None
+            except sqlite3.Error:
+                self._discard(conn)
+                return
+            self._idle.put_nowait((conn, None if failed else time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def held_connection(self) -> Optional[sqlite3.Connection]:
+        """The connection this thread has checked out through ``connection``, if any."""
+        return getattr(self._local, 'conn', None)
+
+    @contextmanager
+    def connection(self):
+        """Context manager around ``acquire``/``release``; re-entrant per thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self.acquire()
+        self._local.conn = conn
+        failed = False
+        try:
+            yield conn
+        except sqlite3.Error:
+            failed = True
+            raise
+        finally:
+            self._local.conn = None
+            self.release(conn, failed)
+
+    def close(self):
+        """Closes every connection. Connections still checked out are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait()[0])
+            except Empty:
+                break
+
+
+@atexit.register
+def _close_open_pools():
+    for pool in list(_OPEN_POOLS):
+        pool.close()
+
 
 class DatabaseHandler:
     def __init__(self, db_path: Union[str, Path], creation_script_path: Optional[Union[str, Path]] = None,
-                 execute_mode: bool = True, backup_script_path: Optional[Union[str, Path]] = None):
+                 execute_mode: Union[bool, str, RowMode] = True, backup_script_path: Optional[Union[str, Path]] = None,
+                 pool_size: int = 4, pragma_profile: Union[str, Dict[str, Any], None] = 'interactive',
+                 statement_cache_size: int = 128):
         """
         :param db_path: the path to the database
         :param creation_script_path: the path to the creation script for the database (if needed)
-        :param execute_mode: if to use row mode.
+        :param execute_mode: row mode, see ``execute_mode()``.
+        :param pool_size: maximum number of pooled connections kept open to the database.
+        :param pragma_profile: name of a profile in ``PRAGMA_PROFILES`` (or a PRAGMA dictionary) applied to every
+                               connection.
+        :param statement_cache_size: number of distinct SQL texts kept prepared (per connection) and described.
         """
         self._database = PathManager.resolve_path(db_path, PathFlag.R | PathFlag.N)
-        if not self._database.exists():
+        self._pragmas = resolve_pragma_profile(pragma_profile)
+        self._statements = StatementCache(statement_cache_size)
+        self._pool = ConnectionPool(self._database, pool_size, on_connect=self._configure_connection,
+                                    cached_statements=statement_cache_size)
+        if not self._database.exists() and backup_script_path:
             self.execute_script(backup_script_path)
-        self._execute_mode = execute_mode
+        self._execute_mode = self._parse_row_mode(execute_mode)
         if not self._database.exists():
             if not creation_script_path:
                 raise FileNotFoundError("Database does not exist and path to creation script not specified.")
@@ -24,20 +317,103 @@ class DatabaseHandler:
             if not creation_script.exists():
                 raise FileNotFoundError("Database does not exist and path to creation script not specified.")
             self.execute_script(creation_script)
-        self.execute_query('PRAGMA case_sensitive_like = FALSE')
 
     @property
     def database(self) -> Path:
         return self._database
 
-    def execute_mode(self, mode):
-        self._execute_mode = bool(mode)
+    @property
+    def connections_opened(self) -> int:
+        """Number of connections opened by this handler so far."""
+        return self._pool.connections_opened
+
+    @property
+    def statement_cache(self) -> StatementCache:
+        return self._statements
+
+    @property
+    def pragmas(self) -> Dict[str, Any]:
+        """The PRAGMAs applied to every connection."""
+        return dict(self._pragmas)
+
+    def _configure_connection(self, conn: sqlite3.Connection):
+        apply_pragmas(conn, self._pragmas)
+        conn.execute('PRAGMA case_sensitive_like = FALSE')
+
+    @property
+    def row_mode(self) -> RowMode:
+        return self._execute_mode
+
+    def execute_mode(self, mode: Union[bool, str, RowMode]):
+        """
+        :param mode: a ``RowMode`` (or its value). For backwards compatibility ``True`` means ``RowMode.DICT`` and
+                     ``False`` means ``RowMode.TUPLE``.
+        """
+        self._execute_mode = self._parse_row_mode(mode)
+
+    @staticmethod
+    def _parse_row_mode(mode: Union[bool, str, RowMode]) -> RowMode:
+        if isinstance(mode, RowMode):
+            return mode
+        if isinstance(mode, str):
+            return RowMode(mode.lower())
+        return RowMode.DICT if mode else RowMode.TUPLE
+
+    def _row_factory(self, statement: StatementInfo, cursor: sqlite3.Cursor) -> Optional[Callable]:
+        """Row factory for the current mode; column names come from the statement cache."""
+        if self._execute_mode is RowMode.TUPLE or not cursor.description:
+            return None
+        if self._execute_mode is RowMode.ROW:
+            return sqlite3.Row
+        if statement.columns is None or len(statement.columns) != len(cursor.description):
+            statement.columns = tuple(column[0] for column in cursor.description)
+            statement.row_class = None
+        if self._execute_mode is RowMode.NAMED_TUPLE:
+            if statement.row_class is None:
+                statement.row_class = namedtuple('Row', statement.columns, rename=True)
+            make = statement.row_class._make
+            return lambda _cursor, _row: make(_row)
+        columns = statement.columns
+        return lambda _cursor, _row: dict(zip(columns, _row))
+
+    def close(self):
+        """Closes all pooled connections. The handler can't be used afterwards."""
+        self._pool.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Checks out a pooled connection for the block, for callers that manage their own transactions (e.g.
+        ``WriteQueue``). ``execute_query`` calls on the same thread use it too.
+        """
+        with self._pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs a block in a single write transaction: commits on success, rolls back on error.
+        Yields the raw connection (tuple rows); ``execute_query`` calls on the same thread join the transaction.
+        """
+        with self._pool.connection() as conn:
+            if conn.in_transaction:  # nested; the outer block commits
+                yield conn
+                return
+            conn.row_factory = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            conn.commit()
 
     def execute_script(self, script: Union[str, Path]):
-        with sqlite3.connect(self.database) as conn:
+        with self._pool.connection() as conn:
             with open(PathManager.resolve_path(script)) as f:
                 conn.executescript(f.read())
-
+        self._statements.clear()
 
     def execute_query(self, query: str, params: Tuple[Any, ...] = None, fetch_mode: int = -1):
         """
@@ -52,71 +428,113 @@ class DatabaseHandler:
                         * ``>0``: Fetch up to the specified number of rows.
 
         :return: Based on query type:
-                * SELECT: List[Dict] of rows, single row, or None based on fetchall
+                * SELECT: List of rows (see ``execute_mode``), single row, or None based on fetch_mode
                 * INSERT: lastrowid or 0 if no insert occurred
                 * UPDATE/DELETE: Number of rows affected
         :raises: sqlite3.Error for database-related errors
         """
 
-        def dict_factory(_cursor, _row):
-            fields = [column[0] for column in _cursor.description]
-            return {key: value for key, value in zip(fields, _row)}
+        statement = self._statements.get(query)
+        with self._pool.connection() as conn:
+            conn.row_factory = None
+            owns_transaction = not conn.in_transaction
+            try:
+                if owns_transaction:
+                    conn.execute("BEGIN TRANSACTION")
+                cursor = conn.cursor()
 
-        conn = None
-        try:
-            conn = sqlite3.connect(self.database)
-            if self._execute_mode:
-                conn.row_factory = dict_factory
-            else:
-                conn.row_factory = None
+                if not params:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params if params else ())
+                query_type = statement.kind
+                cursor.row_factory = self._row_factory(statement, cursor)
+                if query_type in ("DELETE", "UPDATE") or query_type.startswith(("INSERT", "REPLACE")):
+                    result = _write_result(query_type, cursor)
+                elif query_type == "SELECT":
+                    if fetch_mode == 0:
+                        result = None
+                    elif fetch_mode < 0:
+                        result = cursor.fetchall()
+                    elif fetch_mode == 1:
+                        result = cursor.fetchone()
+                    else:
+                        result = cursor.fetchmany(fetch_mode)
+                else:
+                    result = None  # Default return for other query types
+                    if query_type in ("CREATE", "ALTER", "DROP"):
+                        self._statements.clear()
+                cursor.close()
 
-            conn.execute("BEGIN TRANSACTION")
-            cursor = conn.cursor()
+                if owns_transaction:
+                    conn.commit()
 
-            if not params:
-                cursor.execute(query)
-            else:
-                cursor.execute(query, params if params else ())
-            query_type = query.lstrip().upper().split()[0]
-            if query_type in ("DELETE", "UPDATE"):
-                result = cursor.rowcount
-            elif query_type.startswith(("INSERT", "REPLACE")):
-                result = cursor.lastrowid if cursor.rowcount > 0 else 0
-            elif query_type == "SELECT":
-                if fetch_mode == 0:
-                    result = None
-                elif fetch_mode < 0:
-                    result = cursor.fetchall()
-                elif fetch_mode == 1:
-                    row = cursor.fetchone()
-                    result = dict(row) if self._execute_mode and row else row
-                else:
-                    result = cursor.fetchmany(fetch_mode)
-            else:
-                result = None  # Default return for other query types
+                return result
 
-            conn.commit()
-            conn.close()
+            except Exception as e:
+                if owns_transaction and conn.in_transaction:
+                    conn.rollback()
+                raise e  # Re-raise the exception after rollback
 
-            return result
+    def iter_query(self, query: str, params: Tuple[Any, ...] = None, batch_size: int = 500,
+                   batches: bool = False) -> Iterator:
+        """
+        Streams the rows of a SELECT from a live cursor instead of materialising them, so memory use depends on
+        ``batch_size`` rather than on the size of the result.
 
-        except Exception as e:
-            if conn:
-                conn.rollback()
-                conn.close()
-            raise e  # Re-raise the exception after rollback
+        The generator holds its own pooled connection until it is exhausted or closed; break out of a ``for`` loop
+        or call ``close()`` to give it back early. Inside ``transaction()`` (or ``connection()``) it reads on that
+        block's connection instead, so it sees the block's uncommitted writes; finish it before the block ends.
 
+        :param query: The SQL query string to execute.
+        :param params: Query parameters as a tuple. Defaults to None.
+        :param batch_size: Number of rows fetched from sqlite at a time.
+        :param batches: If True, yields lists of up to ``batch_size`` rows instead of single rows.
+        :return: Rows (dicts or tuples, depending on the current mode) or lists of rows.
+        :raises: sqlite3.Error for database-related errors
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        statement = self._statements.get(query)
+        conn = self._pool.held_connection()
+        owned = conn is None
+        if owned:
+            conn = self._pool.acquire()
+        cursor = None
+        failed = False
+        try:
+            conn.row_factory = None
+            cursor = conn.cursor()
+            cursor.arraysize = batch_size
+            cursor.execute(query, params or ())
+            cursor.row_factory = self._row_factory(statement, cursor)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                if batches:
+                    yield rows
+                else:
+                    yield from rows
+        except sqlite3.Error:
+            failed = True
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if owned:
+                self._pool.release(conn, failed)
 
     def insert_bulk_data(self, query: str, data: List[Tuple[Any, ...]]) -> int:
         """
         Insert multiple rows of data with transaction support.
         Returns the last row id inserted.
         """
-        with sqlite3.connect(self._database) as conn:
-            cursor = conn.cursor()
-            cursor.executemany(query, data)
-            conn.commit()
-            return cursor.lastrowid
+        with self._pool.connection() as conn:
+            with conn:
+                cursor = conn.cursor()
+                cursor.executemany(query, data)
+                return cursor.lastrowid
 
     def select_all(self, table_name: str):
         """
@@ -129,3 +547,162 @@ class DatabaseHandler:
         Get table metadata.
         """
         return self.execute_query('SELECT * FROM PRAGMA_TABLE_INFO(?)', (table_name,), fetch_mode=-1)
+
+
+class WriteQueue:
+    """
+    Write-behind queue with group commit.
+
+    Writes submitted from any thread are run by a single background thread, which commits them together in one
+    transaction (one fsync) once ``max_batch`` writes are waiting or ``interval`` seconds after the first one
+    arrived. Each write (or each ``submit_all`` unit) runs in its own savepoint, so a failing write doesn't undo the
+    others in its group.
+
+    Pending writes are flushed by ``flush()``, ``close()`` and at interpreter exit.
+    """
+
+    _STOP = object()
+
+    def __init__(self, handler: DatabaseHandler, interval: float = 0.05, max_batch: int = 100):
+        """
+        :param handler: the handler whose database is written to.
+        :param interval: longest time (seconds) a write waits for others to join its group.
+        :param max_batch: largest number of writes committed together.
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1.")
+        self._handler = handler
+        self._interval = interval
+        self._max_batch = max_batch
+        self._queue: Queue = Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.commits = 0
+        self._thread = threading.Thread(target=self._run, name='db-write-queue', daemon=True)
+        self._thread.start()
+        _OPEN_WRITE_QUEUES.add(self)
+
+    def submit(self, query: str, params: Tuple[Any, ...] = None) -> Future:
+        """
+        Queues a write.
+
+        :return: a Future for the lastrowid (INSERT/REPLACE, 0 if nothing was inserted), the number of affected rows
+                 (UPDATE/DELETE) or None; it raises the write's sqlite3.Error, if any.
+        """
+        return self._put([(query, params)], single=True)
+
+    def submit_all(self, statements: List[Tuple[str, Optional[Tuple[Any, ...]]]]) -> Future:
+        """
+        Queues several writes as one unit: they are committed together, or, if one fails, none of them is.
+
+        :param statements: (query, params) pairs, run in order.
+        :return: a Future for the list of their results (as for ``submit``); it raises the first failing write's
+                 sqlite3.Error, if any.
+        """
+        if not statements:
+            raise ValueError("No statements to queue.")
+        return self._put(list(statements), single=False)
+
+    def _put(self, statements: Optional[list], single: bool) -> Future:
+        future = Future()
+        with self._close_lock:  # so nothing is queued behind _STOP, where it would never run
+            if self._closed:
+                raise RuntimeError("Write queue is closed.")
+            self._queue.put((statements, future, single))
+        return future
+
+    def flush(self, timeout: Optional[float] = None):
+        """Blocks until everything submitted before this call is committed."""
+        try:
+            barrier = self._put(None, single=True)
+        except RuntimeError:  # closed or closing: close() commits everything that was queued
+            self._thread.join(timeout)
+            return
+        barrier.result(timeout)
+
+    def close(self):
+        """Commits pending writes and stops the background thread."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._interval
+            while len(batch) < self._max_batch and batch[-1][0] is not None:  # a flush barrier ends the batch
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[Optional[list], Future, bool]]):
+        writes = [w for w in batch if w[0] is not None]
+        results = []
+        try:
+            if writes:
+                with self._handler.connection() as conn:
+                    conn.row_factory = None
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        for statements, _, single in writes:
+                            conn.execute("SAVEPOINT queued_write")
+                            try:
+                                unit = [_write_result(self._handler.statement_cache.get(query).kind,
+                                                      conn.execute(query, params or ()))
+                                        for query, params in statements]
+                                results.append((unit[0] if single else unit, None))
+                                conn.execute("RELEASE queued_write")
+                            except sqlite3.Error as e:
+                                conn.execute("ROLLBACK TO queued_write")
+                                conn.execute("RELEASE queued_write")
+                                results.append((None, e))
+                        conn.commit()
+                        self.commits += 1
+                    except Exception:
+                        if conn.in_transaction:
+                            conn.rollback()
+                        raise
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for (_, future, _), (result, error) in zip(writes, results):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        for statements, future, _ in batch:
+            if statements is None:
+                future.set_result(None)
+
+
+def _write_result(kind: str, cursor: sqlite3.Cursor):
+    """What ``execute_query`` returns for a write statement of the given kind."""
+    if kind in ("DELETE", "UPDATE"):
+        return cursor.rowcount
+    if kind.startswith(("INSERT", "REPLACE")):
+        return cursor.lastrowid if cursor.rowcount > 0 else 0
+    return None
+
+
+@atexit.register
+def _close_open_write_queues():
+    # registered after _close_open_pools, so it runs first: queued writes still have a connection to commit on.
+    for write_queue in list(_OPEN_WRITE_QUEUES):
+        write_queue.close()
@@ -18,3 +18,15 @@ class PlaceholderType(Enum):
     DEFAULT_PLACEHOLDER = 'default',
     REQUIRED_PLACEHOLDER = 'required',
     INVALID_PLACEHOLDER = 'invalid',
+
+
+class RowMode(Enum):
+    """How ``DatabaseHandler`` returns result rows."""
+    TUPLE = 'tuple'
+    """Plain tuples; smallest, positional access only."""
+    DICT = 'dict'
+    """A new dictionary per row."""
+    ROW = 'row'
+    """``sqlite3.Row``; shares the cursor's description, supports ``row['column']`` and ``row[0]``."""
+    NAMED_TUPLE = 'named_tuple'
+    """A namedtuple class cached per query; invalid column names are renamed (``_0``, ``_1``...)."""
@@ -0,0 +1,149 @@
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, List, Callable, Tuple, Any, Union, Iterable
+
+from utils.database_handler import DatabaseHandler
+from utils.path_utils import PathManager, PathFlag
+
+_MIGRATION_FILE = re.compile(r'^(\d+)_(.+)\.sql$')
+
+
+@dataclass
+class BatchedMigration:
+    """
+    A data migration that walks a table in chunks of ``batch_size`` rows (keyset on ``key``), each chunk in its own
+    short transaction, so a large database is never locked for long.
+
+    ``transform`` gets the values of ``columns`` for a row and returns the new values of ``targets`` (same order),
+    or None to leave the row alone. It must be safe to run twice on the same row: if the upgrade is interrupted, the
+    migration starts over on the next run.
+    """
+    table: str
+    key: str
+    columns: List[str]
+    targets: List[str]
+    transform: Callable[[Tuple[Any, ...]], Optional[Tuple[Any, ...]]]
+    where: str = ''
+    """Extra condition for rows that still need migrating, e.g. ``new_column IS NULL``."""
+    batch_size: int = 500
+
+    def run(self, handler: DatabaseHandler) -> int:
+        """:return: number of rows updated."""
+        condition = f' AND ({self.where})' if self.where else ''
+        select = f'''SELECT {self.key}, {', '.join(self.columns)} FROM {self.table}
+                     WHERE {self.key} > ?{condition} ORDER BY {self.key} LIMIT ?'''
+        update = f'''UPDATE {self.table} SET {', '.join(f'{t} = ?' for t in self.targets)}
+                     WHERE {self.key} = ?'''
+        last_key = float('-inf')
+        updated = 0
+        while True:
+            with handler.transaction() as conn:
+                rows = conn.execute(select, (last_key, self.batch_size)).fetchall()
+                if not rows:
+                    return updated
+                changes = []
+                for row in rows:
+                    new_values = self.transform(tuple(row[1:]))
+                    if new_values is not None:
+                        changes.append((*new_values, row[0]))
+                conn.executemany(update, changes)
+                updated += len(changes)
+            last_key = rows[-1][0]
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    script: Optional[Path] = None
+    """SQL file; all of its statements run in the migration transaction."""
+    batched: Optional[BatchedMigration] = None
+    """Data migration, run after ``script`` in its own chunked transactions."""
+
+    def statements(self) -> Iterable[str]:
+        """Splits ``script`` into statements (trigger bodies stay whole)."""
+        if not self.script:
+            return
+        buffer = ''
+        with open(self.script, encoding='utf-8') as f:
+            for line in f:
+                buffer += line
+                if sqlite3.complete_statement(buffer):
+                    yield buffer
+                    buffer = ''
+        if buffer.strip() and not all(ln.strip().startswith('--') or not ln.strip() for ln in buffer.splitlines()):
+            raise sqlite3.ProgrammingError(f"Incomplete statement at the end of {self.script}.")
+
+
+@dataclass
+class MigrationRunner:
+    """
+    Versioned schema migrations, tracked in ``PRAGMA user_version``.
+
+    Migrations are ``<version>_<name>.sql`` files in ``folder`` plus any ``batched`` data migrations registered in
+    code. Pending versions are applied in order; consecutive SQL migrations share one transaction together with the
+    ``user_version`` bump, so a failure leaves the database at the last good version. Batched migrations commit what
+    came before them, run in chunks, and bump the version when done.
+    """
+    handler: DatabaseHandler
+    folder: Union[str, Path]
+    batched: List[Migration] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.folder = PathManager.resolve_path(self.folder, PathFlag.R)
+
+    def migrations(self) -> List[Migration]:
+        found = {}
+        for path in sorted(self.folder.glob('*.sql')):
+            match = _MIGRATION_FILE.match(path.name)
+            if match:
+                version = int(match.group(1))
+                if version in found:
+                    raise ValueError(f"Duplicate migration version {version}: {path.name}.")
+                found[version] = Migration(version, match.group(2), script=path)
+        for migration in self.batched:
+            if migration.version in found:
+                raise ValueError(f"Duplicate migration version {migration.version}: {migration.name}.")
+            found[migration.version] = migration
+        return [found[v] for v in sorted(found)]
+
+    def current_version(self) -> int:
+        with self.handler.transaction() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+
+    def pending(self) -> List[Migration]:
+        current = self.current_version()
+        return [m for m in self.migrations() if m.version > current]
+
+    def migrate(self, target: Optional[int] = None) -> List[Migration]:
+        """
+        Applies pending migrations up to ``target`` (default: all).
+
+        :return: the migrations that were applied.
+        """
+        pending = [m for m in self.pending() if target is None or m.version <= target]
+        applied = []
+        index = 0
+        while index < len(pending):
+            with self.handler.transaction() as conn:
+                while index < len(pending):
+                    migration = pending[index]
+                    for statement in migration.statements():
+                        conn.execute(statement)
+                    if migration.batched:
+                        break  # commit the schema part, then run the data part in chunks
+                    conn.execute(f'PRAGMA user_version = {migration.version}')
+                    applied.append(migration)
+                    index += 1
+            if index < len(pending):
+                migration = pending[index]
+                migration.batched.run(self.handler)
+                with self.handler.transaction() as conn:
+                    conn.execute(f'PRAGMA user_version = {migration.version}')
+                applied.append(migration)
+                index += 1
+        if applied:
+            self.handler.statement_cache.clear()
+        return applied
@@ -0,0 +1,125 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple, Any, Sequence, Union
+
+from utils.database_handler import DatabaseHandler
+
+
+@dataclass
+class Page:
+    rows: List[Any] = field(default_factory=list)
+    cursor: Optional[str] = None
+    """Pass back to get the next page; None on the last page."""
+
+
+class Keyset:
+    """
+    Keyset ("seek") pagination over any SELECT: instead of ``OFFSET n`` (which reads and throws away ``n`` rows), each
+    page starts right after the sort key of the previous page's last row, so deep pages cost the same as the first.
+
+    Sort keys are result column names (aliases included), optionally followed by ``DESC``. Together they must be
+    unique - end with the ID column. NULLs sort first ascending and last descending (sqlite's order). An index on the
+    underlying columns keeps pages cheap.
+    """
+
+    def __init__(self, order_by: Union[str, Sequence[str]]):
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        if not order_by:
+            raise ValueError("Keyset pagination needs at least one sort key.")
+        self.keys: List[Tuple[str, bool]] = []
+        for key in order_by:
+            name, _, direction = key.strip().rpartition(' ')
+            if direction.upper() in ('ASC', 'DESC') and name:
+                self.keys.append((name.strip(), direction.upper() == 'DESC'))
+            else:
+                self.keys.append((key.strip(), False))
+
+    @property
+    def order_by(self) -> List[str]:
+        return [f'{name} DESC' if descending else name for name, descending in self.keys]
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def encode(self, row: Any) -> str:
+        """Opaque cursor for the rows after ``row`` (``sqlite3.Row``, dict or named tuple)."""
+        values = [row[name] if not hasattr(row, '_fields') else getattr(row, name) for name, _ in self.keys]
+        payload = json.dumps({'order': self.order_by, 'after': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError as err:
+            raise ValueError("Invalid page cursor.") from err
+        if not isinstance(payload, dict) or payload.get('order') != self.order_by:
+            raise ValueError("Page cursor was made for a different sort order.")
+        return payload['after']
+
+    def _after(self, values: List[Any]) -> Tuple[str, Tuple[Any, ...]]:
+        """WHERE condition (and its parameters) for the rows sorted after ``values``."""
+        columns = [self._quote(name) for name, _ in self.keys]
+        if not any(descending for _, descending in self.keys) and None not in values:
+            # All ascending: NULLs sort first, so they're all behind us and a row value comparison (which can seek
+            # an index) is enough.
+            if len(columns) == 1:
+                return f'{columns[0]} > ?', tuple(values)
+            return f"({', '.join(columns)}) > ({', '.join('?' * len(columns))})", tuple(values)
+        # (a after ?) OR (a = ? AND b after ?) OR ..., where NULLs sort first ascending and last descending.
+        terms, params = [], []
+        equal, equal_params = [], []
+        for column, (_, descending), value in zip(columns, self.keys, values):
+            if value is None:
+                after = None if descending else f'{column} IS NOT NULL'
+                after_params = []
+            else:
+                after = f'({column} < ? OR {column} IS NULL)' if descending else f'{column} > ?'
+                after_params = [value]
+            if after:
+                terms.append('(' + ' AND '.join(equal + [after]) + ')')
+                params += equal_params + after_params
+            equal.append(f'{column} IS NULL' if value is None else f'{column} = ?')
+            equal_params += [] if value is None else [value]
+        return ' OR '.join(terms) or 'FALSE', tuple(params)
+
+    def order_clause(self) -> str:
+        """The sort keys, quoted, for ORDER BY."""
+        return ', '.join(f"{self._quote(name)}{' DESC' if descending else ''}" for name, descending in self.keys)
+
+    def query(self, select_query: str, params: Optional[Sequence[Any]] = None, limit: int = 50,
+              cursor: Optional[str] = None) -> Tuple[str, Tuple[Any, ...]]:
+        """
+        Wraps ``select_query`` (WITHOUT sorting) for one page. Fetches ``limit + 1`` rows; the extra row only tells
+        ``page`` whether there is a next page. sqlite flattens the subquery, so the seek uses the inner table's index.
+        """
+        params = tuple(params or ())
+        order = self.order_clause()
+        where = ''
+        if cursor:
+            after, after_params = self._after(self.decode(cursor))
+            where = f' WHERE {after}'
+            params += after_params
+        return f'SELECT * FROM ({select_query}){where} ORDER BY {order} LIMIT ?', params + (limit + 1,)
+
+    def page(self, rows: List[Any], limit: int) -> Page:
+        """Page from the rows fetched with ``query``."""
+        if len(rows) <= limit:
+            return Page(list(rows), None)
+        rows = rows[:limit]
+        return Page(rows, self.encode(rows[-1]))
+
+
+def fetch_page(handler: DatabaseHandler, select_query: str, params: Optional[Sequence[Any]],
+               order_by: Union[str, Sequence[str]], limit: int = 50, cursor: Optional[str] = None) -> Page:
+    """
+    One page of ``select_query`` (WITHOUT sorting), sorted by ``order_by``; see ``Keyset``.
+    ``handler`` must return rows addressable by column name (any row mode but ``RowMode.TUPLE``).
+
+    :param cursor: ``Page.cursor`` of the previous page; None for the first page.
+    """
+    keyset = Keyset(order_by)
+    query, query_params = keyset.query(select_query, params, limit, cursor)
+    return keyset.page(handler.execute_query(query, query_params, -1), limit)
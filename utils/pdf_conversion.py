@@ -0,0 +1,378 @@
+import atexit
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from abc import ABCMeta, abstractmethod
+from concurrent.futures import Future
+from pathlib import Path
+from queue import Queue
+from typing import Callable, List, Optional, Union
+
+_OPEN_CONVERSION_QUEUES = weakref.WeakSet()
+_RUNNING_OFFICES = weakref.WeakSet()
+
+
+class ConversionError(RuntimeError):
+    """A backend failed to turn a .docx into a PDF."""
+
+
+class PdfBackend(metaclass=ABCMeta):
+    """Turns a .docx into a PDF. ``convert`` may be called from several threads unless the backend says otherwise."""
+
+    name = 'backend'
+
+    @abstractmethod
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        """Writes the PDF of ``docx_path`` to ``pdf_path``; raises on failure."""
+        pass
+
+    def close(self) -> None:
+        """Releases whatever the backend keeps between conversions."""
+        pass
+
+
+class Docx2PdfBackend(PdfBackend):
+    """Microsoft Word, through docx2pdf; Windows and macOS only."""
+
+    name = 'docx2pdf'
+
+    def __init__(self):
+        from docx2pdf import convert  # optional: only needed when this backend is used
+        self._convert = convert
+        self._lock = threading.Lock()  # one Word automation session at a time
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        with self._lock:
+            self._convert(docx_path, pdf_path)
+        if not os.path.exists(pdf_path):
+            raise ConversionError(f'docx2pdf produced no output for {docx_path}')
+
+
+class LibreOfficeBackend(PdfBackend):
+    """
+    Headless LibreOffice: ``soffice --convert-to pdf``, one process per document.
+
+    All conversions share one LibreOffice user profile, created on the first one; creating a profile is a large part
+    of a cold start, and two processes can't use the same profile at once, so conversions run one at a time.
+    """
+
+    name = 'libreoffice'
+
+    def __init__(self, soffice: Optional[str] = None, timeout: float = 120):
+        self.soffice = soffice or find_soffice()
+        if not self.soffice:
+            raise ConversionError('LibreOffice (soffice) was not found.')
+        self.timeout = timeout
+        self._profile = tempfile.mkdtemp(prefix='lo-profile-')
+        self._lock = threading.Lock()
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        with self._lock, tempfile.TemporaryDirectory() as out_dir:
+            completed = subprocess.run(
+                [self.soffice, '--headless', '--norestore', '--nologo', '--nodefault',
+                 f'-env:UserInstallation={Path(self._profile).as_uri()}',
+                 '--convert-to', 'pdf', '--outdir', out_dir, docx_path],
+                capture_output=True, text=True, timeout=self.timeout)
+            produced = Path(out_dir) / (Path(docx_path).stem + '.pdf')
+            if completed.returncode != 0 or not produced.exists():
+                raise ConversionError(f'soffice failed ({completed.returncode}): {completed.stderr.strip()}')
+            shutil.move(str(produced), pdf_path)
+
+    def close(self) -> None:
+        shutil.rmtree(self._profile, ignore_errors=True)
+
+
+class StubBackend(PdfBackend):
+    """Writes a blank one-page PDF; for tests and machines without a converter."""
+
+    name = 'stub'
+    PDF = (b'%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n'
+           b'2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n'
+           b'3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\n'
+           b'trailer<</Root 1 0 R>>\n%%EOF\n')
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        if not os.path.exists(docx_path):
+            raise FileNotFoundError(docx_path)
+        time.sleep(self.delay)
+        with open(pdf_path, 'wb') as f:
+            f.write(self.PDF)
+
+
+class LibreOfficeDaemonBackend(PdfBackend):
+    """
+    One long-lived headless LibreOffice, driven over a UNO socket: a conversion loads the document into the running
+    office and exports it, without starting a process.
+
+    The office is started on the first conversion, restarted (and the conversion retried once) if it has died, and
+    shut down by ``close``. Needs the ``uno`` module that comes with LibreOffice (``python3-uno`` on Linux, or
+    LibreOffice's bundled Python).
+    """
+
+    name = 'libreoffice-daemon'
+    _CONNECTION = 'socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext'
+
+    def __init__(self, soffice: Optional[str] = None, start_timeout: float = 60):
+        try:
+            import uno  # optional: ships with LibreOffice, not on PyPI
+        except ImportError as e:
+            raise ConversionError('The LibreOffice daemon needs the uno module (python3-uno).') from e
+        self._uno = uno
+        self.soffice = soffice or find_soffice()
+        if not self.soffice:
+            raise ConversionError('LibreOffice (soffice) was not found.')
+        self.start_timeout = start_timeout
+        self._profile = tempfile.mkdtemp(prefix='lo-daemon-profile-')
+        self._lock = threading.Lock()  # one UNO bridge; the office converts one document at a time anyway
+        self._process: Optional[subprocess.Popen] = None
+        self._desktop = None
+        self.starts = 0
+        """Number of times the office was started; more than one means it was restarted."""
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self) -> None:
+        self._stop()
+        with socket.socket() as s:  # a free port
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        connection = self._CONNECTION.format(port=port)
+        self._process = subprocess.Popen(
+            [self.soffice, '--headless', '--invisible', '--norestore', '--nologo', '--nodefault',
+             f'-env:UserInstallation={Path(self._profile).as_uri()}', f'--accept={connection}'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.starts += 1
+        _RUNNING_OFFICES.add(self)
+        local = self._uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext('com.sun.star.bridge.UnoUrlResolver', local)
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            try:
+                context = resolver.resolve(f'uno:{connection}StarOffice.ComponentContext')
+                break
+            except Exception:  # NoConnectException until the office listens
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self._stop()
+                    raise ConversionError('LibreOffice did not start.')
+                time.sleep(0.1)
+        self._desktop = context.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', context)
+
+    def _stop(self) -> None:
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:  # already gone
+                pass
+            self._desktop = None
+        if self._process is not None:
+            _RUNNING_OFFICES.discard(self)
+            try:
+                self._process.wait(10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+    def _property(self, name: str, value):
+        prop = self._uno.createUnoStruct('com.sun.star.beans.PropertyValue')
+        prop.Name, prop.Value = name, value
+        return prop
+
+    def _export(self, docx_path: str, pdf_path: str) -> None:
+        document = self._desktop.loadComponentFromURL(
+            Path(docx_path).resolve().as_uri(), '_blank', 0, (self._property('Hidden', True),))
+        if document is None:
+            raise ConversionError(f'LibreOffice could not open {docx_path}')
+        try:
+            document.storeToURL(Path(pdf_path).resolve().as_uri(),
+                                (self._property('FilterName', 'writer_pdf_Export'),))
+        finally:
+            document.close(True)
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        if not os.path.exists(docx_path):
+            raise FileNotFoundError(docx_path)
+        with self._lock:
+            if not self.running:
+                self._start()
+            try:
+                self._export(docx_path, pdf_path)
+            except ConversionError:
+                raise
+            except Exception:
+                if self.running:
+                    raise
+                self._start()  # the office crashed: once more with a new one
+                self._export(docx_path, pdf_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+        shutil.rmtree(self._profile, ignore_errors=True)
+
+
+def find_soffice() -> Optional[str]:
+    """Path of the LibreOffice executable, if it's installed."""
+    for name in ('soffice', 'libreoffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+    for path in (r'C:\Program Files\LibreOffice\program\soffice.exe',
+                 '/Applications/LibreOffice.app/Contents/MacOS/soffice'):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+BACKENDS = {
+    Docx2PdfBackend.name:          Docx2PdfBackend,
+    LibreOfficeBackend.name:       LibreOfficeBackend,
+    LibreOfficeDaemonBackend.name: LibreOfficeDaemonBackend,
+    StubBackend.name:              StubBackend,
+}
+
+
+def make_backend(name: str = 'auto') -> PdfBackend:
+    """
+    :param name: one of ``BACKENDS``, or ``'auto'``: Word (docx2pdf) on Windows and macOS if docx2pdf is installed,
+                 otherwise LibreOffice if it's installed (kept running if the ``uno`` module is available).
+    :raises ConversionError: if ``'auto'`` finds no converter.
+    """
+    if name != 'auto':
+        return BACKENDS[name]()
+    if sys.platform in ('win32', 'darwin'):
+        try:
+            return Docx2PdfBackend()
+        except ImportError:  # no docx2pdf
+            pass
+    if find_soffice():
+        try:
+            return LibreOfficeDaemonBackend()
+        except ConversionError:  # no uno module
+            return LibreOfficeBackend()
+    raise ConversionError('No PDF converter found: install LibreOffice.')
+
+
+class PdfConversionQueue:
+    """
+    Converts documents to PDF on background threads, so callers (UI callbacks in particular) don't wait for it.
+
+    ``submit`` returns a Future for the PDF's path. A failed conversion is retried ``retries`` times, ``retry_delay``
+    seconds apart (doubling each time), before its Future gets the error. The backend is created on the first
+    conversion, so an app that never makes a PDF never starts a converter.
+
+    Pending conversions are finished by ``close()`` and at interpreter exit.
+    """
+
+    _STOP = object()
+
+    def __init__(self, backend: Union[PdfBackend, Callable[[], PdfBackend]], workers: int = 1, retries: int = 2,
+                 retry_delay: float = 1.0):
+        """
+        :param backend: a backend, or a function that makes one.
+        :param workers: number of conversion threads.
+        :param retries: attempts after the first one.
+        :param retry_delay: seconds before the first retry.
+        """
+        if workers < 1:
+            raise ValueError('workers must be at least 1.')
+        self._backend = backend if isinstance(backend, PdfBackend) else None
+        self._make_backend = None if self._backend else backend
+        self._backend_lock = threading.Lock()
+        self._retries = retries
+        self._retry_delay = retry_delay
+        self._queue: Queue = Queue()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._run, name=f'pdf-conversion-{i}', daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+        _OPEN_CONVERSION_QUEUES.add(self)
+
+    @property
+    def backend(self) -> PdfBackend:
+        with self._backend_lock:
+            if self._backend is None:
+                self._backend = self._make_backend()
+            return self._backend
+
+    def submit(self, docx_path: Union[str, Path], pdf_path: Union[str, Path],
+               on_done: Optional[Callable[[Future], None]] = None) -> Future:
+        """
+        Queues a conversion.
+
+        :param on_done: called with the Future once it's done, on a conversion thread (or right away, if it's done
+                        already).
+        :return: a Future for ``pdf_path``; it raises the last error if every attempt failed.
+        """
+        future = Future()
+        if on_done:
+            future.add_done_callback(on_done)
+        with self._close_lock:  # so nothing is queued behind the stop markers of close()
+            if self._closed:
+                raise RuntimeError('Conversion queue is closed.')
+            self._queue.put((str(docx_path), str(pdf_path), future))
+        return future
+
+    def close(self):
+        """Finishes the queued conversions, stops the threads and closes the backend."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+        if self._backend is not None:
+            self._backend.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            docx_path, pdf_path, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                backend = self.backend
+            except Exception as e:  # no converter: retrying won't help
+                future.set_exception(e)
+                continue
+            delay = self._retry_delay
+            for attempt in range(self._retries + 1):
+                try:
+                    backend.convert(docx_path, pdf_path)
+                except Exception as e:
+                    if attempt == self._retries:
+                        future.set_exception(e)
+                    else:
+                        time.sleep(delay)
+                        delay *= 2
+                else:
+                    future.set_result(pdf_path)
+                    break
+
+
+@atexit.register
+def _close_open_conversion_queues():
+    # atexit hooks run last-registered first: when this module is imported after utils.database_handler (as in
+    # core.global_handlers), completion callbacks can still use the database's write queues.
+    for conversion_queue in list(_OPEN_CONVERSION_QUEUES):
+        conversion_queue.close()
+    # A daemon used without a queue still shouldn't outlive the app.
+    for office in list(_RUNNING_OFFICES):
+        office.close()